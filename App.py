@@ -1,11 +1,12 @@
 import json
 import math
-import sys
-from abc import ABC, abstractmethod
 import os
+import sys
+
 import folium
-from folium import IFrame
-from folium.plugins import PolyLineTextPath, MousePosition
+from branca.element import MacroElement
+from folium.plugins import MousePosition
+from jinja2 import Template
 from PyQt5.QtWidgets import (
     QApplication,
     QWidget,
@@ -22,950 +23,144 @@ from PyQt5.QtWidgets import (
     QFormLayout,
     QDialogButtonBox,
     QCheckBox,
+    QProgressBar,
 )
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import QUrl
-
-
-class DistanceCalculator:
-    @staticmethod
-    def calculate_distance(lat1, lon1, lat2, lon2):
-        R = 6371
-        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-        latdiff = lat2 - lat1
-        londiff = lon2 - lon1
-        a = (
-            math.sin(latdiff / 2) ** 2
-            + math.cos(lat1) * math.cos(lat2) * math.sin(londiff / 2) ** 2
-        )
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        return R * c
-
-
-class Location:
-    def __init__(self, latitude, longitude):
-        self.__latitude = latitude
-        self.__longitude = longitude
-
-    def get_latitude(self):
-        return self.__latitude
-
-    def get_longitude(self):
-        return self.__longitude
-
-    def set_latitude(self, latitude):
-        self.__latitude = latitude
-
-    def set_longitude(self, longitude):
-        self.__longitude = longitude
-
-
-class Stop:
-    def __init__(self, stopid, name, type, location, son_durak, nextStops, transfers):
-        self.__stopid = stopid
-        self.__name = name
-        self.__type = type
-        self.__location = location
-        self.__son_durak = son_durak
-        self.__nextStops = nextStops
-        self.__transfers = transfers
-
-    def get_stopid(self):
-        return self.__stopid
-
-    def get_name(self):
-        return self.__name
-
-    def get_type(self):
-        return self.__type
-
-    def get_location(self):
-        return self.__location
-
-    def get_son_durak(self):
-        return self.__son_durak
-
-    def get_nextStops(self):
-        return self.__nextStops
-
-    def get_transfers(self):
-        return self.__transfers
-
-    def set_stopid(self, stopid):
-        self.__stopid = stopid
-
-    def set_name(self, name):
-        self.__name = name
-
-    def set_type(self, type):
-        self.__type = type
-
-    def set_location(self, location):
-        self.__location = location
-
-    def set_son_durak(self, son_durak):
-        self.__son_durak = son_durak
-
-    def set_nextStops(self, nextStops):
-        self.__nextStops = nextStops
-
-    def set_transfers(self, transfers):
-        self.__transfers = transfers
-
-
-class Transfer:
-    def __init__(self, transferStopId, sure, ucret):
-        self.__transferStopId = transferStopId
-        self.__sure = sure
-        self.__ucret = ucret
-
-    def get_transferStopId(self):
-        return self.__transferStopId
-
-    def get_sure(self):
-        return self.__sure
-
-    def get_ucret(self):
-        return self.__ucret
-
-    def set_transferStopId(self, transferStopId):
-        self.__transferStopId = transferStopId
-
-    def set_sure(self, sure):
-        self.__sure = sure
-
-    def set_ucret(self, ucret):
-        self.__ucret = ucret
-
-
-class Distance_Based_Fare(ABC):
-    @abstractmethod
-    def calculate_fare(self, distance):
-        pass
-
-    @abstractmethod
-    def set_fees(self, json_file):
-        pass
-
-
-class Fixed_Fare(ABC):
-    @abstractmethod
-    def returnIconPath(self):
-        pass
-
-
-class Vehicle(ABC):
-    def __init__(self, markerGroup):
-        self.markerGroup = markerGroup
-
-    @abstractmethod
-    def returnMarkerGroup(self):
-        pass
-
-
-class Bus(Vehicle, Fixed_Fare):
-    def __init__(self, busIconFileName, busMarkerGroup):
-        super().__init__(busMarkerGroup)
-        self.busIconFileName = busIconFileName
-        self.busIconPath = os.path.join(os.getcwd(), busIconFileName)
-        self.linecolor = "green"
-        self.isTiedToGoverment = True
-
-    def returnMarkerGroup(self):
-        return self.markerGroup
-
-    def returnIconPath(self):
-        return self.busIconPath
-
-
-class Tram(Vehicle, Fixed_Fare):
-    def __init__(self, tramIconFileName, tramMarkerGroup):
-        super().__init__(tramMarkerGroup)
-        self.tramIconFileName = tramIconFileName
-        self.tramIconPath = os.path.join(os.getcwd(), tramIconFileName)
-        self.linecolor = "darkred"
-        self.isTiedToGoverment = True
-
-    def returnMarkerGroup(self):
-        return self.markerGroup
-
-    def returnIconPath(self):
-        return self.tramIconPath
-
-
-class Taxi(Vehicle, Distance_Based_Fare):
-
-    def __init__(self, opening_fee, cost_per_km, taxiMarkerGroup):
-        self.opening_fee = opening_fee
-        self.cost_per_km = cost_per_km
-        self.speed = 70
-        self.linecolor = "yellow"
-        super().__init__(taxiMarkerGroup)
-        self.tiedToGoverment = False
-
-    def setMarkerGroup(self, tMarker):
-        self.markerGroup = tMarker
-
-    def returnMarkerGroup(self):
-        return self.markerGroup
-
-    def calculate_fare(self, distance):
-        return self.opening_fee + (distance * self.cost_per_km)
-
-    def calculate_taxi_time(self, distance):
-        time_by_hour = distance / self.speed
-        time_by_minute = time_by_hour * 60
-        return time_by_minute
-
-    def set_fees(self, json_file):
-        with open(json_file, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            if "taxi" not in data:
-                raise ValueError("'taxi' anahtarı bulunamadı!")
-            self.opening_fee = data["taxi"]["openingFee"]
-            self.cost_per_km = data["taxi"]["costPerKm"]
-
-
-class Passenger(ABC):
-    def __init__(
-        self,
-        passenger_type,
-        passengerLocation,
-        passengerTargetLocation,
-        creditCards=None,
-        cash_cards=None,
-        kent_cards=None,
-        is_special_day=False,
-    ):
-        self.__passenger_type = passenger_type
-        self.__passengerLocation = passengerLocation
-        self.__passengerTargetLocation = passengerTargetLocation
-        self.__creditCards = creditCards if creditCards else []
-        self.__cash_cards = cash_cards if cash_cards else []
-        self.__kent_cards = kent_cards if kent_cards else []
-        self.__walkingSpeed = 5
-        self.__is_special_day = is_special_day
-
-    def get_passenger_type(self):
-        return self.__passenger_type
-
-    def get_passengerLocation(self):
-        return self.__passengerLocation
-
-    def get_passengerTargetLocation(self):
-        return self.__passengerTargetLocation
-
-    def get_creditCards(self):
-        return self.__creditCards
-
-    def get_cash_cards(self):
-        return self.__cash_cards
-
-    def get_kent_cards(self):
-        return self.__kent_cards
-
-    def get_walkingSpeed(self):
-        return self.__walkingSpeed
-
-    def set_passengerLocation(self, location):
-        self.__passengerLocation = location
-
-    def set_passengerTargetLocation(self, location):
-        self.__passengerTargetLocation = location
-
-    def set_creditCards(self, creditCards):
-        self.__creditCards = creditCards
-
-    def set_cash_cards(self, cash_cards):
-        self.__cash_cards = cash_cards
-
-    def set_kent_cards(self, kent_cards):
-        self.__kent_cards = kent_cards
-
-    def set_walkingSpeed(self, walkingSpeed):
-        self.__walkingSpeed = walkingSpeed
-
-    @abstractmethod
-    def get_discount(self, fare):
-        pass
-
-    def calculate_walking_time(self, distance):
-        return distance / self.__walkingSpeed
-
-    def get_is_special_day(self):
-        return self.__is_special_day
-
-    def set_is_special_day(self, is_special_day):
-        self.__is_special_day = is_special_day
-
-    def get_creditCard_Money_Amount(self):
-        balance = 0
-        if self.__creditCards is not None:
-            for card in self.__creditCards:
-                balance += card.balance
-        return balance
-
-    def get_cash_Money_Amount(self):
-        balance = 0
-        if self.__cash_cards is not None:
-            for card in self.__cash_cards:
-                balance += card.balance
-        return balance
-
-    def get_kentCard_Money_Amount(self):
-        balance = 0
-        if self.__kent_cards is not None:
-            for card in self.__kent_cards:
-                balance += card.balance
-        return balance
-
-    def can_pay(self, amount):
-        total_balance = (
-            self.get_cash_Money_Amount()
-            + self.get_creditCard_Money_Amount()
-            + self.get_kentCard_Money_Amount()
-        )
-        return total_balance >= amount
-
-
-class General(Passenger):
-    def __init__(
-        self,
-        passenger_type,
-        passengerLocation,
-        passengerTargetLocation,
-        creditCards=None,
-        cash_cards=None,
-        kent_cards=None,
-        is_special_day=False,
-    ):
-        super().__init__(
-            "Genel",
-            passengerLocation,
-            passengerTargetLocation,
-            creditCards,
-            cash_cards,
-            kent_cards,
-            is_special_day,
-        )
-
-    def get_discount(self, fare):
-        return fare
-
-
-class Student(Passenger):
-    def __init__(
-        self,
-        passenger_type,
-        passengerLocation,
-        passengerTargetLocation,
-        creditCards=None,
-        cash_cards=None,
-        kent_cards=None,
-        is_special_day=False,
-    ):
-        super().__init__(
-            "Öğrenci",
-            passengerLocation,
-            passengerTargetLocation,
-            creditCards,
-            cash_cards,
-            kent_cards,
-            is_special_day,
-        )
-
-    def get_discount(self, fare):
-        return fare * 0.5
-
-
-class Elderly(Passenger):
-    def __init__(
-        self,
-        passenger_type,
-        passengerLocation,
-        passengerTargetLocation,
-        creditCards=None,
-        cash_cards=None,
-        kent_cards=None,
-        is_special_day=False,
-    ):
-        super().__init__(
-            "Yaşlı",
-            passengerLocation,
-            passengerTargetLocation,
-            creditCards,
-            cash_cards,
-            kent_cards,
-            is_special_day,
-        )
-
-    def get_discount(self, fare):
-        return 0
-
-
-class PaymentType(ABC):
-    def __init__(self, balance):
-        self.balance = balance
-
-    @abstractmethod
-    def pay(self, fare):
-        pass
-
-
-class KrediKarti(PaymentType):
-    def __init__(self, balance):
-        super().__init__(balance)
-
-    def pay(self, fare):
-        if self.balance >= fare:
-            return True
-        return False
-
-
-class Nakit(PaymentType):
-    def __init__(self, balance):
-        super().__init__(balance)
-
-    def pay(self, fare):
-        if self.balance >= fare:
-            return True
-        return False
-
-
-class KentKart(PaymentType):
-    def __init__(self, balance):
-        super().__init__(balance)
-
-    def pay(self, fare):
-        if self.balance >= fare:
-            return True
-        return False
-
-
-class StopLoader:
-    @staticmethod
-    def load_stops_from_json(json_file):
-        with open(json_file, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            if "duraklar" not in data:
-                raise ValueError("'duraklar' anahtarı bulunamadı!")
-            stops = []
-
-            for stop_data in data["duraklar"]:
-                transfers = stop_data.get("transfer", None)
-                if transfers:
-                    transfers = Transfer(
-                        transferStopId=transfers["transferStopId"],
-                        sure=transfers["transferSure"],
-                        ucret=transfers["transferUcret"],
-                    )
-                stopToAppend = Stop(
-                    stopid=stop_data["id"],
-                    name=stop_data["name"],
-                    type=stop_data["type"],
-                    location=Location(stop_data["lat"], stop_data["lon"]),
-                    son_durak=stop_data["sonDurak"],
-                    nextStops=stop_data.get("nextStops", []),
-                    transfers=transfers,
-                )
-                stops.append(stopToAppend)
-            return {stop.get_stopid(): stop for stop in stops}
-
-
-class RouteLogic(ABC):
-    @abstractmethod
-    def calculateRoute(
-        self, stops, initial_stop, target_stop, user: Passenger, vehicle_bias
-    ):
-        pass
-
-
-class bellmanFord_Standard(RouteLogic):
-    def calculateRoute(
-        self,
-        stops,
-        initial_stop,
-        target_stop,
-        user: Passenger,
-        vehicle_bias,
-        visited=None,
-    ):
-        if visited is None:
-            visited = set()
-
-        relaxation_amount = len(stops) - 1
-        relaxation_counter = 0
-        distances = {stop: float("inf") for stop in stops.values()}
-        distances[initial_stop] = 0
-        path_dictionary = {stop: None for stop in stops.values()}
-        relaxation_bool = True
-
-        while relaxation_bool:
-            relaxation_bool = False
-            for stop in stops.values():
-                for next_stop in stop.get_nextStops():
-                    next_stop_id = next_stop["stopId"]
-                    next_stop_object = stops[next_stop_id]
-                    if user.get_is_special_day() and next_stop_object.get_type() in [
-                        "bus",
-                        "tram",
-                    ]:
-                        score = next_stop["mesafe"] * 0.1 + next_stop["sure"] * 0.5
-                    else:
-                        score = (
-                            next_stop["mesafe"] * 0.1
-                            + next_stop["sure"] * 0.5
-                            + user.get_discount(next_stop["ucret"]) * 0.4
-                        )
-                    if next_stop_object.get_type() == vehicle_bias:
-                        score *= 0.01
-                    if distances[stop] + score < distances[next_stop_object]:
-                        distances[next_stop_object] = distances[stop] + score
-                        path_dictionary[next_stop_object] = stop
-                        relaxation_counter += 1
-                        relaxation_bool = True
-                if stop.get_transfers():
-                    transfer_stop_id = stop.get_transfers().get_transferStopId()
-                    transfer_stop_data = stops[transfer_stop_id]
-                    if user.get_is_special_day() and transfer_stop_data.get_type() in [
-                        "bus",
-                        "tram",
-                    ]:
-                        score = stop.get_transfers().get_sure() * 0.5
-                    else:
-                        score = (
-                            stop.get_transfers().get_sure() * 0.5
-                            + user.get_discount(stop.get_transfers().get_ucret()) * 0.4
-                        )
-                    if stops[transfer_stop_id].get_type() == vehicle_bias:
-                        score *= 0.01
-                    if distances[stop] + score < distances[transfer_stop_data]:
-                        distances[transfer_stop_data] = distances[stop] + score
-                        path_dictionary[transfer_stop_data] = stop
-                        relaxation_counter += 1
-                        relaxation_bool = True
-
-            if not relaxation_bool:
-                break
-            if relaxation_counter > relaxation_amount * 2:
-                raise RuntimeError("Negatif döngü bulundu, uygulama sonlandırılıyor")
-
-        if all(
-            dist == float("inf")
-            for stop, dist in distances.items()
-            if stop != initial_stop
-        ):
-            closestToInitialStop = min(
-                [stop for stop in stops.values() if stop not in visited],
-                key=lambda stop: DistanceCalculator.calculate_distance(
-                    initial_stop.get_location().get_latitude(),
-                    initial_stop.get_location().get_longitude(),
-                    stop.get_location().get_latitude(),
-                    stop.get_location().get_longitude(),
-                ),
-            )
-            visited.add(closestToInitialStop)
-            return self.calculateRoute(
-                stops, closestToInitialStop, target_stop, user, vehicle_bias, visited
-            )
-        elif distances[target_stop] == float("inf"):
-            closestToTargetStop = min(
-                [stop for stop in stops.values() if stop not in visited],
-                key=lambda stop: DistanceCalculator.calculate_distance(
-                    target_stop.get_location().get_latitude(),
-                    target_stop.get_location().get_longitude(),
-                    stop.get_location().get_latitude(),
-                    stop.get_location().get_longitude(),
-                ),
-            )
-            visited.add(closestToTargetStop)
-            return self.calculateRoute(
-                stops, initial_stop, closestToTargetStop, user, vehicle_bias, visited
-            )
-
-        path_to_target = []
-        current_stop = target_stop
-        total_time = 0
-        total_distance = 0
-        total_price = 0
-        transfer_count = 0
-
-        while current_stop is not None:
-            path_to_target.insert(0, current_stop)
-            if path_dictionary[current_stop] is not None:
-                prev_stop = path_dictionary[current_stop]
-                for next_stop in prev_stop.get_nextStops():
-                    if next_stop["stopId"] == current_stop.get_stopid():
-                        total_time += next_stop["sure"]
-                        total_distance += next_stop["mesafe"]
-                        if not (
-                            user.get_is_special_day()
-                            and current_stop.get_type() in ["bus", "tram"]
-                        ):
-                            total_price += next_stop["ucret"]
-                        break
-                if (
-                    prev_stop.get_transfers()
-                    and prev_stop.get_transfers().get_transferStopId()
-                    == current_stop.get_stopid()
-                ):
-                    total_time += prev_stop.get_transfers().get_sure()
-                    if not (
-                        user.get_is_special_day()
-                        and current_stop.get_type() in ["bus", "tram"]
-                    ):
-                        total_price += prev_stop.get_transfers().get_ucret()
-                    transfer_count += 1
-            current_stop = path_dictionary[current_stop]
-
-        total_price = user.get_discount(total_price)
-        if total_price > transfer_count:
-            total_price -= transfer_count
-        else:
-            total_price = 0
-
-        routeObj = RouteInfo(
-            path_to_target,
-            total_time,
-            total_distance,
-            total_price,
-            "",
-            vehicle_bias,
-            self,
-        )
-        return routeObj
-
-
-class bellmanFord_LeastStops(RouteLogic):
-    def calculateRoute(
-        self,
-        stops,
-        initial_stop,
-        target_stop,
-        user: Passenger,
-        vehicle_bias,
-        visited=None,
-    ):
-        if visited is None:
-            visited = set()
-        path_dictionary = {stop: None for stop in stops.values()}
-        stops_count = {stop: float("inf") for stop in stops.values()}
-        stops_count[initial_stop] = 0
-        relaxation_bool = True
-
-        while relaxation_bool:
-            relaxation_bool = False
-            for stop in stops.values():
-                for next_stop in stop.get_nextStops():
-                    next_stop_id = next_stop["stopId"]
-                    next_stop_object = stops[next_stop_id]
-                    if stops_count[stop] + 1 < stops_count[next_stop_object]:
-                        stops_count[next_stop_object] = stops_count[stop] + 1
-                        relaxation_bool = True
-                        path_dictionary[next_stop_object] = stop
-                if stop.get_transfers():
-                    transfer_stop_id = stop.get_transfers().get_transferStopId()
-                    transfer_stop_data = stops[transfer_stop_id]
-                    if stops_count[stop] + 1 < stops_count[transfer_stop_data]:
-                        stops_count[transfer_stop_data] = stops_count[stop] + 1
-                        relaxation_bool = True
-                        path_dictionary[transfer_stop_data] = stop
-            if not relaxation_bool:
-                break
-
-        if all(
-            dist == float("inf")
-            for stop, dist in stops_count.items()
-            if stop != initial_stop
-        ):
-            closestToInitialStop = min(
-                [stop for stop in stops.values() if stop not in visited],
-                key=lambda stop: DistanceCalculator.calculate_distance(
-                    initial_stop.get_location().get_latitude(),
-                    initial_stop.get_location().get_longitude(),
-                    stop.get_location().get_latitude(),
-                    stop.get_location().get_longitude(),
-                ),
-            )
-            visited.add(closestToInitialStop)
-            return self.calculateRoute(
-                stops, closestToInitialStop, target_stop, user, vehicle_bias, visited
-            )
-        elif stops_count[target_stop] == float("inf"):
-            closestToTargetStop = min(
-                [stop for stop in stops.values() if stop not in visited],
-                key=lambda stop: DistanceCalculator.calculate_distance(
-                    target_stop.get_location().get_latitude(),
-                    target_stop.get_location().get_longitude(),
-                    stop.get_location().get_latitude(),
-                    stop.get_location().get_longitude(),
-                ),
-            )
-            visited.add(closestToTargetStop)
-            return self.calculateRoute(
-                stops, initial_stop, closestToTargetStop, user, vehicle_bias, visited
-            )
-
-        path_to_target = []
-        current_stop = target_stop
-        total_time = 0
-        total_distance = 0
-        total_price = 0
-        transfer_count = 0
-
-        while current_stop is not None:
-            path_to_target.insert(0, current_stop)
-            if path_dictionary[current_stop] is not None:
-                prev_stop = path_dictionary[current_stop]
-                for next_stop in prev_stop.get_nextStops():
-                    if next_stop["stopId"] == current_stop.get_stopid():
-                        total_time += next_stop["sure"]
-                        total_distance += next_stop["mesafe"]
-                        if not (
-                            user.get_is_special_day()
-                            and current_stop.get_type() in ["bus", "tram"]
-                        ):
-                            total_price += next_stop["ucret"]
-                        break
-                if (
-                    prev_stop.get_transfers()
-                    and prev_stop.get_transfers().get_transferStopId()
-                    == current_stop.get_stopid()
-                ):
-                    total_time += prev_stop.get_transfers().get_sure()
-                    if not (
-                        user.get_is_special_day()
-                        and current_stop.get_type() in ["bus", "tram"]
-                    ):
-                        total_price += prev_stop.get_transfers().get_ucret()
-                    transfer_count += 1
-            current_stop = path_dictionary[current_stop]
-
-        total_price = user.get_discount(total_price)
-        if total_price > transfer_count:
-            total_price -= transfer_count
-        else:
-            total_price = 0
-
-        routeObj = RouteInfo(
-            path_to_target,
-            total_time,
-            total_distance,
-            total_price,
-            "",
-            vehicle_bias,
-            self,
-        )
-        return routeObj
-
-
-class RoutePlanner:
-    def __init__(self, stops, vehicles, distance_calculator):
-        self.stops = stops
-        self.vehicles = vehicles
-        self.distance_calculator = distance_calculator
-
-    def find_nearest_stop(self, location):
-        return min(
-            self.stops.values(),
-            key=lambda stop: self.distance_calculator.calculate_distance(
-                location.get_latitude(),
-                location.get_longitude(),
-                stop.get_location().get_latitude(),
-                stop.get_location().get_longitude(),
-            ),
-        )
-
-    def finalize_routes(
-        self,
-        user: Passenger,
-        target_location,
-        vehicle_bias,
-        route_logic: RouteLogic,
-        routeName,
-    ):
-
-        initial_closest_stop = self.find_nearest_stop(user.get_passengerLocation())
-        initial_target_stop = self.find_nearest_stop(target_location)
-
-        route_obj = route_logic.calculateRoute(
-            self.stops, initial_closest_stop, initial_target_stop, user, vehicle_bias
-        )
-        if not route_obj.get_route():
-            return route_obj  # Taxi icin
-
-        final_closest_stop = route_obj.get_route()[0]
-        final_target_stop = route_obj.get_route()[-1]
-
-        distance_to_closest_stop = self.distance_calculator.calculate_distance(
-            user.get_passengerLocation().get_latitude(),
-            user.get_passengerLocation().get_longitude(),
-            final_closest_stop.get_location().get_latitude(),
-            final_closest_stop.get_location().get_longitude(),
-        )
-
-        taxi_price = 0
-        taxi_time = 0
-        walking_time = 0
-
-        if distance_to_closest_stop > 3:
-            taxi_price = self.vehicles["taxi"].calculate_fare(distance_to_closest_stop)
-            taxi_time = self.vehicles["taxi"].calculate_taxi_time(
-                distance_to_closest_stop
-            )
-        else:
-            walking_time = user.calculate_walking_time(distance_to_closest_stop)
-
-        target_stop_distance = self.distance_calculator.calculate_distance(
-            target_location.get_latitude(),
-            target_location.get_longitude(),
-            final_target_stop.get_location().get_latitude(),
-            final_target_stop.get_location().get_longitude(),
-        )
-
-        if target_stop_distance > 3:
-            taxi_price += self.vehicles["taxi"].calculate_fare(target_stop_distance)
-            taxi_time += self.vehicles["taxi"].calculate_taxi_time(target_stop_distance)
-        else:
-            walking_time += user.calculate_walking_time(target_stop_distance)
-
-        route_obj.set_taxi_price(taxi_price)
-        route_obj.set_price(route_obj.get_price() + taxi_price)
-        route_obj.set_time(route_obj.get_time() + taxi_time + walking_time)
-        route_obj.set_routeName(routeName)
-        route_obj.set_distance(
-            route_obj.get_distance() + target_stop_distance + distance_to_closest_stop
-        )
-        return route_obj
-
-
-class TaxiRouteLogic(RouteLogic):
-    def __init__(self, taxi: Taxi):
-        self.__taxi = taxi
-
-    def calculateRoute(
-        self, stops, initial_stop, target_stop, user: Passenger, vehicle_bias
-    ):
-
-        distance = DistanceCalculator.calculate_distance(
-            user.get_passengerLocation().get_latitude(),
-            user.get_passengerLocation().get_longitude(),
-            user.get_passengerTargetLocation().get_latitude(),
-            user.get_passengerTargetLocation().get_longitude(),
-        )
-
-        if distance < 3:
-            route_info = RouteInfo(
-                route=[],
-                time=user.calculate_walking_time(distance),
-                distance=distance,
-                price=0,
-                routeName="🚶Yürüme Rotasi🚶",
-                vehicleBias=None,
-                routeLogic=self,
-            )
-            return route_info
-
-        taxi_fare = 0
-
-        taxi_fare = self.__taxi.calculate_fare(distance)
-
-        taxi_time = self.__taxi.calculate_taxi_time(distance)
-
-        route_info = RouteInfo(
-            route=[],
-            time=taxi_time,
-            distance=distance,
-            price=taxi_fare,
-            routeName="🚕Sadece taksi ile rota🚕",
-            vehicleBias="taxi",
-            routeLogic=self,
-        )
-        return route_info
-
-
-class RouteInfo:
-    def __init__(
-        self,
-        route,
-        time,
-        distance,
-        price,
-        routeName,
-        vehicleBias,
-        routeLogic: RouteLogic,
-    ):
-        self.__route = route
-        self.__time = time
-        self.__distance = distance
-        self.__price = price
-        self.__taxi_price = 0
-        self.__routeName = routeName
-        self.__vehicleBias = vehicleBias
-        self.__routeLogic = routeLogic
-
-    def get_route(self):
-        return self.__route
-
-    def get_time(self):
-        return self.__time
-
-    def get_distance(self):
-        return self.__distance
-
-    def get_price(self):
-        return self.__price
-
-    def get_taxi_price(self):
-        return self.__taxi_price
-
-    def get_routeName(self):
-        return self.__routeName
-
-    def get_vehicleBias(self):
-        return self.__vehicleBias
-
-    def get_routeLogic(self):
-        return self.__routeLogic
-
-    def set_route(self, route):
-        self.__route = route
-
-    def set_time(self, time):
-        self.__time = time
-
-    def set_distance(self, distance):
-        self.__distance = distance
-
-    def set_price(self, price):
-        self.__price = price
-
-    def set_taxi_price(self, taxi_price):
-        self.__taxi_price = taxi_price
-
-    def set_routeName(self, routeName):
-        self.__routeName = routeName
-
-    def set_vehicleBias(self, vehicleBias):
-        self.__vehicleBias = vehicleBias
-
-    def set_routeLogic(self, routeLogic):
-        self.__routeLogic = routeLogic
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QUrl, pyqtSignal
+
+from rota import (
+    Bus,
+    DistanceCalculator,
+    Elderly,
+    General,
+    JsonLinesSink,
+    KentKart,
+    KrediKarti,
+    Location,
+    Nakit,
+    ParetoRouteLogic,
+    Passenger,
+    RouteInfo,
+    RoutePlanner,
+    RouteQuery,
+    StopLoader,
+    Student,
+    Taxi,
+    TaxiRouteLogic,
+    Tram,
+    Vehicle,
+    instrumentation,
+)
 
 
-class StopIconFactory:
-    def create_icon(self, vehicleObj: Vehicle):
-        iconPath = vehicleObj.returnIconPath()
-        return folium.CustomIcon(iconPath, icon_size=(40, 40))
+class NetworkLayer(MacroElement):
+    # Durak ağını otobüs, tramvay ve aktarma için birer GeoJSON koleksiyonu
+    # olarak çizer; stiller özelliklerden türetilir
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+        {{ this._parent.get_name() }}.createPane("networkStops");
+        {{ this._parent.get_name() }}.getPane("networkStops").style.zIndex = 450;
+        var networkStyles = {
+            line: {weight: 6, opacity: 1},
+            arrow: {weight: 4, opacity: 1},
+        };
+        function addNetworkLayer(data, color, group) {
+            L.geoJSON(data, {
+                style: function (feature) {
+                    return Object.assign(
+                        {color: color}, networkStyles[feature.properties.kind]
+                    );
+                },
+                pointToLayer: function (feature, latlng) {
+                    return L.circleMarker(latlng, {
+                        pane: "networkStops",
+                        radius: 7,
+                        color: color,
+                        weight: 3,
+                        fillColor: "white",
+                        fillOpacity: 1,
+                    });
+                },
+                onEachFeature: function (feature, layer) {
+                    if (feature.properties.name) {
+                        var popup = document.createElement("div");
+                        popup.style.fontSize = "16pt";
+                        popup.textContent = feature.properties.name;
+                        layer.bindPopup(popup);
+                    }
+                },
+            }).addTo(group);
+        }
+        {%- for layer in this.layers %}
+        addNetworkLayer(
+            {{ layer.data|tojson }},
+            {{ layer.color|tojson }},
+            {{ layer.group.get_name() }}
+        );
+        {%- endfor %}
+        {% endmacro %}
+        """
+    )
 
+    def __init__(self, layers):
+        super().__init__()
+        self._name = "NetworkLayer"
+        self.layers = layers
+
+
+class RouteOverlayLayer(MacroElement):
+    # Rota katmanlarını sayfa yeniden yüklenmeden değiştiren JS fonksiyonunu
+    # ve ilk katman verisini haritaya ekler
+    _template = Template(
+        """
+        {% macro script(this, kwargs) %}
+        function updateRouteOverlays(overlays) {
+            var groups = {
+                {%- for name, group in this.groups.items() %}
+                {{ name|tojson }}: {{ group.get_name() }},
+                {%- endfor %}
+            };
+            Object.keys(groups).forEach(function (name) {
+                groups[name].clearLayers();
+                L.geoJSON(overlays[name], {
+                    style: function (feature) {
+                        return {
+                            color: feature.properties.color,
+                            weight: 8,
+                            opacity: 1,
+                            dashArray: "5, 5",
+                        };
+                    },
+                    pointToLayer: function (feature, latlng) {
+                        return L.marker(latlng, {
+                            icon: L.AwesomeMarkers.icon({
+                                icon: "info-sign",
+                                iconColor: "white",
+                                markerColor: feature.properties.color,
+                                prefix: "glyphicon",
+                            }),
+                        });
+                    },
+                    onEachFeature: function (feature, layer) {
+                        if (feature.properties.popup) {
+                            layer.bindPopup(feature.properties.popup);
+                        }
+                    },
+                }).addTo(groups[name]);
+            });
+        }
+        updateRouteOverlays({{ this.overlays|tojson }});
+        {% endmacro %}
+        """
+    )
 
-class StopPopupFactory:
-    @staticmethod
-    def create_popup(stop_name):
-        html = f'<div style="font-size: 16pt">{stop_name}</div>'
-        iframe = IFrame(html, width=200, height=70)
-        return folium.Popup(iframe, max_width=210, max_height=80)
+    def __init__(self, groups):
+        super().__init__()
+        self._name = "RouteOverlayLayer"
+        self.groups = groups
+        self.overlays = {name: [] for name in groups}
 
 
 class UI_Data:
@@ -997,6 +192,65 @@ class UI_Data:
         
         self.__routeList.clear()
 
+    def get_route_specs(self):
+        # Rotaları yeniden hesaplamak için (araç ağırlığı, rota mantığı, ad)
+        return [
+            (route.get_vehicleBias(), route.get_routeLogic(), route.get_routeName())
+            for route in self.__routeList
+        ]
+
+
+class RouteWorkerSignals(QObject):
+    progress = pyqtSignal(int, int, int)  # sorgu no, biten, toplam
+    finished = pyqtSignal(int, object, object)  # sorgu no, rotalar, RouteQuery
+    failed = pyqtSignal(int, str)
+
+
+class RouteWorker(QRunnable):
+    def __init__(self, generation, route_planner: RoutePlanner, user, route_specs):
+        super().__init__()
+        self.generation = generation
+        self.signals = RouteWorkerSignals()
+        self.__route_planner = route_planner
+        self.__user = user
+        self.__route_specs = route_specs
+        self.__cancelled = False
+
+    def cancel(self):
+        self.__cancelled = True
+
+    def is_cancelled(self):
+        return self.__cancelled
+
+    def run(self):
+        routes = []
+        try:
+            query = self.__route_planner.create_query(
+                self.__user, self.__user.get_passengerTargetLocation()
+            )
+            for vehicle_bias, route_logic, route_name in self.__route_specs:
+                # Yeni bir sorgu geldiyse kalan varyantlar hesaplanmaz
+                if self.__cancelled:
+                    return
+                routes.append(
+                    self.__route_planner.finalize_routes(
+                        self.__user,
+                        self.__user.get_passengerTargetLocation(),
+                        vehicle_bias,
+                        route_logic,
+                        route_name,
+                        query,
+                    )
+                )
+                self.signals.progress.emit(
+                    self.generation, len(routes), len(self.__route_specs)
+                )
+        except Exception as error:
+            self.signals.failed.emit(self.generation, str(error))
+            return
+        if not self.__cancelled:
+            self.signals.finished.emit(self.generation, routes, query)
+
 
 class MapInitializer:
     def __init__(
@@ -1009,7 +263,7 @@ class MapInitializer:
         zoom_start=13.5,
     ):
         self.__map = folium.Map(
-            location=[center_lat, center_lon], zoom_start=zoom_start
+            location=[center_lat, center_lon], zoom_start=zoom_start, prefer_canvas=True
         )
         self.__transfer_line_group = folium.FeatureGroup(name="Aktarma Hatları").add_to(
             self.__map
@@ -1022,8 +276,6 @@ class MapInitializer:
         self.__taxi_line_group = ui_data.get_vehicles()["taxi"].returnMarkerGroup()
         self.__vehicles = ui_data.get_vehicles()
         self.__stops = routePlannerObj.stops
-        self.__icon_factory = StopIconFactory()
-        self.__popup_factory = StopPopupFactory()
         self.__just_taxi_route = folium.FeatureGroup(
             name="Sadece Taksi İle Yolculuk"
         ).add_to(self.__map)
@@ -1059,12 +311,6 @@ class MapInitializer:
     def get_stops(self):
         return self.__stops
 
-    def get_icon_factory(self):
-        return self.__icon_factory
-
-    def get_popup_factory(self):
-        return self.__popup_factory
-
     def get_just_taxi_route(self):
         return self.__just_taxi_route
 
@@ -1098,152 +344,239 @@ class MapInitializer:
     def set_stops(self, stops):
         self.__stops = stops
 
-    def set_icon_factory(self, icon_factory):
-        self.__icon_factory = icon_factory
-
-    def set_popup_factory(self, popup_factory):
-        self.__popup_factory = popup_factory
-
     def set_just_taxi_route(self, just_taxi_route):
         self.__just_taxi_route = just_taxi_route
 
+    @instrumentation.timed("initialize_map")
     def initialize_map(self):
         MousePosition().add_to(self.__map)
 
         for vehicle in self.__vehicles.values():
             vehicle.returnMarkerGroup().add_to(self.__map)
 
-        for stop in self.__stops.values():
-            self.add_stop_marker(stop, self.__icon_factory, self.__popup_factory)
-
-        for stop_data in self.__stops.values():
-            for next_stop in stop_data.get_nextStops():
-                self.add_route_line(stop_data, next_stop)
-            self.add_transfer_line(stop_data, stop_data.get_transfers())
+        NetworkLayer(self.build_network_layers()).add_to(self.__map)
 
         self.__user_marker_group = folium.FeatureGroup(
             name="Kullanıcı Lokasyonları"
         ).add_to(self.__map)
-        folium.Marker(
-            [self.__user_location.get_latitude(), self.__user_location.get_longitude()],
-            popup="Başlangıç noktası",
-            icon=folium.Icon(color="darkblue"),
-        ).add_to(self.__user_marker_group)
-        folium.Marker(
-            [
-                self.__target_location.get_latitude(),
-                self.__target_location.get_longitude(),
-            ],
-            popup="Hedef noktası",
-            icon=folium.Icon(color="red"),
-        ).add_to(self.__user_marker_group)
-
-        new_route_list = []
-        for routeInfoObj in self.__ui_data.get_routeList():
-            updated_route = self.__routePlannerObj.finalize_routes(
-                self.__user,
-                self.__user.get_passengerTargetLocation(),
-                routeInfoObj.get_vehicleBias(),
-                routeInfoObj.get_routeLogic(),
-                routeInfoObj.get_routeName(),
+        # Durak ağı bir kez çizilir; sonraki sorgularda yalnızca bu katmanlar
+        # update_overlays ve runJavaScript ile güncellenir
+        self.__overlay_layer = RouteOverlayLayer(
+            {"user": self.__user_marker_group, "taxi": self.__taxi_line_group}
+        )
+        self.update_overlays(self.__user)
+        self.__overlay_layer.add_to(self.__map)
+
+    def update_overlays(self, user: Passenger, routes=None, query=None):
+        self.__user = user
+        self.__user_location = user.get_passengerLocation()
+        self.__target_location = user.get_passengerTargetLocation()
+        self.__overlays = {name: [] for name in self.__overlay_layer.groups}
+
+        self.add_overlay_marker(
+            "user", self.__user_location, "darkblue", "Başlangıç noktası"
+        )
+        self.add_overlay_marker("user", self.__target_location, "red", "Hedef noktası")
+
+        if query is None:
+            query = self.__routePlannerObj.create_query(
+                self.__user, self.__target_location
             )
-            new_route_list.append(updated_route)
+        # RouteWorker rotaları arka planda hesapladıysa yeniden hesaplanmaz
+        if routes is None:
+            routes = [
+                self.__routePlannerObj.finalize_routes(
+                    self.__user,
+                    self.__user.get_passengerTargetLocation(),
+                    vehicle_bias,
+                    route_logic,
+                    route_name,
+                    query,
+                )
+                for vehicle_bias, route_logic, route_name in (
+                    self.__ui_data.get_route_specs()
+                )
+            ]
         self.__ui_data.clear_routes()
-        self.__ui_data.set_routeList(new_route_list)
-        self.draw_taxi_line_if_needed(self.__ui_data.get_routeList()[0])
-        self.draw_just_taxi_route()
-
-    def add_stop_marker(self, stop, icon_factory, popup_factory):
-        markerGroup = self.__vehicles[stop.get_type()].returnMarkerGroup()
-        vehicleType = self.__vehicles[stop.get_type()]
-        icon = icon_factory.create_icon(vehicleType)
-        popup = popup_factory.create_popup(stop.get_name())
-
-        folium.Marker(
-            [stop.get_location().get_latitude(), stop.get_location().get_longitude()],
-            icon=icon,
-            popup=popup,
-        ).add_to(markerGroup)
-
-    def add_route_line(self, stop_data, next_stop):
-        next_stop_id = next_stop["stopId"]
-        next_stop_lat = self.__stops[next_stop_id].get_location().get_latitude()
-        next_stop_lon = self.__stops[next_stop_id].get_location().get_longitude()
-
-        line_color = self.__vehicles[stop_data.get_type()].linecolor
-        marker_group = self.__vehicles[stop_data.get_type()].returnMarkerGroup()
+        self.__ui_data.set_routeList(routes)
+        self.draw_taxi_line_if_needed(self.__ui_data.get_routeList()[0], query)
+        self.draw_just_taxi_route(query)
+        self.__overlay_layer.overlays = self.get_overlay_geojson()
+
+    def add_overlay_marker(self, group, location, color, popup):
+        self.__overlays[group].append(
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": [location.get_longitude(), location.get_latitude()],
+                },
+                "properties": {"color": color, "popup": popup},
+            }
+        )
 
-        line_coordinates = [
-            (
-                stop_data.get_location().get_latitude(),
-                stop_data.get_location().get_longitude(),
-            ),
-            (next_stop_lat, next_stop_lon),
-        ]
-        polyline = folium.PolyLine(
-            line_coordinates, color=line_color, weight=6, opacity=1
-        ).add_to(marker_group)
-        PolyLineTextPath(
-            polyline,
-            "→",
-            repeat=True,
-            offset=17,
-            attributes={"font-size": "72", "fill": line_color},
-        ).add_to(marker_group)
-
-    def add_transfer_line(self, stop_data, transfer):
-        if transfer is not None:
-            transfer_stop_id = transfer.get_transferStopId()
-            transfer_stop_lat = (
-                self.__stops[transfer_stop_id].get_location().get_latitude()
+    def add_overlay_line(self, group, line_coordinates, color):
+        # GeoJSON koordinatları (boylam, enlem) sırasındadır
+        self.__overlays[group].append(
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "LineString",
+                    "coordinates": [[lon, lat] for lat, lon in line_coordinates],
+                },
+                "properties": {"color": color},
+            }
+        )
+
+    def get_overlay_geojson(self):
+        return {
+            name: {"type": "FeatureCollection", "features": features}
+            for name, features in self.__overlays.items()
+        }
+
+    def overlay_script(self):
+        return f"updateRouteOverlays({json.dumps(self.get_overlay_geojson())});"
+
+    def build_network_layers(self):
+        layers = {}
+
+        def layer_for(name, color, group):
+            if name not in layers:
+                layers[name] = {
+                    "color": color,
+                    "group": group,
+                    "stops": [],
+                    "lines": [],
+                    "arrows": [],
+                    "segments": set(),
+                }
+            return layers[name]
+
+        def add_line(layer, stop_data, other_stop):
+            # Çift yönlü bağlantıların çizgisi bir kez, okları yön başına çizilir
+            segment = frozenset((stop_data.get_stopid(), other_stop.get_stopid()))
+            if segment not in layer["segments"]:
+                layer["segments"].add(segment)
+                layer["lines"].append(
+                    [
+                        self.to_coordinate(stop_data.get_location()),
+                        self.to_coordinate(other_stop.get_location()),
+                    ]
+                )
+
+        for stop_data in self.__stops.values():
+            vehicle = self.__vehicles[stop_data.get_type()]
+            layer = layer_for(
+                stop_data.get_type(), vehicle.linecolor, vehicle.returnMarkerGroup()
             )
-            transfer_stop_lon = (
-                self.__stops[transfer_stop_id].get_location().get_longitude()
+            layer["stops"].append(
+                {
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "Point",
+                        "coordinates": self.to_coordinate(stop_data.get_location()),
+                    },
+                    "properties": {"name": stop_data.get_name()},
+                }
             )
+            for next_stop in stop_data.get_nextStops():
+                target_stop = self.__stops[next_stop.stopId]
+                add_line(layer, stop_data, target_stop)
+                chevron = self.arrow_chevron(
+                    stop_data.get_location(), target_stop.get_location()
+                )
+                if chevron is not None:
+                    layer["arrows"].append(chevron)
 
-            line_coordinates = [
-                (
-                    stop_data.get_location().get_latitude(),
-                    stop_data.get_location().get_longitude(),
-                ),
-                (transfer_stop_lat, transfer_stop_lon),
-            ]
-            folium.PolyLine(
-                line_coordinates, color="purple", weight=6, opacity=1
-            ).add_to(self.__transfer_line_group)
+            transfer = stop_data.get_transfers()
+            if transfer is not None:
+                transfer_layer = layer_for(
+                    "transfer", "purple", self.__transfer_line_group
+                )
+                add_line(
+                    transfer_layer,
+                    stop_data,
+                    self.__stops[transfer.get_transferStopId()],
+                )
+
+        network_layers = []
+        for layer in layers.values():
+            features = []
+            for kind in ("lines", "arrows"):
+                if layer[kind]:
+                    features.append(
+                        {
+                            "type": "Feature",
+                            "geometry": {
+                                "type": "MultiLineString",
+                                "coordinates": layer[kind],
+                            },
+                            "properties": {"kind": kind[:-1]},
+                        }
+                    )
+            features.extend(layer["stops"])
+            network_layers.append(
+                {
+                    "color": layer["color"],
+                    "group": layer["group"],
+                    "data": {"type": "FeatureCollection", "features": features},
+                }
+            )
+        return network_layers
 
+    @staticmethod
+    def to_coordinate(location):
+        # GeoJSON sırası (boylam, enlem); 6 basamak ~10 cm hassasiyettir
+        return [round(location.get_longitude(), 6), round(location.get_latitude(), 6)]
+
+    @staticmethod
+    def arrow_chevron(start_location, end_location, arm_angle=30):
+        # Yön oku: bağlantının %55'ine yerleştirilen iki kollu çizgi
+        meters_per_degree = 111320
+        lon_scale = meters_per_degree * math.cos(
+            math.radians(start_location.get_latitude())
+        )
+        dx = (end_location.get_longitude() - start_location.get_longitude()) * lon_scale
+        dy = (
+            end_location.get_latitude() - start_location.get_latitude()
+        ) * meters_per_degree
+        length = math.hypot(dx, dy)
+        if length == 0:
+            return None
+
+        tip_x = dx * 0.55
+        tip_y = dy * 0.55
+        arm = min(length * 0.15, 80)
+        chevron = []
+        for angle in (arm_angle, None, -arm_angle):
+            if angle is None:
+                x, y = tip_x, tip_y
+            else:
+                theta = math.atan2(-dy, -dx) + math.radians(angle)
+                x = tip_x + arm * math.cos(theta)
+                y = tip_y + arm * math.sin(theta)
+            chevron.append(
+                [
+                    round(start_location.get_longitude() + x / lon_scale, 6),
+                    round(start_location.get_latitude() + y / meters_per_degree, 6),
+                ]
+            )
+        return chevron
+
+    @instrumentation.timed("save_map")
     def save_map(self, filename="map.html"):
         folium.LayerControl().add_to(self.__map)
         self.__map.save(filename)
         return os.path.abspath(filename)
 
-    def draw_taxi_line_if_needed(self, routeInfoObj: RouteInfo):
-        self.__taxi_line_group = folium.FeatureGroup(name="Taksi Yolu").add_to(
-            self.__map
-        )
-
+    def draw_taxi_line_if_needed(self, routeInfoObj: RouteInfo, query: RouteQuery):
         first_stop = routeInfoObj.get_route()[0]
         last_stop = routeInfoObj.get_route()[-1]
 
-        distance_user_to_first_stop = DistanceCalculator.calculate_distance(
-            self.__user_location.get_latitude(),
-            self.__user_location.get_longitude(),
-            first_stop.get_location().get_latitude(),
-            first_stop.get_location().get_longitude(),
-        )
-
-        distance_target_to_last_stop = DistanceCalculator.calculate_distance(
-            self.__target_location.get_latitude(),
-            self.__target_location.get_longitude(),
-            last_stop.get_location().get_latitude(),
-            last_stop.get_location().get_longitude(),
-        )
-        distance_user_to_target = DistanceCalculator.calculate_distance(
-            self.__user_location.get_latitude(),
-            self.__user_location.get_longitude(),
-            self.__target_location.get_latitude(),
-            self.__target_location.get_longitude(),
-        )
+        # Mesafeler rota varyantlarıyla paylaşılan sorgudan gelir
+        distance_user_to_first_stop = query.distance_from_start(first_stop)
+        distance_target_to_last_stop = query.distance_to_target(last_stop)
+        distance_user_to_target = query.get_direct_distance()
         distance_first_stop_to_target = DistanceCalculator.calculate_distance(
             first_stop.get_location().get_latitude(),
             first_stop.get_location().get_longitude(),
@@ -1266,9 +599,7 @@ class MapInitializer:
                     first_stop.get_location().get_longitude(),
                 ),
             ]
-            folium.PolyLine(
-                line_coordinates, color="yellow", weight=8, opacity=1, dash_array="5, 5"
-            ).add_to(self.__taxi_line_group)
+            self.add_overlay_line("taxi", line_coordinates, "yellow")
         else:
             line_coordinates = [
                 (
@@ -1280,9 +611,7 @@ class MapInitializer:
                     first_stop.get_location().get_longitude(),
                 ),
             ]
-            folium.PolyLine(
-                line_coordinates, color="blue", weight=8, opacity=1, dash_array="5, 5"
-            ).add_to(self.__user_marker_group)
+            self.add_overlay_line("user", line_coordinates, "blue")
 
         if distance_target_to_last_stop > 3:
             line_coordinates = [
@@ -1295,9 +624,7 @@ class MapInitializer:
                     last_stop.get_location().get_longitude(),
                 ),
             ]
-            folium.PolyLine(
-                line_coordinates, color="yellow", weight=8, opacity=1, dash_array="5, 5"
-            ).add_to(self.__taxi_line_group)
+            self.add_overlay_line("taxi", line_coordinates, "yellow")
         else:
             line_coordinates = [
                 (
@@ -1309,17 +636,10 @@ class MapInitializer:
                     last_stop.get_location().get_longitude(),
                 ),
             ]
-            folium.PolyLine(
-                line_coordinates, color="blue", weight=8, opacity=1, dash_array="5, 5"
-            ).add_to(self.__user_marker_group)
-
-    def draw_just_taxi_route(self):
-        distance = DistanceCalculator.calculate_distance(
-            self.__user_location.get_latitude(),
-            self.__user_location.get_longitude(),
-            self.__target_location.get_latitude(),
-            self.__target_location.get_longitude(),
-        )
+            self.add_overlay_line("user", line_coordinates, "blue")
+
+    def draw_just_taxi_route(self, query: RouteQuery):
+        distance = query.get_direct_distance()
         line_coordinates = [
             (self.__user_location.get_latitude(), self.__user_location.get_longitude()),
             (
@@ -1329,14 +649,12 @@ class MapInitializer:
         ]
         if distance > 3:
             lineColor = "orange"
-            routeGroup = self.__taxi_line_group
+            routeGroup = "taxi"
         else:
             lineColor = "blue"
-            routeGroup = self.__user_marker_group
+            routeGroup = "user"
 
-        folium.PolyLine(
-            line_coordinates, color=lineColor, weight=8, opacity=1, dash_array="5, 5"
-        ).add_to(routeGroup)
+        self.add_overlay_line(routeGroup, line_coordinates, lineColor)
 
 
 class RoutePlannerWidget(QWidget):
@@ -1358,6 +676,7 @@ class RoutePlannerWidget(QWidget):
         self.setLayout(main_layout)
         self.setMaximumWidth(400)
 
+    @instrumentation.timed("update_routes")
     def update_routes(self):
         routes = self.ui_data.get_routeList()
 
@@ -1382,20 +701,34 @@ class RoutePlannerWidget(QWidget):
             self.routes_list.addItem(route_text)
             return
 
+        # Tüm rotaların ilk/son durak mesafeleri tek seferde hesaplanır
+        transit_routes = [route for route in routes if route.get_route()]
+        first_stops = [route.get_route()[0] for route in transit_routes]
+        last_stops = [route.get_route()[-1] for route in transit_routes]
+        initial_stop_distances = DistanceCalculator.calculate_distances(
+            self.user.get_passengerLocation().get_latitude(),
+            self.user.get_passengerLocation().get_longitude(),
+            [stop.get_location().get_latitude() for stop in first_stops],
+            [stop.get_location().get_longitude() for stop in first_stops],
+        ).tolist()
+        target_stop_distances = DistanceCalculator.calculate_distances(
+            self.user.get_passengerTargetLocation().get_latitude(),
+            self.user.get_passengerTargetLocation().get_longitude(),
+            [stop.get_location().get_latitude() for stop in last_stops],
+            [stop.get_location().get_longitude() for stop in last_stops],
+        ).tolist()
+        stop_distances = {
+            id(route): distances
+            for route, distances in zip(
+                transit_routes, zip(initial_stop_distances, target_stop_distances)
+            )
+        }
+
         for routeObjects in routes:
             if len(routeObjects.get_route()) > 0:
-                distance_to_initial_stop = DistanceCalculator.calculate_distance(
-                    self.user.get_passengerLocation().get_latitude(),
-                    self.user.get_passengerLocation().get_longitude(),
-                    routeObjects.get_route()[0].get_location().get_latitude(),
-                    routeObjects.get_route()[0].get_location().get_longitude(),
-                )
-                distance_to_target_stop = DistanceCalculator.calculate_distance(
-                    self.user.get_passengerTargetLocation().get_latitude(),
-                    self.user.get_passengerTargetLocation().get_longitude(),
-                    routeObjects.get_route()[-1].get_location().get_latitude(),
-                    routeObjects.get_route()[-1].get_location().get_longitude(),
-                )
+                distance_to_initial_stop, distance_to_target_stop = stop_distances[
+                    id(routeObjects)
+                ]
                 if (
                     routeObjects.get_price() > credit_card_money_amount
                     and routeObjects.get_price() > cash_money_amount
@@ -1571,13 +904,23 @@ class UserInfoDialog(QDialog):
 
 
 class MainWindow(QMainWindow):
-    def __init__(self, map_file_location, route_planner, user, ui_data):
+    def __init__(
+        self, map_file_location, map_initializer, route_planner, user, ui_data
+    ):
         super().__init__()
         self.setWindowTitle("Rota Planlama Sistemi")
         self.setWindowIcon(QIcon(os.path.join(os.getcwd(), "appIcon.png")))
         self.route_planner = route_planner
         self.user = user
         self.ui_data = ui_data
+        self.map_initializer = map_initializer
+        self.map_loaded = False
+        # Rota önbellekleri iş parçacığı güvenli değildir; sorgular sırayla
+        # tek bir arka plan iş parçacığında çalışır
+        self.route_thread_pool = QThreadPool()
+        self.route_thread_pool.setMaxThreadCount(1)
+        self.route_worker = None
+        self.route_generation = 0
         self.current_start_location = user.get_passengerLocation()
         self.current_target_location = user.get_passengerTargetLocation()
 
@@ -1592,6 +935,7 @@ class MainWindow(QMainWindow):
 
         # Web görünümü (harita)
         self.browser = QWebEngineView()
+        self.browser.loadFinished.connect(self.on_map_loaded)
         self.browser.load(QUrl.fromLocalFile(map_file_location))
         main_layout.addWidget(self.browser)
 
@@ -1617,6 +961,12 @@ class MainWindow(QMainWindow):
         self.update_route_button.clicked.connect(self.update_route)
         input_layout.addWidget(self.update_route_button)
 
+        # Arka planda süren rota hesabının ilerlemesi
+        self.route_progress = QProgressBar()
+        self.route_progress.setFormat("Rota hesaplanıyor %v/%m")
+        self.route_progress.hide()
+        input_layout.addWidget(self.route_progress)
+
         # Kullanıcı bilgileri butonu
         self.user_info_button = QPushButton("Kullanıcı Bilgileri")
         self.user_info_button.clicked.connect(self.show_user_info_dialog)
@@ -1704,13 +1054,54 @@ class MainWindow(QMainWindow):
     def update_map_and_route(self, start_location, target_location):
         self.user.set_passengerLocation(start_location)
         self.user.set_passengerTargetLocation(target_location)
-        map_initializer = MapInitializer(
-            40.7933, 29.9515, self.route_planner, self.user, self.ui_data
+
+        # Yeni sorgu, sürmekte olan sorgunun sonucunu geçersiz kılar
+        if self.route_worker is not None:
+            self.route_worker.cancel()
+        self.route_generation += 1
+        route_specs = self.ui_data.get_route_specs()
+        worker = RouteWorker(
+            self.route_generation, self.route_planner, self.user, route_specs
         )
-        map_file = map_initializer.save_map()
-        self.browser.load(QUrl.fromLocalFile(map_file))
+        worker.signals.progress.connect(self.on_route_progress)
+        worker.signals.finished.connect(self.on_routes_ready)
+        worker.signals.failed.connect(self.on_route_failed)
+        self.route_worker = worker
+
+        self.route_progress.setRange(0, len(route_specs))
+        self.route_progress.setValue(0)
+        self.route_progress.show()
+        self.route_thread_pool.start(worker)
+
+    def on_route_progress(self, generation, done, total):
+        if generation == self.route_generation:
+            self.route_progress.setValue(done)
+
+    def on_routes_ready(self, generation, routes, query):
+        if generation != self.route_generation:
+            return
+        self.route_worker = None
+        self.route_progress.hide()
+        self.map_initializer.update_overlays(self.user, routes, query)
+        self.push_map_overlays()
         self.route_planner_widget.update_routes()
 
+    def on_route_failed(self, generation, message):
+        if generation != self.route_generation:
+            return
+        self.route_worker = None
+        self.route_progress.hide()
+        print(f"Rota hesaplanamadı: {message}")
+
+    def on_map_loaded(self, ok):
+        self.map_loaded = ok
+        # Sayfa yüklenirken yapılan güncellemeler kaybolmasın
+        self.push_map_overlays()
+
+    def push_map_overlays(self):
+        if self.map_loaded:
+            self.browser.page().runJavaScript(self.map_initializer.overlay_script())
+
     def show_user_info_dialog(self):
         dialog = UserInfoDialog(self)
 
@@ -1803,12 +1194,16 @@ class MainWindow(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    stops = StopLoader.load_stops_from_json("veriseti.json")
+    # ROTA_METRICS=metrics.jsonl ile aşama süreleri ve sayaçlar dosyaya yazılır
+    if os.environ.get("ROTA_METRICS"):
+        instrumentation.add_sink(JsonLinesSink(os.environ["ROTA_METRICS"]))
+    # İlk çalıştırmada veriseti.snapshot yazılır, sonrakiler JSON'u çözümlemez
+    stops, compiled_graph, taxi_fees = StopLoader.load_dataset("veriseti.json")
     distance_calculator = DistanceCalculator()
 
     taxi_feature_group = folium.FeatureGroup(name="Taksi Yolu")
     taxi = Taxi(0, 0, taxi_feature_group)
-    taxi.set_fees("veriseti.json")
+    taxi.set_fee_values(taxi_fees)
 
     vehicles = {
         "bus": Bus("busIcon.png", folium.FeatureGroup(name="Otobüs Durakları")),
@@ -1816,10 +1211,26 @@ if __name__ == "__main__":
         "taxi": taxi,
     }
     route_planner = RoutePlanner(stops, vehicles, distance_calculator)
-    standard_route_logic = bellmanFord_Standard()
-    least_stops_route_logic = bellmanFord_LeastStops()
+    standard_route_logic = ParetoRouteLogic(ParetoRouteLogic.OPTIMAL, compiled_graph)
+    least_stops_route_logic = ParetoRouteLogic(
+        ParetoRouteLogic.LEAST_STOPS, compiled_graph, standard_route_logic
+    )
     taxi_route_logic = TaxiRouteLogic(taxi)
 
+    # "python build_all_pairs.py veriseti.json veriseti.apsp" veya
+    # "python build_contraction_hierarchy.py veriseti.json veriseti.ch" ile üretilir
+    # Tablo ya da hiyerarşi yalnızca en iyi rotayı hızlandırır; otobüs ve
+    # tramvay ağırlıklı rotalar her durumda Pareto cephesinden seçilir
+    optimal_route_logic = standard_route_logic
+    if os.path.exists("veriseti.apsp"):
+        optimal_route_logic = route_planner.load_all_pairs_table(
+            "veriseti.apsp", compiled_graph
+        )
+    elif os.path.exists("veriseti.ch"):
+        optimal_route_logic = route_planner.load_contraction_hierarchy(
+            "veriseti.ch", compiled_graph
+        )
+
     user_location = Location(40.80056, 29.97302)
     target_location = Location(40.77736, 29.8956)
     user = General("Genel", user_location, target_location, None, None, None)
@@ -1832,7 +1243,7 @@ if __name__ == "__main__":
         user,
         user.get_passengerTargetLocation(),
         "None",
-        standard_route_logic,
+        optimal_route_logic,
         "🏁En Optimal Rota🏁",
     )
     ui_data.add_route(mostOptimizedRoute)
@@ -1871,6 +1282,6 @@ if __name__ == "__main__":
 
     map_initializer = MapInitializer(40.7933, 29.9515, route_planner, user, ui_data)
     map_file = map_initializer.save_map()
-    window = MainWindow(map_file, route_planner, user, ui_data)
+    window = MainWindow(map_file, map_initializer, route_planner, user, ui_data)
     window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,153 @@
+import argparse
+import functools
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+from batch_routing import (
+    calculate_isochrones,
+    create_passenger,
+    detect_format,
+    init_worker,
+    read_pairs,
+    read_updates,
+)
+
+
+def chunk_rows(pairs, chunk_size):
+    chunk = []
+    for indexed_row in pairs:
+        chunk.append(indexed_row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def isochrone_chunk(chunk, max_time, max_fare, bands, use_taxi):
+    # Bir parçadaki tüm başlangıçlar tek reachable_batch çağrısıyla hesaplanır
+    results = []
+    users = []
+    for line_number, row in chunk:
+        row_id = row.get("id", line_number) if isinstance(row, dict) else line_number
+        if isinstance(row, dict) and row.get("error"):
+            results.append({"id": row_id, "error": row["error"]})
+            continue
+        try:
+            users.append(create_passenger(row, require_target=False))
+        except (AttributeError, KeyError, TypeError, ValueError) as error:
+            results.append({"id": row_id, "error": f"Geçersiz satır: {error}"})
+            continue
+        results.append({"id": row_id})
+    collections = iter(calculate_isochrones(users, max_time, max_fare, bands, use_taxi))
+    for result in results:
+        if "error" not in result:
+            result.update(next(collections))
+    return results
+
+
+def parse_bands(value):
+    return [float(band) for band in value.split(",") if band.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Başlangıç noktalarından süre ve ücret bütçesi içinde "
+        "ulaşılabilen durakları toplu olarak hesaplar."
+    )
+    parser.add_argument("input", help="start_lat/start_lon içeren CSV veya JSONL")
+    parser.add_argument(
+        "output",
+        help="GeoJSON (.geojson, tek FeatureCollection) veya JSONL "
+        "(her başlangıç için bir FeatureCollection)",
+    )
+    parser.add_argument("--data", default="veriseti.json", help="Durak veri seti")
+    parser.add_argument("--max-time", type=float, required=True, help="Süre bütçesi")
+    parser.add_argument("--max-fare", type=float, help="Ücret bütçesi (TL)")
+    parser.add_argument(
+        "--bands",
+        type=parse_bands,
+        help="Virgülle ayrılmış süre bantları; her biri için bir çokgen üretilir",
+    )
+    parser.add_argument(
+        "--no-taxi", action="store_true", help="Duraklara taksiyle erişimi kapat"
+    )
+    parser.add_argument(
+        "--updates",
+        help="Hesaplamadan önce uygulanacak ağ güncellemelerinin JSON listesi",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--input-format", choices=["csv", "jsonl"])
+    parser.add_argument(
+        "--metrics",
+        help="Aşama sürelerinin ve arama sayaçlarının yazılacağı JSON lines dosyası",
+    )
+    args = parser.parse_args(argv)
+
+    updates = []
+    if args.updates:
+        try:
+            updates = read_updates(args.updates, args.data)
+        except ValueError as error:
+            parser.error(str(error))
+
+    pairs = read_pairs(args.input, detect_format(args.input, args.input_format))
+    calculate = functools.partial(
+        isochrone_chunk,
+        max_time=args.max_time,
+        max_fare=args.max_fare,
+        bands=args.bands,
+        use_taxi=not args.no_taxi,
+    )
+    as_collection = args.output.lower().endswith(".geojson")
+    origin_count = 0
+    if args.metrics:
+        open(args.metrics, "w").close()
+    with open(args.output, "w", encoding="utf-8") as file:
+        if as_collection:
+            file.write('{"type": "FeatureCollection", "features": [')
+        first_feature = True
+
+        def write(results):
+            nonlocal first_feature
+            for result in results:
+                if not as_collection:
+                    file.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    continue
+                if "error" in result:
+                    print(f"{result['id']}: {result['error']}", file=sys.stderr)
+                    continue
+                # Tek koleksiyonda her öğe başlangıcın kimliğini taşır
+                for feature in result["features"]:
+                    feature["properties"]["origin"] = result["id"]
+                    if not first_feature:
+                        file.write(",")
+                    file.write(json.dumps(feature, ensure_ascii=False))
+                    first_feature = False
+
+        chunks = chunk_rows(pairs, args.chunk_size)
+        if args.workers <= 1:
+            init_worker(args.data, [], None, args.metrics, False, updates)
+            for results in map(calculate, chunks):
+                write(results)
+                origin_count += len(results)
+        else:
+            with Pool(
+                args.workers,
+                initializer=init_worker,
+                initargs=(args.data, [], None, args.metrics, False, updates),
+            ) as pool:
+                for results in pool.imap(calculate, chunks):
+                    write(results)
+                    origin_count += len(results)
+        if as_collection:
+            file.write("]}\n")
+    print(f"{origin_count} başlangıç noktası işlendi: {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
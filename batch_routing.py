@@ -0,0 +1,357 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+from rota import (
+    DistanceCalculator,
+    Elderly,
+    EventBuffer,
+    General,
+    IsochroneSearch,
+    JsonLinesSink,
+    Location,
+    ParetoRouteLogic,
+    RoutePlanner,
+    StopLoader,
+    Student,
+    Taxi,
+    TaxiRouteLogic,
+    instrumentation,
+)
+
+PASSENGER_TYPES = {
+    "Genel": General,
+    "General": General,
+    "Öğrenci": Student,
+    "Student": Student,
+    "Yaşlı": Elderly,
+    "Elderly": Elderly,
+}
+
+# varyant adı: (araç ağırlığı, rota mantığı, rota adı)
+ROUTE_VARIANTS = {
+    "optimal": ("None", "standard", "🏁En Optimal Rota🏁"),
+    "bus": ("bus", "frontier", "🚌Otobüs ağırlıklı rota🚌"),
+    "tram": ("tram", "frontier", "🚋Tramvay ağırlıklı rota🚋"),
+    "least_stops": ("None", "least_stops", "🛑En az aktarmalı rota🛑"),
+    "taxi": ("taxi", "taxi", "🚕Sadece Taksi Kullanarak Yolculuk🚕"),
+}
+
+OUTPUT_FIELDS = [
+    "id",
+    "variant",
+    "routeName",
+    "time",
+    "distance",
+    "price",
+    "taxi_price",
+    "stops",
+    "error",
+]
+
+# Her işçi süreç veriyi bir kez yükler
+_worker_state = {}
+
+
+def init_worker(
+    json_file,
+    variants,
+    hierarchy_file=None,
+    metrics_file=None,
+    buffer_metrics=False,
+    updates=(),
+):
+    # metrics_file: ölçümler her işçiden aynı JSON lines dosyasına eklenir.
+    # buffer_metrics: ölçümler biriktirilir ve route_server'a sonuçla döner.
+    # updates: yüklemeden sonra uygulanacak ağ güncellemeleri.
+    if metrics_file:
+        instrumentation.add_sink(JsonLinesSink(metrics_file))
+    if buffer_metrics:
+        _worker_state["metrics_buffer"] = instrumentation.add_sink(EventBuffer())
+    stops, graph, taxi_fees = StopLoader.load_dataset(json_file)
+    taxi = Taxi(0, 0, None)
+    taxi.set_fee_values(taxi_fees)
+    route_planner = RoutePlanner(stops, {"taxi": taxi}, DistanceCalculator())
+    frontier_route_logic = ParetoRouteLogic(ParetoRouteLogic.OPTIMAL, graph)
+    least_stops_route_logic = ParetoRouteLogic(
+        ParetoRouteLogic.LEAST_STOPS, graph, frontier_route_logic
+    )
+    standard_route_logic = frontier_route_logic
+    if hierarchy_file:
+        # Hiyerarşi yalnızca en iyi rotayı hızlandırır; ağırlıksız puan cephe
+        # ölçütlerinin doğrusal birleşimi olduğundan sonuç aynıdır. Otobüs ve
+        # tramvay ağırlıklı rotalar her iki durumda da en az aktarmalı rotayla
+        # paylaşılan Pareto cephesinden seçilir.
+        standard_route_logic = route_planner.load_contraction_hierarchy(
+            hierarchy_file, graph
+        )
+    _worker_state["route_planner"] = route_planner
+    _worker_state["graph"] = graph
+    _worker_state["network_version"] = 0
+    _worker_state["logics"] = {
+        "standard": standard_route_logic,
+        "frontier": frontier_route_logic,
+        "least_stops": least_stops_route_logic,
+        "taxi": TaxiRouteLogic(taxi),
+    }
+    _worker_state["variants"] = variants
+    apply_network_updates(list(enumerate(updates, start=1)))
+
+
+def apply_network_updates(updates):
+    # updates: sürüme göre sıralı (sürüm, güncelleme) çiftleri. İşçi yalnızca
+    # kendi sürümünden yeni kayıtları uygular; günlük sıkıştırılmış olabilir
+    applied = _worker_state["network_version"]
+    for version, update in updates:
+        if version > applied:
+            _worker_state["route_planner"].apply_update(_worker_state["graph"], update)
+    if updates:
+        _worker_state["network_version"] = max(applied, updates[-1][0])
+
+
+def read_updates(updates_file, json_file):
+    # Güncelleme listesi işçiler başlamadan bir kez doğrulanır
+    with open(updates_file, "r", encoding="utf-8") as file:
+        updates = json.load(file)
+    if not isinstance(updates, list):
+        raise ValueError("Güncelleme dosyası bir JSON listesi olmalı!")
+    graph = StopLoader.load_dataset(json_file)[1]
+    for update in updates:
+        graph.apply_update(update)
+    return updates
+
+
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "evet", "e")
+
+
+def create_passenger(row, require_target=True):
+    # require_target=False: erişilebilirlik sorgularında hedef başlangıç olur
+    passenger_type = str(row.get("passenger_type") or "Genel").strip()
+    if passenger_type not in PASSENGER_TYPES:
+        raise ValueError(f"Bilinmeyen yolcu tipi: {passenger_type}")
+    start = Location(float(row["start_lat"]), float(row["start_lon"]))
+    if require_target or row.get("target_lat") not in (None, ""):
+        target = Location(float(row["target_lat"]), float(row["target_lon"]))
+    else:
+        target = start
+    return PASSENGER_TYPES[passenger_type](
+        passenger_type,
+        start,
+        target,
+        is_special_day=parse_bool(row.get("special_day", False)),
+    )
+
+
+def drain_metric_events():
+    # buffer_metrics ile başlatılmış işçide biriken ölçümleri döndürür
+    metrics_buffer = _worker_state.get("metrics_buffer")
+    if metrics_buffer is None:
+        return None
+    return metrics_buffer.drain()
+
+
+def create_query(user):
+    # Bir çiftin tüm varyantları durak eşlemesini ve mesafeleri paylaşır
+    return _worker_state["route_planner"].create_query(
+        user, user.get_passengerTargetLocation()
+    )
+
+
+def calculate_variant(user, variant, query=None):
+    vehicle_bias, logic_name, route_name = ROUTE_VARIANTS[variant]
+    return _worker_state["route_planner"].finalize_routes(
+        user,
+        user.get_passengerTargetLocation(),
+        vehicle_bias,
+        _worker_state["logics"][logic_name],
+        route_name,
+        query,
+    )
+
+
+def calculate_isochrones(users, max_time, max_fare=None, bands=None, use_taxi=True):
+    # Başlangıçların erişim süreleri tek bir mesafe matrisinden hesaplanır
+    search = _worker_state.get("isochrone_search")
+    if search is None:
+        search = IsochroneSearch(_worker_state["route_planner"], _worker_state["graph"])
+        _worker_state["isochrone_search"] = search
+    return [
+        isochrone.to_geojson(bands)
+        for isochrone in search.reachable_batch(
+            users, max_time, max_fare, use_taxi=use_taxi
+        )
+    ]
+
+
+def route_pair(indexed_row):
+    line_number, row = indexed_row
+    row_id = row.get("id", line_number) if isinstance(row, dict) else line_number
+    if isinstance(row, dict) and row.get("error"):
+        # read_pairs'in okuyamadığı satır
+        return [{"id": row_id, "error": row["error"]}]
+    try:
+        user = create_passenger(row)
+    except (AttributeError, KeyError, TypeError, ValueError) as error:
+        return [{"id": row_id, "error": f"Geçersiz satır: {error}"}]
+
+    results = []
+    query = create_query(user)
+    for variant in _worker_state["variants"]:
+        # Bir varyantın hatası (ör. ulaşılamayan uçlar) toplu işi durdurmaz
+        try:
+            route_obj = calculate_variant(user, variant, query)
+        except (KeyError, ValueError) as error:
+            results.append(
+                {
+                    "id": row_id,
+                    "variant": variant,
+                    "error": f"Rota hesaplanamadı: {error}",
+                }
+            )
+            continue
+        results.append(
+            {
+                "id": row_id,
+                "variant": variant,
+                "routeName": route_obj.get_routeName(),
+                "time": route_obj.get_time(),
+                "distance": route_obj.get_distance(),
+                "price": route_obj.get_price(),
+                "taxi_price": route_obj.get_taxi_price(),
+                "stops": ">".join(stop.get_stopid() for stop in route_obj.get_route()),
+                "error": "",
+            }
+        )
+    return results
+
+
+def read_pairs(input_file, input_format):
+    with open(input_file, "r", encoding="utf-8", newline="") as file:
+        if input_format == "csv":
+            for line_number, row in enumerate(csv.DictReader(file), start=1):
+                yield line_number, row
+        else:
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                # Bozuk bir satır tüm dosyayı durdurmaz, hata satırı olarak yazılır
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError as error:
+                    yield line_number, {
+                        "id": line_number,
+                        "error": f"Geçersiz JSON satırı: {error}",
+                    }
+
+
+class RouteWriter:
+    def __init__(self, file, output_format):
+        self.__file = file
+        self.__output_format = output_format
+        self.__csv_writer = None
+        if output_format == "csv":
+            self.__csv_writer = csv.DictWriter(
+                file, fieldnames=OUTPUT_FIELDS, extrasaction="ignore"
+            )
+            self.__csv_writer.writeheader()
+
+    def write(self, row):
+        if self.__csv_writer is not None:
+            self.__csv_writer.writerow(row)
+        else:
+            self.__file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def detect_format(path, requested_format):
+    if requested_format:
+        return requested_format
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Başlangıç-hedef çiftlerini arayüz olmadan toplu olarak rotalar."
+    )
+    parser.add_argument("input", help="CSV veya JSONL başlangıç-hedef dosyası")
+    parser.add_argument("output", help="CSV veya JSONL çıktı dosyası")
+    parser.add_argument("--data", default="veriseti.json", help="Durak veri seti")
+    parser.add_argument(
+        "--variants",
+        default=",".join(ROUTE_VARIANTS),
+        help="Virgülle ayrılmış rota varyantları: " + ", ".join(ROUTE_VARIANTS),
+    )
+    parser.add_argument(
+        "--hierarchy",
+        help="build_contraction_hierarchy.py ile üretilmiş hiyerarşi dosyası; "
+        "yalnızca en iyi rotayı hızlandırır, seçim kuralları aynı kalır",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--input-format", choices=["csv", "jsonl"])
+    parser.add_argument(
+        "--metrics",
+        help="Aşama sürelerinin ve arama sayaçlarının yazılacağı JSON lines dosyası",
+    )
+    parser.add_argument("--output-format", choices=["csv", "jsonl"])
+    parser.add_argument(
+        "--updates",
+        help="Rotalamadan önce uygulanacak ağ güncellemelerinin JSON listesi",
+    )
+    args = parser.parse_args(argv)
+
+    variants = [variant.strip() for variant in args.variants.split(",") if variant]
+    for variant in variants:
+        if variant not in ROUTE_VARIANTS:
+            parser.error(f"Bilinmeyen varyant: {variant}")
+    updates = []
+    if args.updates:
+        try:
+            updates = read_updates(args.updates, args.data)
+        except ValueError as error:
+            parser.error(str(error))
+
+    pairs = read_pairs(args.input, detect_format(args.input, args.input_format))
+    output_format = detect_format(args.output, args.output_format)
+    row_count = 0
+    if args.metrics:
+        # İşçiler dosyaya ekleme yapar; önceki çalıştırmanın satırları silinir
+        open(args.metrics, "w").close()
+    with open(args.output, "w", encoding="utf-8", newline="") as file:
+        writer = RouteWriter(file, output_format)
+        if args.workers <= 1:
+            init_worker(
+                args.data, variants, args.hierarchy, args.metrics, False, updates
+            )
+            for rows in map(route_pair, pairs):
+                for row in rows:
+                    writer.write(row)
+                row_count += 1
+        else:
+            with Pool(
+                args.workers,
+                initializer=init_worker,
+                initargs=(
+                    args.data,
+                    variants,
+                    args.hierarchy,
+                    args.metrics,
+                    False,
+                    updates,
+                ),
+            ) as pool:
+                for rows in pool.imap(route_pair, pairs, chunksize=args.chunk_size):
+                    for row in rows:
+                        writer.write(row)
+                    row_count += 1
+    print(f"{row_count} başlangıç-hedef çifti işlendi: {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from rota import (
+    ContractionHierarchy,
+    ContractionHierarchyRouteLogic,
+    DistanceCalculator,
+    General,
+    Location,
+    ParetoRouteLogic,
+    RoutePlanner,
+    StopLoader,
+    Taxi,
+    TaxiRouteLogic,
+    aStar_Bidirectional,
+    aStar_Standard,
+    bellmanFord_LeastStops,
+    bellmanFord_Standard,
+    dijkstra_Standard,
+)
+from network_generator import generate_network, write_network
+
+
+def peak_rss_mb():
+    # Linux'ta ru_maxrss KB cinsindendir
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(results, size, stage, function, operations=1, trace_memory=False):
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    value = function()
+    elapsed = time.perf_counter() - start
+    traced_peak = None
+    if trace_memory:
+        traced_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    row = {
+        "stops": size,
+        "stage": stage,
+        "operations": operations,
+        "seconds": elapsed,
+        "ms_per_op": elapsed * 1000 / operations,
+        "ops_per_second": operations / elapsed if elapsed > 0 else float("inf"),
+        "peak_rss_mb": peak_rss_mb(),
+        "traced_peak_mb": traced_peak,
+    }
+    results.append(row)
+    print(format_row(row), flush=True)
+    return value
+
+
+def format_row(row):
+    traced = (
+        f"{row['traced_peak_mb']:9.1f}" if row["traced_peak_mb"] is not None else "        -"
+    )
+    return (
+        f"{row['stops']:>9} {row['stage']:<36} {row['operations']:>6} "
+        f"{row['ms_per_op']:>12.3f} {row['ops_per_second']:>12.1f} "
+        f"{row['peak_rss_mb']:>10.1f} {traced}"
+    )
+
+
+def random_location(rng, lats, lons):
+    return Location(rng.uniform(min(lats), max(lats)), rng.uniform(min(lons), max(lons)))
+
+
+def run_scale(size, args, results, work_dir):
+    data_file = os.path.join(work_dir, f"network_{size}.json")
+    write_network(
+        generate_network(
+            size,
+            tram_ratio=args.tram_ratio,
+            fan_out=args.fan_out,
+            transfer_ratio=args.transfer_ratio,
+            seed=args.seed,
+        ),
+        data_file,
+    )
+
+    stops = measure(
+        results,
+        size,
+        "StopLoader.load_stops_from_json",
+        lambda: StopLoader.load_stops_from_json(data_file),
+        trace_memory=args.trace_memory,
+    )
+    graph = measure(
+        results,
+        size,
+        "StopLoader.compile_graph",
+        lambda: StopLoader.compile_graph(stops),
+        trace_memory=args.trace_memory,
+    )
+    measure(
+        results,
+        size,
+        "StopLoader.load_dataset (JSON)",
+        lambda: StopLoader.load_dataset(data_file),
+        trace_memory=args.trace_memory,
+    )
+    _, _, taxi_fees = measure(
+        results,
+        size,
+        "StopLoader.load_dataset (snapshot)",
+        lambda: StopLoader.load_dataset(data_file),
+        trace_memory=args.trace_memory,
+    )
+    taxi = Taxi(0, 0, None)
+    taxi.set_fee_values(taxi_fees)
+    route_planner = measure(
+        results,
+        size,
+        "RoutePlanner (spatial index)",
+        lambda: RoutePlanner(stops, {"taxi": taxi}, DistanceCalculator(), 0),
+        trace_memory=args.trace_memory,
+    )
+
+    rng = random.Random(args.seed)
+    lats = [stop.get_location().get_latitude() for stop in stops.values()]
+    lons = [stop.get_location().get_longitude() for stop in stops.values()]
+    locations = [random_location(rng, lats, lons) for _ in range(args.queries * 2)]
+    measure(
+        results,
+        size,
+        "RoutePlanner.find_nearest_stop",
+        lambda: [route_planner.find_nearest_stop(location) for location in locations],
+        operations=len(locations),
+    )
+
+    stop_list = list(stops.values())
+    pairs = [(rng.choice(stop_list), rng.choice(stop_list)) for _ in range(args.queries)]
+    user = General("Genel", locations[0], locations[1])
+    standard_route_logic = dijkstra_Standard(graph)
+    logics = [
+        ("dijkstra_Standard", standard_route_logic),
+        ("aStar_Standard", aStar_Standard(graph)),
+        ("aStar_Bidirectional", aStar_Bidirectional(graph)),
+        ("TaxiRouteLogic", TaxiRouteLogic(taxi)),
+    ]
+    if size <= args.max_hierarchy_stops:
+        hierarchy = measure(
+            results,
+            size,
+            "ContractionHierarchy.build",
+            lambda: ContractionHierarchy.build(
+                graph, os.path.join(work_dir, f"network_{size}.ch"), [(user, "None")]
+            ),
+            trace_memory=args.trace_memory,
+        )
+        logics.append(
+            ("ContractionHierarchy", ContractionHierarchyRouteLogic(hierarchy))
+        )
+    # Pareto cephesi uzun yolculuklarda hızla büyür
+    if size <= args.max_pareto_stops:
+        logics.append(
+            ("ParetoRouteLogic", ParetoRouteLogic(ParetoRouteLogic.OPTIMAL, graph))
+        )
+    if size <= args.max_bellman_ford_stops:
+        logics.append(("bellmanFord_Standard", bellmanFord_Standard(graph)))
+        logics.append(("bellmanFord_LeastStops", bellmanFord_LeastStops(graph)))
+
+    for name, route_logic in logics:
+        failures = []
+
+        def calculate_all():
+            for initial, target in pairs:
+                try:
+                    route_logic.calculateRoute(stops, initial, target, user, "None")
+                except RuntimeError as error:
+                    # Bellman-Ford'un negatif döngü koruması sorguyu hatayla bitirir
+                    failures.append(str(error))
+
+        measure(
+            results,
+            size,
+            f"{name}.calculateRoute",
+            calculate_all,
+            operations=len(pairs),
+        )
+        if failures:
+            results[-1]["errors"] = len(failures)
+            print(f"{'':>9} {len(failures)} sorgu hata verdi: {failures[0]}")
+
+    def finalize_all():
+        for start, target in zip(locations[0::2], locations[1::2]):
+            user.set_passengerLocation(start)
+            user.set_passengerTargetLocation(target)
+            route_planner.finalize_routes(
+                user, target, "None", standard_route_logic, "🏁En Optimal Rota🏁"
+            )
+
+    measure(
+        results,
+        size,
+        "RoutePlanner.finalize_routes",
+        finalize_all,
+        operations=args.queries,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Sentetik ağlar üzerinde rota motorunu ölçekli olarak ölçer."
+    )
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--tram-ratio", type=float, default=0.3)
+    parser.add_argument("--fan-out", type=int, default=3)
+    parser.add_argument("--transfer-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=1881)
+    parser.add_argument(
+        "--max-bellman-ford-stops",
+        type=int,
+        default=5000,
+        help="Bellman-Ford motorlarının ölçüleceği en büyük durak sayısı",
+    )
+    parser.add_argument(
+        "--max-pareto-stops",
+        type=int,
+        default=5000,
+        help="ParetoRouteLogic motorunun ölçüleceği en büyük durak sayısı",
+    )
+    parser.add_argument(
+        "--max-hierarchy-stops",
+        type=int,
+        default=1000,
+        help="Daraltma hiyerarşisinin kurulup ölçüleceği en büyük durak sayısı",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Yükleme aşamalarında tracemalloc ile tepe belleği ölç (yavaşlatır)",
+    )
+    parser.add_argument("--json", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    print(
+        f"{'durak':>9} {'aşama':<36} {'işlem':>6} {'ms/işlem':>12} "
+        f"{'işlem/sn':>12} {'RSS MB':>10} {'iz MB':>9}"
+    )
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in sizes:
+            run_scale(size, args, results, work_dir)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
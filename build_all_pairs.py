@@ -0,0 +1,17 @@
+import sys
+
+from rota import AllPairsTable, StopLoader
+
+
+def main(argv):
+    if len(argv) != 3:
+        print("Kullanım: python build_all_pairs.py veriseti.json veriseti.apsp")
+        return 1
+    _, graph, _ = StopLoader.load_dataset(argv[1])
+    AllPairsTable.build(graph, argv[2])
+    print(f"{graph.stop_count()} durak için tablo yazıldı: {argv[2]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,25 @@
+import sys
+import time
+
+from rota import ContractionHierarchy, StopLoader
+
+
+def main(argv):
+    if len(argv) != 3:
+        print(
+            "Kullanım: python build_contraction_hierarchy.py veriseti.json veriseti.ch"
+        )
+        return 1
+    _, graph, _ = StopLoader.load_dataset(argv[1])
+    start = time.perf_counter()
+    hierarchy = ContractionHierarchy.build(graph, argv[2])
+    print(
+        f"{graph.stop_count()} durak, {len(hierarchy.get_profiles())} profil, "
+        f"{hierarchy.hierarchy_count()} hiyerarşi yazıldı: {argv[2]} "
+        f"({time.perf_counter() - start:.1f} sn)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,194 @@
+import argparse
+import json
+import math
+import random
+import sys
+
+VEHICLE_SPEEDS = {"bus": 25.0, "tram": 30.0}  # km/saat
+BASE_FARES = {"bus": 2.5, "tram": 2.0}
+FARE_PER_KM = {"bus": 0.25, "tram": 0.2}
+KM_PER_DEGREE = 111.195
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 6371 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def make_edge(stop, next_stop, rng):
+    distance = haversine(stop["lat"], stop["lon"], next_stop["lat"], next_stop["lon"])
+    # Yol mesafesi kuş uçuşundan biraz uzundur
+    distance = round(max(0.1, distance * rng.uniform(1.05, 1.4)), 2)
+    minutes = distance / VEHICLE_SPEEDS[next_stop["type"]] * 60
+    fare = BASE_FARES[next_stop["type"]] + distance * FARE_PER_KM[next_stop["type"]]
+    return {
+        "stopId": next_stop["id"],
+        "mesafe": distance,
+        "sure": max(1, round(minutes)),
+        "ucret": round(fare, 2),
+    }
+
+
+def generate_network(
+    stop_count,
+    tram_ratio=0.3,
+    fan_out=3,
+    transfer_ratio=0.3,
+    line_length=25,
+    max_transfer_km=0.5,
+    center=(40.7933, 29.9515),
+    seed=1881,
+):
+    rng = random.Random(seed)
+    # Şehir alanı durak sayısıyla büyür; durak yoğunluğu sabit kalır
+    radius_km = max(3.0, math.sqrt(stop_count) * 0.35)
+    lat_span = radius_km / KM_PER_DEGREE
+    lon_span = radius_km / (KM_PER_DEGREE * math.cos(math.radians(center[0])))
+    step_km = radius_km * 2 / line_length
+
+    stops = []
+    lines = []
+    while len(stops) < stop_count:
+        stop_type = "tram" if rng.random() < tram_ratio else "bus"
+        length = min(line_length, stop_count - len(stops))
+        lat = center[0] + rng.uniform(-lat_span, lat_span)
+        lon = center[1] + rng.uniform(-lon_span, lon_span)
+        heading = rng.uniform(0, 2 * math.pi)
+        line = []
+        for _ in range(length):
+            index = len(stops)
+            stops.append(
+                {
+                    "id": f"{stop_type}_{index}",
+                    "name": f"Durak {index} ({stop_type.capitalize()})",
+                    "type": stop_type,
+                    "lat": round(lat, 6),
+                    "lon": round(lon, 6),
+                    "sonDurak": False,
+                    "nextStops": [],
+                    "transfer": None,
+                }
+            )
+            line.append(index)
+            heading += rng.uniform(-0.5, 0.5)
+            lat += math.sin(heading) * step_km / KM_PER_DEGREE
+            lon += (
+                math.cos(heading)
+                * step_km
+                / (KM_PER_DEGREE * math.cos(math.radians(lat)))
+            )
+        stops[line[-1]]["sonDurak"] = True
+        lines.append(line)
+
+    for line in lines:
+        for position, index in enumerate(line):
+            stop = stops[index]
+            if position + 1 < len(line):
+                stop["nextStops"].append(make_edge(stop, stops[line[position + 1]], rng))
+            if position > 0:
+                stop["nextStops"].append(make_edge(stop, stops[line[position - 1]], rng))
+
+    # Izgara hücreleri: yakın durak aramaları için
+    cell_size = step_km / KM_PER_DEGREE
+    grid = {}
+    for index, stop in enumerate(stops):
+        key = (int(stop["lat"] / cell_size), int(stop["lon"] / cell_size))
+        grid.setdefault(key, []).append(index)
+
+    def neighbours(stop):
+        row = int(stop["lat"] / cell_size)
+        column = int(stop["lon"] / cell_size)
+        for row_offset in (-1, 0, 1):
+            for column_offset in (-1, 0, 1):
+                yield from grid.get((row + row_offset, column + column_offset), [])
+
+    for index, stop in enumerate(stops):
+        candidates = [other for other in neighbours(stop) if other != index]
+        existing = {edge["stopId"] for edge in stop["nextStops"]}
+        # Hatlar arası ek bağlantılarla ortalama çıkış derecesi fan_out'a yaklaşır
+        extra = max(0, fan_out - len(stop["nextStops"]))
+        rng.shuffle(candidates)
+        for other in candidates:
+            if extra <= 0:
+                break
+            if stops[other]["type"] == stop["type"] and stops[other]["id"] not in existing:
+                stop["nextStops"].append(make_edge(stop, stops[other], rng))
+                existing.add(stops[other]["id"])
+                extra -= 1
+        if rng.random() < transfer_ratio:
+            others = [other for other in candidates if stops[other]["type"] != stop["type"]]
+            target = min(
+                others,
+                key=lambda other: haversine(
+                    stop["lat"], stop["lon"], stops[other]["lat"], stops[other]["lon"]
+                ),
+                default=None,
+            )
+            # Aktarma yürüme mesafesindeki durağa yapılır
+            if target is not None and (
+                haversine(stop["lat"], stop["lon"], stops[target]["lat"], stops[target]["lon"])
+                <= max_transfer_km
+            ):
+                stop["transfer"] = {
+                    "transferStopId": stops[target]["id"],
+                    "transferSure": rng.randint(1, 5),
+                    "transferUcret": rng.choice([0.0, 0.5]),
+                }
+
+    for stop in stops:
+        if stop["transfer"] is None:
+            del stop["transfer"]
+    return {
+        "city": f"Sentetik-{stop_count}",
+        "taxi": {"openingFee": 10.0, "costPerKm": 4.0},
+        "duraklar": stops,
+    }
+
+
+def write_network(network, output_file):
+    # Büyük veri setlerinde bellekte tek bir dev metin oluşturmamak için
+    # duraklar tek tek yazılır
+    with open(output_file, "w", encoding="utf-8") as file:
+        file.write('{"city": %s, "taxi": %s, "duraklar": [\n' % (
+            json.dumps(network["city"]),
+            json.dumps(network["taxi"]),
+        ))
+        for position, stop in enumerate(network["duraklar"]):
+            if position:
+                file.write(",\n")
+            file.write(json.dumps(stop, ensure_ascii=False))
+        file.write("\n]}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sentetik durak ağı üretir.")
+    parser.add_argument("output", help="Yazılacak JSON dosyası")
+    parser.add_argument("--stops", type=int, default=1000)
+    parser.add_argument("--tram-ratio", type=float, default=0.3)
+    parser.add_argument("--fan-out", type=int, default=3)
+    parser.add_argument("--transfer-ratio", type=float, default=0.3)
+    parser.add_argument("--line-length", type=int, default=25)
+    parser.add_argument("--max-transfer-km", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=1881)
+    args = parser.parse_args(argv)
+
+    network = generate_network(
+        args.stops,
+        tram_ratio=args.tram_ratio,
+        fan_out=args.fan_out,
+        transfer_ratio=args.transfer_ratio,
+        line_length=args.line_length,
+        max_transfer_km=args.max_transfer_km,
+        seed=args.seed,
+    )
+    write_network(network, args.output)
+    print(f"{len(network['duraklar'])} durak yazıldı: {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
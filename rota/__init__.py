@@ -0,0 +1,104 @@
+# Rota planlama çekirdeği: PyQt5 ve folium gerektirmez; arayüz App.py'dedir.
+from .geo import DistanceCalculator, Location
+from .graph import CompiledGraph, DatasetSnapshot, StopLoader, StopSpatialIndex
+from .isochrone import Isochrone, IsochroneSearch, ReachableStop
+from .logic import (
+    AllPairsRouteLogic,
+    AllPairsTable,
+    ContractionHierarchy,
+    ContractionHierarchyRouteLogic,
+    ParetoRouteLogic,
+    RaptorRouteLogic,
+    RouteInfo,
+    RouteLogic,
+    TaxiRouteLogic,
+    aStar_Bidirectional,
+    aStar_Standard,
+    bellmanFord_LeastStops,
+    bellmanFord_Standard,
+    dijkstra_Standard,
+)
+from .metrics import (
+    EventBuffer,
+    Histogram,
+    HistogramSink,
+    Instrumentation,
+    JsonLinesSink,
+    MetricsSink,
+    instrumentation,
+)
+from .models import (
+    Bus,
+    Distance_Based_Fare,
+    Elderly,
+    Fixed_Fare,
+    General,
+    KentKart,
+    KrediKarti,
+    Nakit,
+    NextStop,
+    Passenger,
+    PaymentType,
+    Stop,
+    Student,
+    Taxi,
+    Tram,
+    Transfer,
+    Vehicle,
+)
+from .planner import RoutePlanner, RouteQuery
+from .timetable import GTFSLoader, Timetable
+
+__all__ = [
+    "AllPairsRouteLogic",
+    "AllPairsTable",
+    "Bus",
+    "CompiledGraph",
+    "ContractionHierarchy",
+    "ContractionHierarchyRouteLogic",
+    "DatasetSnapshot",
+    "DistanceCalculator",
+    "Distance_Based_Fare",
+    "Elderly",
+    "EventBuffer",
+    "Fixed_Fare",
+    "GTFSLoader",
+    "General",
+    "Histogram",
+    "HistogramSink",
+    "Instrumentation",
+    "Isochrone",
+    "IsochroneSearch",
+    "JsonLinesSink",
+    "KentKart",
+    "KrediKarti",
+    "Location",
+    "MetricsSink",
+    "Nakit",
+    "NextStop",
+    "ParetoRouteLogic",
+    "Passenger",
+    "PaymentType",
+    "RaptorRouteLogic",
+    "ReachableStop",
+    "RouteInfo",
+    "RouteLogic",
+    "RoutePlanner",
+    "RouteQuery",
+    "Stop",
+    "StopLoader",
+    "StopSpatialIndex",
+    "Student",
+    "Taxi",
+    "TaxiRouteLogic",
+    "Timetable",
+    "Tram",
+    "Transfer",
+    "Vehicle",
+    "aStar_Bidirectional",
+    "aStar_Standard",
+    "bellmanFord_LeastStops",
+    "bellmanFord_Standard",
+    "dijkstra_Standard",
+    "instrumentation",
+]
@@ -0,0 +1,115 @@
+import math
+
+
+class DistanceCalculator:
+    EARTH_RADIUS = 6371
+
+    def __init__(self):
+        self.__coordinate_cache = None
+
+    @staticmethod
+    def calculate_distance(lat1, lon1, lat2, lon2):
+        R = DistanceCalculator.EARTH_RADIUS
+        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+        latdiff = lat2 - lat1
+        londiff = lon2 - lon1
+        a = (
+            math.sin(latdiff / 2) ** 2
+            + math.cos(lat1) * math.cos(lat2) * math.sin(londiff / 2) ** 2
+        )
+        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+        return R * c
+
+    @staticmethod
+    def __haversine(lat1, lon1, lat2, lon2, dtype):
+        # numpy yalnızca toplu hesaplarda yüklenir; başlangıç süresine eklenmez
+        import numpy as np
+
+        lat1, lon1, lat2, lon2 = (
+            np.radians(np.asarray(value, dtype=dtype))
+            for value in (lat1, lon1, lat2, lon2)
+        )
+        a = (
+            np.sin((lat2 - lat1) / 2) ** 2
+            + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        )
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        return (DistanceCalculator.EARTH_RADIUS * c).astype(dtype, copy=False)
+
+    @staticmethod
+    def calculate_distances(lat, lon, lats, lons, float32=False):
+        # Bir noktadan dizideki tüm noktalara
+        import numpy as np
+
+        dtype = np.float32 if float32 else np.float64
+        return DistanceCalculator.__haversine(lat, lon, lats, lons, dtype)
+
+    @staticmethod
+    def calculate_pairwise_distances(lats1, lons1, lats2, lons2, float32=False):
+        # Aynı uzunluktaki iki dizinin eleman eleman eşleşmesi
+        import numpy as np
+
+        dtype = np.float32 if float32 else np.float64
+        return DistanceCalculator.__haversine(lats1, lons1, lats2, lons2, dtype)
+
+    @staticmethod
+    def calculate_distance_matrix(lats1, lons1, lats2, lons2, float32=False):
+        # len(lats1) x len(lats2) boyutunda mesafe matrisi
+        import numpy as np
+
+        dtype = np.float32 if float32 else np.float64
+        return DistanceCalculator.__haversine(
+            np.asarray(lats1)[:, np.newaxis],
+            np.asarray(lons1)[:, np.newaxis],
+            np.asarray(lats2)[np.newaxis, :],
+            np.asarray(lons2)[np.newaxis, :],
+            dtype,
+        )
+
+    def get_stop_coordinates(self, stops, float32=False):
+        import numpy as np
+
+        cache = self.__coordinate_cache
+        if cache is None or cache[0] is not stops:
+            cache = (stops, {})
+            self.__coordinate_cache = cache
+        dtype = np.float32 if float32 else np.float64
+        if dtype not in cache[1]:
+            lats = np.fromiter(
+                (stop.get_location().get_latitude() for stop in stops.values()),
+                dtype=dtype,
+                count=len(stops),
+            )
+            lons = np.fromiter(
+                (stop.get_location().get_longitude() for stop in stops.values()),
+                dtype=dtype,
+                count=len(stops),
+            )
+            cache[1][dtype] = (lats, lons)
+        return cache[1][dtype]
+
+    def calculate_distances_to_stops(self, location, stops, float32=False):
+        lats, lons = self.get_stop_coordinates(stops, float32)
+        return self.calculate_distances(
+            location.get_latitude(), location.get_longitude(), lats, lons, float32
+        )
+
+
+class Location:
+    __slots__ = ("__latitude", "__longitude")
+
+    def __init__(self, latitude, longitude):
+        self.__latitude = latitude
+        self.__longitude = longitude
+
+    def get_latitude(self):
+        return self.__latitude
+
+    def get_longitude(self):
+        return self.__longitude
+
+    def set_latitude(self, latitude):
+        self.__latitude = latitude
+
+    def set_longitude(self, longitude):
+        self.__longitude = longitude
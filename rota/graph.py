@@ -0,0 +1,982 @@
+import contextlib
+import gc
+import hashlib
+import heapq
+import itertools
+import json
+import marshal
+import math
+import os
+import struct
+import sys
+from array import array
+
+from .geo import DistanceCalculator, Location
+from .models import NextStop, Stop, Transfer, intern_string
+
+
+class CompiledGraph:
+    RIDE_EDGE = 0
+    TRANSFER_EDGE = 1
+
+    def __init__(
+        self,
+        stops,
+        stop_ids,
+        offsets,
+        sources,
+        targets,
+        distances,
+        times,
+        fares,
+        edge_types,
+    ):
+        self.__stops = stops
+        self.__stop_ids = stop_ids
+        self.__index = {stop_id: i for i, stop_id in enumerate(stop_ids)}
+        self.__stop_objects = [stops[stop_id] for stop_id in stop_ids]
+        self.__stop_types = [stop.get_type() for stop in self.__stop_objects]
+        self.__offsets = offsets
+        self.__sources = sources
+        self.__targets = targets
+        self.__distances = distances
+        self.__times = times
+        self.__fares = fares
+        self.__edge_types = edge_types
+        # Kapalı bağlantılar: bağlantının kendisi ya da uçlarındaki duraklardan
+        # biri kapatılmışsa 1. Skoru sonsuz sayılır, aramalar üzerinden geçmez
+        self.__closed_edges = bytearray(len(targets))
+        self.__closed_by_edge = bytearray(len(targets))
+        self.__closed_stops = bytearray(len(stop_ids))
+        self.__version = 0
+        # profil anahtarı -> (yolcu, araç ağırlığı, skorlar); güncellemelerde
+        # yalnızca değişen bağlantıların skoru yeniden hesaplanır
+        self.__edge_score_cache = {}
+        self.__fare_cost_cache = {}
+        self.__hop_scores = None
+        self.__component_of = None
+        self.__component_successors = None
+        self.__spatial_index = None
+        self.__unit_vectors = None
+        self.__edge_lengths = None
+        self.__heuristic_rates = {}
+        self.__reverse_adjacency = None
+
+    def get_stops(self):
+        return self.__stops
+
+    def get_stop_ids(self):
+        return self.__stop_ids
+
+    def get_stop_objects(self):
+        return self.__stop_objects
+
+    def get_stop_types(self):
+        return self.__stop_types
+
+    def get_offsets(self):
+        return self.__offsets
+
+    def get_sources(self):
+        return self.__sources
+
+    def get_targets(self):
+        return self.__targets
+
+    def get_distances(self):
+        return self.__distances
+
+    def get_times(self):
+        return self.__times
+
+    def get_fares(self):
+        return self.__fares
+
+    def get_edge_types(self):
+        return self.__edge_types
+
+    def get_closed_edges(self):
+        return self.__closed_edges
+
+    def get_closed_stops(self):
+        return self.__closed_stops
+
+    def get_version(self):
+        # Her ağ güncellemesinde artar; ön hesaplanmış yapılar bununla eskiliği anlar
+        return self.__version
+
+    def stop_count(self):
+        return len(self.__stop_ids)
+
+    def edge_count(self):
+        return len(self.__targets)
+
+    def index_of(self, stop):
+        return self.__index[stop.get_stopid()]
+
+    def stop_at(self, index):
+        return self.__stop_objects[index]
+
+    @staticmethod
+    def profile_key(user, vehicle_bias):
+        return (user.get_passenger_type(), user.get_is_special_day(), vehicle_bias)
+
+    def edge_scores(self, user, vehicle_bias):
+        # bellmanFord_Standard ile aynı puanlama, profil başına bir kez hesaplanır
+        key = self.profile_key(user, vehicle_bias)
+        cached = self.__edge_score_cache.get(key)
+        if cached is not None:
+            return cached[2]
+
+        scores = array("d", [0.0]) * len(self.__targets)
+        for edge in range(len(self.__targets)):
+            scores[edge] = self.__edge_score(edge, user, vehicle_bias)
+        self.__edge_score_cache[key] = (user, vehicle_bias, scores)
+        return scores
+
+    def __edge_score(self, edge, user, vehicle_bias):
+        if self.__closed_edges[edge]:
+            return float("inf")
+        target_type = self.__stop_types[self.__targets[edge]]
+        score = self.__distances[edge] * 0.1 + self.__times[edge] * 0.5
+        if not (user.get_is_special_day() and target_type in ["bus", "tram"]):
+            score += user.get_discount(self.__fares[edge]) * 0.4
+        if target_type == vehicle_bias:
+            score *= 0.01
+        return score
+
+    def edge_fare_costs(self, user):
+        key = (user.get_passenger_type(), user.get_is_special_day())
+        cached = self.__fare_cost_cache.get(key)
+        if cached is not None:
+            return cached[1]
+        costs = array("d", [0.0]) * len(self.__targets)
+        for edge in range(len(self.__targets)):
+            costs[edge] = self.__edge_fare_cost(edge, user)
+        self.__fare_cost_cache[key] = (user, costs)
+        return costs
+
+    def __edge_fare_cost(self, edge, user):
+        if self.is_charged(user, edge):
+            return user.get_discount(self.__fares[edge])
+        return 0.0
+
+    def hop_scores(self):
+        # Her açık bağlantı bir durak sayılır (bellmanFord_LeastStops)
+        if self.__hop_scores is None:
+            self.__hop_scores = array(
+                "d", (float("inf") if closed else 1.0 for closed in self.__closed_edges)
+            )
+        return self.__hop_scores
+
+    def get_unit_vectors(self):
+        if self.__unit_vectors is None:
+            self.__unit_vectors = [
+                StopSpatialIndex.to_unit_vector(stop.get_location())
+                for stop in self.__stop_objects
+            ]
+        return self.__unit_vectors
+
+    def straight_distance(self, first, second):
+        x1, y1, z1 = self.get_unit_vectors()[first]
+        x2, y2, z2 = self.get_unit_vectors()[second]
+        return StopSpatialIndex.chord_to_distance(
+            (x1 - x2) ** 2 + (y1 - y2) ** 2 + (z1 - z2) ** 2
+        )
+
+    def edge_straight_distances(self):
+        # Bağlantı uçları arasındaki kuş uçuşu mesafe (km)
+        if self.__edge_lengths is None:
+            self.__edge_lengths = array(
+                "d",
+                (
+                    self.straight_distance(source, target)
+                    for source, target in zip(self.__sources, self.__targets)
+                ),
+            )
+        return self.__edge_lengths
+
+    def heuristic_rate(self, user, vehicle_bias):
+        # Kuş uçuşu km başına en küçük skor. Her yolun skoru en az bu oran ile
+        # uçlar arası kuş uçuşu mesafenin çarpımı kadardır; A* sezgisi bu
+        # yüzden kabul edilebilir ve tutarlıdır. Kayan nokta hataları için
+        # oran çok az küçültülür.
+        key = self.profile_key(user, vehicle_bias)
+        rate = self.__heuristic_rates.get(key)
+        if rate is None:
+            scores = self.edge_scores(user, vehicle_bias)
+            rate = min(
+                (
+                    score / length
+                    for score, length in zip(scores, self.edge_straight_distances())
+                    if length > 0
+                ),
+                default=0.0,
+            )
+            rate = max(0.0, rate) * (1 - 1e-9)
+            self.__heuristic_rates[key] = rate
+        return rate
+
+    def get_reverse_adjacency(self):
+        # Gelen bağlantılar için CSR: reverse_edges[reverse_offsets[i]:
+        # reverse_offsets[i + 1]] i durağına gelen bağlantı numaralarıdır
+        if self.__reverse_adjacency is None:
+            stop_count = self.stop_count()
+            reverse_offsets = array("l", [0]) * (stop_count + 1)
+            for target in self.__targets:
+                reverse_offsets[target + 1] += 1
+            for i in range(stop_count):
+                reverse_offsets[i + 1] += reverse_offsets[i]
+            position = array("l", reverse_offsets[:-1])
+            reverse_edges = array("l", [0]) * len(self.__targets)
+            for edge, target in enumerate(self.__targets):
+                reverse_edges[position[target]] = edge
+                position[target] += 1
+            self.__reverse_adjacency = (reverse_offsets, reverse_edges)
+        return self.__reverse_adjacency
+
+    def unroll_path(self, previous_edge, target):
+        path_edges = []
+        edge = previous_edge[target]
+        while edge != -1:
+            path_edges.append(edge)
+            edge = previous_edge[self.__sources[edge]]
+        path_edges.reverse()
+        return path_edges
+
+    def find_edge(self, source_id, target_id, edge_type=RIDE_EDGE):
+        source = self.__stop_index(source_id)
+        target = self.__stop_index(target_id)
+        for edge in range(self.__offsets[source], self.__offsets[source + 1]):
+            if self.__targets[edge] == target and self.__edge_types[edge] == edge_type:
+                return edge
+        raise ValueError(f"'{source_id}' -> '{target_id}' bağlantısı bulunamadı!")
+
+    def find_transfer_edge(self, stop_id):
+        source = self.__stop_index(stop_id)
+        for edge in range(self.__offsets[source], self.__offsets[source + 1]):
+            if self.__edge_types[edge] == CompiledGraph.TRANSFER_EDGE:
+                return edge
+        raise ValueError(f"'{stop_id}' durağının aktarması yok!")
+
+    def __stop_index(self, stop_id):
+        index = self.__index.get(stop_id)
+        if index is None:
+            raise ValueError(f"'{stop_id}' durağı bulunamadı!")
+        return index
+
+    def update_edge(self, edge, time=None, fare=None):
+        for value in (time, fare):
+            # NaN de reddedilir
+            if value is not None and not value >= 0:
+                raise ValueError("Süre ve ücret negatif olamaz!")
+        if time is not None:
+            self.__times[edge] = time
+        if fare is not None:
+            self.__fares[edge] = fare
+        return self.__refresh_edges([edge])
+
+    def set_edge_closed(self, edge, closed=True):
+        self.__closed_by_edge[edge] = closed
+        return self.__refresh_edges([edge])
+
+    def set_stop_closed(self, index, closed=True):
+        # Durağa giren ve duraktan çıkan tüm bağlantılar kapanır
+        self.__closed_stops[index] = closed
+        reverse_offsets, reverse_edges = self.get_reverse_adjacency()
+        edges = list(range(self.__offsets[index], self.__offsets[index + 1]))
+        edges.extend(reverse_edges[reverse_offsets[index] : reverse_offsets[index + 1]])
+        return self.__refresh_edges(edges)
+
+    def apply_update(self, update):
+        # Çalışırken gelen kesinti/gecikme güncellemesi; değişen bağlantıların
+        # numaralarını döndürür. Biçimler:
+        #   {"action": "set_edge", "from": id, "to": id, "sure": s, "ucret": u}
+        #   {"action": "close_edge" | "open_edge", "from": id, "to": id}
+        #   {"action": "close_stop" | "open_stop", "stop": id}
+        #   {"action": "close_transfer" | "open_transfer", "stop": id}
+        # Bağlantı eylemlerinde "transfer": true aktarma bağlantısını seçer.
+        if not isinstance(update, dict):
+            raise ValueError("Güncelleme bir JSON nesnesi olmalı!")
+        action = update.get("action")
+        try:
+            if action in ("set_edge", "close_edge", "open_edge"):
+                edge = self.find_edge(
+                    update["from"],
+                    update["to"],
+                    CompiledGraph.TRANSFER_EDGE
+                    if update.get("transfer")
+                    else CompiledGraph.RIDE_EDGE,
+                )
+                if action != "set_edge":
+                    return self.set_edge_closed(edge, action == "close_edge")
+                if update.get("sure") is None and update.get("ucret") is None:
+                    raise ValueError("'sure' ya da 'ucret' verilmeli!")
+                return self.update_edge(
+                    edge,
+                    None if update.get("sure") is None else float(update["sure"]),
+                    None if update.get("ucret") is None else float(update["ucret"]),
+                )
+            if action in ("close_stop", "open_stop"):
+                return self.set_stop_closed(
+                    self.__stop_index(update["stop"]), action == "close_stop"
+                )
+            if action in ("close_transfer", "open_transfer"):
+                return self.set_edge_closed(
+                    self.find_transfer_edge(update["stop"]),
+                    action == "close_transfer",
+                )
+        except KeyError as error:
+            raise ValueError(f"Güncellemede {error} alanı eksik!")
+        raise ValueError(f"Bilinmeyen güncelleme: {action}")
+
+    def __refresh_edges(self, edges):
+        # Önbellekteki skor dizileri yeniden kurulmaz, yalnızca değişen
+        # bağlantıların değerleri yerinde güncellenir
+        edges = sorted(set(edges))
+        closure_changed = False
+        for edge in edges:
+            closed = int(
+                self.__closed_by_edge[edge]
+                or self.__closed_stops[self.__sources[edge]]
+                or self.__closed_stops[self.__targets[edge]]
+            )
+            if closed != self.__closed_edges[edge]:
+                self.__closed_edges[edge] = closed
+                closure_changed = True
+
+        for user, vehicle_bias, scores in self.__edge_score_cache.values():
+            for edge in edges:
+                scores[edge] = self.__edge_score(edge, user, vehicle_bias)
+        for user, costs in self.__fare_cost_cache.values():
+            for edge in edges:
+                costs[edge] = self.__edge_fare_cost(edge, user)
+        if self.__heuristic_rates:
+            # Oran yalnızca küçülebilir; büyüyen skorlar sezgiyi bozmaz
+            lengths = self.edge_straight_distances()
+            for key, rate in list(self.__heuristic_rates.items()):
+                scores = self.__edge_score_cache[key][2]
+                for edge in edges:
+                    if lengths[edge] > 0:
+                        rate = min(rate, scores[edge] / lengths[edge] * (1 - 1e-9))
+                self.__heuristic_rates[key] = rate
+        if closure_changed:
+            if self.__hop_scores is not None:
+                for edge in edges:
+                    self.__hop_scores[edge] = (
+                        float("inf") if self.__closed_edges[edge] else 1.0
+                    )
+            self.__component_of = None
+            self.__component_successors = None
+        self.__version += 1
+        return edges
+
+    def signature(self):
+        digest = hashlib.sha256()
+        digest.update("\0".join(self.__stop_ids).encode("utf-8"))
+        for values in (
+            self.__offsets,
+            self.__targets,
+            self.__distances,
+            self.__times,
+            self.__fares,
+            self.__edge_types,
+        ):
+            digest.update(values.tobytes())
+        if self.__closed_edges.count(1):
+            digest.update(bytes(self.__closed_edges))
+        return digest.hexdigest()
+
+    def out_degree(self, index):
+        # Kapalı bağlantılar sayılmaz
+        start = self.__offsets[index]
+        end = self.__offsets[index + 1]
+        return end - start - self.__closed_edges[start:end].count(1)
+
+    def get_spatial_index(self):
+        if self.__spatial_index is None:
+            self.__spatial_index = StopSpatialIndex(self.__stops)
+        return self.__spatial_index
+
+    def get_component_of(self):
+        if self.__component_of is None:
+            self.__compute_strong_components()
+        return self.__component_of
+
+    def __compute_strong_components(self):
+        # Yinelemeli Tarjan; büyük ağlarda özyineleme sınırına takılmaz
+        offsets = self.__offsets
+        targets = self.__targets
+        closed_edges = self.__closed_edges
+        stop_count = self.stop_count()
+        visit_order = [-1] * stop_count
+        low_link = [0] * stop_count
+        on_stack = bytearray(stop_count)
+        component_of = array("l", [-1]) * stop_count
+        stack = []
+        counter = 0
+        component_count = 0
+
+        for root in range(stop_count):
+            if visit_order[root] != -1:
+                continue
+            visit_order[root] = low_link[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, offsets[root])]
+            while work:
+                stop, edge = work[-1]
+                if edge < offsets[stop + 1]:
+                    work[-1] = (stop, edge + 1)
+                    if closed_edges[edge]:
+                        continue
+                    next_stop = targets[edge]
+                    if visit_order[next_stop] == -1:
+                        visit_order[next_stop] = low_link[next_stop] = counter
+                        counter += 1
+                        stack.append(next_stop)
+                        on_stack[next_stop] = 1
+                        work.append((next_stop, offsets[next_stop]))
+                    elif on_stack[next_stop]:
+                        low_link[stop] = min(low_link[stop], visit_order[next_stop])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low_link[parent] = min(low_link[parent], low_link[stop])
+                if low_link[stop] == visit_order[stop]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component_of[member] = component_count
+                        if member == stop:
+                            break
+                    component_count += 1
+
+        successors = [set() for _ in range(component_count)]
+        for edge, target in enumerate(targets):
+            if closed_edges[edge]:
+                continue
+            source_component = component_of[self.__sources[edge]]
+            if source_component != component_of[target]:
+                successors[source_component].add(component_of[target])
+        self.__component_of = component_of
+        self.__component_successors = [tuple(items) for items in successors]
+
+    def reachable_components(self, index):
+        component_of = self.get_component_of()
+        start = component_of[index]
+        reachable = {start}
+        queue = [start]
+        while queue:
+            component = queue.pop()
+            for next_component in self.__component_successors[component]:
+                if next_component not in reachable:
+                    reachable.add(next_component)
+                    queue.append(next_component)
+        return reachable
+
+    def nearest_stop_where(self, location, condition):
+        for stop, _ in self.get_spatial_index().iter_nearest(location):
+            if condition(self.index_of(stop)):
+                return stop
+        return None
+
+    def is_charged(self, user, edge):
+        return not (
+            user.get_is_special_day()
+            and self.__stop_types[self.__targets[edge]] in ["bus", "tram"]
+        )
+
+
+class StopSpatialIndex:
+    # Duraklar birim küre üzerinde 3B noktalara çevrilir; kiriş uzunluğu
+    # Haversine mesafesiyle aynı sırayı verdiği için KD-ağacı sonuçları kesindir.
+    def __init__(self, stops, leaf_size=16):
+        self.__stops = list(stops.values())
+        self.__points = [
+            self.to_unit_vector(stop.get_location()) for stop in self.__stops
+        ]
+        self.__order = list(range(len(self.__points)))
+        self.__leaf_size = leaf_size
+        self.__nodes = []
+        if self.__points:
+            self.__build(0, len(self.__points))
+
+    def get_stops(self):
+        return self.__stops
+
+    def get_leaf_size(self):
+        return self.__leaf_size
+
+    @staticmethod
+    def to_unit_vector(location):
+        lat = math.radians(location.get_latitude())
+        lon = math.radians(location.get_longitude())
+        return (
+            math.cos(lat) * math.cos(lon),
+            math.cos(lat) * math.sin(lon),
+            math.sin(lat),
+        )
+
+    @staticmethod
+    def chord_to_distance(chord_squared):
+        chord = math.sqrt(chord_squared)
+        return 2 * DistanceCalculator.EARTH_RADIUS * math.asin(min(1.0, chord / 2))
+
+    @staticmethod
+    def distance_to_chord_squared(distance):
+        angle = distance / DistanceCalculator.EARTH_RADIUS
+        if angle >= math.pi:
+            return 4.0
+        return (2 * math.sin(angle / 2)) ** 2
+
+    def __build(self, start, end):
+        points = self.__points
+        order = self.__order
+        node_points = [points[i] for i in order[start:end]]
+        bounds = tuple(
+            value
+            for dim in range(3)
+            for value in (
+                min(point[dim] for point in node_points),
+                max(point[dim] for point in node_points),
+            )
+        )
+        node = len(self.__nodes)
+        self.__nodes.append(None)
+        if end - start <= self.__leaf_size:
+            self.__nodes[node] = (bounds, start, end, -1, -1)
+            return node
+
+        split_dim = max(range(3), key=lambda dim: bounds[2 * dim + 1] - bounds[2 * dim])
+        order[start:end] = sorted(order[start:end], key=lambda i: points[i][split_dim])
+        middle = (start + end) // 2
+        left = self.__build(start, middle)
+        right = self.__build(middle, end)
+        self.__nodes[node] = (bounds, start, end, left, right)
+        return node
+
+    @staticmethod
+    def __box_distance_squared(query, bounds):
+        total = 0.0
+        for dim in range(3):
+            if query[dim] < bounds[2 * dim]:
+                total += (bounds[2 * dim] - query[dim]) ** 2
+            elif query[dim] > bounds[2 * dim + 1]:
+                total += (query[dim] - bounds[2 * dim + 1]) ** 2
+        return total
+
+    @staticmethod
+    def __point_distance_squared(query, point):
+        return (
+            (query[0] - point[0]) ** 2
+            + (query[1] - point[1]) ** 2
+            + (query[2] - point[2]) ** 2
+        )
+
+    def iter_nearest(self, location):
+        # En yakından uzağa doğru (durak, km) çiftleri üretir
+        if not self.__nodes:
+            return
+        query = self.to_unit_vector(location)
+        heap = [(self.__box_distance_squared(query, self.__nodes[0][0]), 1, 0)]
+        while heap:
+            distance_squared, is_node, item = heapq.heappop(heap)
+            if not is_node:
+                yield self.__stops[item], self.chord_to_distance(distance_squared)
+                continue
+            bounds, start, end, left, right = self.__nodes[item]
+            if left == -1:
+                for i in self.__order[start:end]:
+                    heapq.heappush(
+                        heap,
+                        (self.__point_distance_squared(query, self.__points[i]), 0, i),
+                    )
+            else:
+                for child in (left, right):
+                    heapq.heappush(
+                        heap,
+                        (
+                            self.__box_distance_squared(query, self.__nodes[child][0]),
+                            1,
+                            child,
+                        ),
+                    )
+
+    def nearest(self, location):
+        for stop, _ in self.iter_nearest(location):
+            return stop
+        raise ValueError("Durak bulunamadı!")
+
+    def k_nearest(self, location, k):
+        return list(itertools.islice(self.iter_nearest(location), k))
+
+    def within_radius(self, location, radius):
+        if not self.__nodes:
+            return []
+        query = self.to_unit_vector(location)
+        limit = self.distance_to_chord_squared(radius)
+        found = []
+        node_stack = [0]
+        while node_stack:
+            bounds, start, end, left, right = self.__nodes[node_stack.pop()]
+            if self.__box_distance_squared(query, bounds) > limit:
+                continue
+            if left != -1:
+                node_stack.append(left)
+                node_stack.append(right)
+                continue
+            for i in self.__order[start:end]:
+                distance_squared = self.__point_distance_squared(query, self.__points[i])
+                if distance_squared <= limit:
+                    found.append((distance_squared, i))
+        found.sort()
+        return [
+            (self.__stops[i], self.chord_to_distance(distance_squared))
+            for distance_squared, i in found
+        ]
+
+
+@contextlib.contextmanager
+def paused_gc():
+    # Çok sayıda küçük nesne oluşturulurken döngü toplayıcısı boşuna çalışmasın
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if collecting:
+            gc.enable()
+
+
+class DatasetSnapshot:
+    MAGIC = b"ROTASNAP"
+    VERSION = 1
+    GRAPH_ARRAYS = (
+        ("offsets", "l"),
+        ("sources", "l"),
+        ("targets", "l"),
+        ("distances", "d"),
+        ("times", "d"),
+        ("fares", "d"),
+        ("edge_types", "b"),
+    )
+
+    # Dosya düzeni: MAGIC, sürüm, başlık uzunluğu, JSON başlık (kaynak dosyanın
+    # SHA-256 özeti) ve marshal ile yazılmış sütunlar. Duraklar nesne nesne değil
+    # sütun sütun saklanır, derlenmiş CSR dizileri de hazır okunur.
+
+    @staticmethod
+    def default_file(json_file):
+        return os.path.splitext(json_file)[0] + ".snapshot"
+
+    @staticmethod
+    def __header(source_digest):
+        return {
+            "source_sha256": source_digest,
+            # marshal biçimi yorumlayıcı sürümüne bağlıdır
+            "marshal_version": marshal.version,
+            "python_version": list(sys.version_info[:2]),
+            "itemsizes": [
+                array(typecode).itemsize
+                for _, typecode in DatasetSnapshot.GRAPH_ARRAYS
+            ],
+        }
+
+    @staticmethod
+    def write(snapshot_file, source_digest, graph, taxi_fees):
+        stop_objects = graph.get_stop_objects()
+        index = {stop_id: i for i, stop_id in enumerate(graph.get_stop_ids())}
+        ride_offsets = [0]
+        ride_targets = []
+        ride_distances = []
+        ride_times = []
+        ride_fares = []
+        transfer_targets = []
+        transfer_times = []
+        transfer_fares = []
+        for stop in stop_objects:
+            for next_stop in stop.get_nextStops():
+                ride_targets.append(index[next_stop.stopId])
+                ride_distances.append(next_stop.mesafe)
+                ride_times.append(next_stop.sure)
+                ride_fares.append(next_stop.ucret)
+            ride_offsets.append(len(ride_targets))
+            transfer = stop.get_transfers()
+            if transfer:
+                transfer_targets.append(index[transfer.get_transferStopId()])
+                transfer_times.append(transfer.get_sure())
+                transfer_fares.append(transfer.get_ucret())
+            else:
+                transfer_targets.append(-1)
+                transfer_times.append(0)
+                transfer_fares.append(0)
+
+        locations = [stop.get_location() for stop in stop_objects]
+        # Değerler liste olarak saklanır; JSON'daki int/float ayrımı korunur
+        columns = {
+            "stop_ids": list(graph.get_stop_ids()),
+            "names": [stop.get_name() for stop in stop_objects],
+            "types": [stop.get_type() for stop in stop_objects],
+            "latitudes": [location.get_latitude() for location in locations],
+            "longitudes": [location.get_longitude() for location in locations],
+            "son_durak": [stop.get_son_durak() for stop in stop_objects],
+            "ride_offsets": ride_offsets,
+            "ride_targets": ride_targets,
+            "ride_distances": ride_distances,
+            "ride_times": ride_times,
+            "ride_fares": ride_fares,
+            "transfer_targets": transfer_targets,
+            "transfer_times": transfer_times,
+            "transfer_fares": transfer_fares,
+            "taxi": taxi_fees,
+        }
+        arrays = {
+            "offsets": graph.get_offsets(),
+            "sources": graph.get_sources(),
+            "targets": graph.get_targets(),
+            "distances": graph.get_distances(),
+            "times": graph.get_times(),
+            "fares": graph.get_fares(),
+            "edge_types": graph.get_edge_types(),
+        }
+        for name, _ in DatasetSnapshot.GRAPH_ARRAYS:
+            columns[name] = arrays[name].tobytes()
+
+        header = json.dumps(DatasetSnapshot.__header(source_digest)).encode("utf-8")
+        # Yarım yazılmış dosya okunmasın diye önce geçici dosyaya yazılır
+        temporary_file = f"{snapshot_file}.{os.getpid()}.tmp"
+        try:
+            with open(temporary_file, "wb") as file:
+                file.write(DatasetSnapshot.MAGIC)
+                file.write(struct.pack("<II", DatasetSnapshot.VERSION, len(header)))
+                file.write(header)
+                marshal.dump(columns, file)
+            os.replace(temporary_file, snapshot_file)
+        finally:
+            if os.path.exists(temporary_file):
+                os.remove(temporary_file)
+
+    @staticmethod
+    def load(snapshot_file, source_digest):
+        # Dosya yoksa, bozuksa ya da başka bir veri setine aitse None döner
+        try:
+            with open(snapshot_file, "rb") as file:
+                buffer = file.read()
+        except OSError:
+            return None
+        magic_size = len(DatasetSnapshot.MAGIC)
+        if buffer[:magic_size] != DatasetSnapshot.MAGIC or len(buffer) < magic_size + 8:
+            return None
+        version, header_size = struct.unpack_from("<II", buffer, magic_size)
+        try:
+            header = json.loads(
+                buffer[magic_size + 8 : magic_size + 8 + header_size].decode("utf-8")
+            )
+        except ValueError:
+            return None
+        if version != DatasetSnapshot.VERSION or header != DatasetSnapshot.__header(
+            source_digest
+        ):
+            return None
+
+        with paused_gc():
+            # Kesilmiş ya da bozulmuş dosya yeniden derlemeye düşer
+            try:
+                columns = marshal.loads(
+                    memoryview(buffer)[magic_size + 8 + header_size :]
+                )
+                return DatasetSnapshot.__restore(columns)
+            except (EOFError, ValueError, TypeError, KeyError, IndexError):
+                return None
+
+    @staticmethod
+    def __restore(columns):
+        stop_ids = [intern_string(stop_id) for stop_id in columns["stop_ids"]]
+        next_stops = [
+            NextStop._make((stop_ids[target], distance, time, fare))
+            for target, distance, time, fare in zip(
+                columns["ride_targets"],
+                columns["ride_distances"],
+                columns["ride_times"],
+                columns["ride_fares"],
+            )
+        ]
+        ride_offsets = columns["ride_offsets"]
+        transfers = [
+            Transfer(transferStopId=stop_ids[target], sure=time, ucret=fare)
+            if target >= 0
+            else None
+            for target, time, fare in zip(
+                columns["transfer_targets"],
+                columns["transfer_times"],
+                columns["transfer_fares"],
+            )
+        ]
+        locations = [
+            Location(latitude, longitude)
+            for latitude, longitude in zip(columns["latitudes"], columns["longitudes"])
+        ]
+        stop_columns = zip(
+            stop_ids,
+            columns["names"],
+            columns["types"],
+            locations,
+            columns["son_durak"],
+            ride_offsets,
+            itertools.islice(ride_offsets, 1, None),
+            transfers,
+        )
+        stops = {
+            stop_id: Stop(
+                stopid=stop_id,
+                name=name,
+                type=stop_type,
+                location=location,
+                son_durak=son_durak,
+                nextStops=next_stops[start:end],
+                transfers=transfer,
+            )
+            for stop_id, name, stop_type, location, son_durak, start, end, transfer in (
+                stop_columns
+            )
+        }
+        arrays = {}
+        for name, typecode in DatasetSnapshot.GRAPH_ARRAYS:
+            arrays[name] = array(typecode)
+            arrays[name].frombytes(columns[name])
+        graph = CompiledGraph(
+            stops,
+            stop_ids,
+            arrays["offsets"],
+            arrays["sources"],
+            arrays["targets"],
+            arrays["distances"],
+            arrays["times"],
+            arrays["fares"],
+            arrays["edge_types"],
+        )
+        return stops, graph, columns["taxi"]
+
+
+class StopLoader:
+    @staticmethod
+    def load_stops_from_json(json_file):
+        with open(json_file, "r", encoding="utf-8") as file, paused_gc():
+            return StopLoader.parse_stops(json.load(file))
+
+    @staticmethod
+    def parse_stops(data):
+        if "duraklar" not in data:
+            raise ValueError("'duraklar' anahtarı bulunamadı!")
+        stops = []
+
+        for stop_data in data["duraklar"]:
+            transfers = stop_data.get("transfer", None)
+            if transfers:
+                transfers = Transfer(
+                    transferStopId=transfers["transferStopId"],
+                    sure=transfers["transferSure"],
+                    ucret=transfers["transferUcret"],
+                )
+            next_stops = [
+                NextStop._make(
+                    (
+                        intern_string(next_stop["stopId"]),
+                        next_stop["mesafe"],
+                        next_stop["sure"],
+                        next_stop["ucret"],
+                    )
+                )
+                for next_stop in stop_data.get("nextStops", [])
+            ]
+            stopToAppend = Stop(
+                stopid=stop_data["id"],
+                name=stop_data["name"],
+                type=stop_data["type"],
+                location=Location(stop_data["lat"], stop_data["lon"]),
+                son_durak=stop_data["sonDurak"],
+                nextStops=next_stops,
+                transfers=transfers,
+            )
+            stops.append(stopToAppend)
+        return {stop.get_stopid(): stop for stop in stops}
+
+    @staticmethod
+    def load_dataset(json_file, snapshot_file=None, use_snapshot=True):
+        # Durakları, derlenmiş grafı ve taksi ücretlerini tek okumada döndürür.
+        # Kaynak dosyanın özeti anlık görüntüyle eşleşirse JSON hiç çözümlenmez.
+        with open(json_file, "rb") as file:
+            source = file.read()
+        source_digest = hashlib.sha256(source).hexdigest()
+        if snapshot_file is None:
+            snapshot_file = DatasetSnapshot.default_file(json_file)
+        if use_snapshot:
+            dataset = DatasetSnapshot.load(snapshot_file, source_digest)
+            if dataset is not None:
+                return dataset
+
+        with paused_gc():
+            data = json.loads(source.decode("utf-8"))
+            stops = StopLoader.parse_stops(data)
+        # compile_graph eksik durak referanslarını da doğrular
+        graph = StopLoader.compile_graph(stops)
+        taxi_fees = data.get("taxi")
+        if use_snapshot:
+            try:
+                DatasetSnapshot.write(snapshot_file, source_digest, graph, taxi_fees)
+            except OSError:
+                # Salt okunur dizinde anlık görüntü olmadan devam edilir
+                pass
+        return stops, graph, taxi_fees
+
+    @staticmethod
+    def compile_graph(stops):
+        stop_ids = list(stops.keys())
+        index = {stop_id: i for i, stop_id in enumerate(stop_ids)}
+        offsets = array("l", [0])
+        sources = array("l")
+        targets = array("l")
+        distances = array("d")
+        times = array("d")
+        fares = array("d")
+        edge_types = array("b")
+
+        for source, stop_id in enumerate(stop_ids):
+            stop = stops[stop_id]
+            for next_stop in stop.get_nextStops():
+                if next_stop.stopId not in index:
+                    raise ValueError(f"'{next_stop.stopId}' durağı bulunamadı!")
+                sources.append(source)
+                targets.append(index[next_stop.stopId])
+                distances.append(next_stop.mesafe)
+                times.append(next_stop.sure)
+                fares.append(next_stop.ucret)
+                edge_types.append(CompiledGraph.RIDE_EDGE)
+            transfer = stop.get_transfers()
+            if transfer:
+                if transfer.get_transferStopId() not in index:
+                    raise ValueError(
+                        f"'{transfer.get_transferStopId()}' durağı bulunamadı!"
+                    )
+                sources.append(source)
+                targets.append(index[transfer.get_transferStopId()])
+                distances.append(0)
+                times.append(transfer.get_sure())
+                fares.append(transfer.get_ucret())
+                edge_types.append(CompiledGraph.TRANSFER_EDGE)
+            offsets.append(len(targets))
+
+        return CompiledGraph(
+            stops,
+            stop_ids,
+            offsets,
+            sources,
+            targets,
+            distances,
+            times,
+            fares,
+            edge_types,
+        )
@@ -0,0 +1,325 @@
+import heapq
+import math
+
+from .graph import CompiledGraph
+from .metrics import instrumentation
+from .models import Passenger
+from .planner import RoutePlanner
+
+
+class ReachableStop:
+    __slots__ = ("__stop", "__time", "__fare", "__access")
+
+    def __init__(self, stop, time, fare, access):
+        self.__stop = stop
+        self.__time = time
+        self.__fare = fare
+        self.__access = access
+
+    def get_stop(self):
+        return self.__stop
+
+    def get_time(self):
+        return self.__time
+
+    def get_fare(self):
+        return self.__fare
+
+    def get_access(self):
+        # İlk durağa nasıl gidildiği: "walk" ya da "taxi"
+        return self.__access
+
+
+class Isochrone:
+    def __init__(self, location, max_time, max_fare, reachable_stops):
+        self.__location = location
+        self.__max_time = max_time
+        self.__max_fare = max_fare
+        self.__reachable_stops = reachable_stops
+
+    def get_location(self):
+        return self.__location
+
+    def get_max_time(self):
+        return self.__max_time
+
+    def get_max_fare(self):
+        return self.__max_fare
+
+    def get_reachable_stops(self):
+        # Süreye göre sıralıdır
+        return self.__reachable_stops
+
+    def to_geojson(self, bands=None):
+        # Harita için FeatureCollection: başlangıç noktası, her ulaşılabilir
+        # durak ve her süre bandı için ulaşılabilir durakların dışbükey zarfı.
+        # GeoJSON koordinat sırası [boylam, enlem]'dir.
+        origin = (self.__location.get_longitude(), self.__location.get_latitude())
+        features = [
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": list(origin)},
+                "properties": {"kind": "origin"},
+            }
+        ]
+        for band in sorted(bands) if bands else [self.__max_time]:
+            ring = Isochrone.convex_hull(
+                [origin]
+                + [
+                    (
+                        reachable.get_stop().get_location().get_longitude(),
+                        reachable.get_stop().get_location().get_latitude(),
+                    )
+                    for reachable in self.__reachable_stops
+                    if reachable.get_time() <= band
+                ]
+            )
+            if len(ring) < 3:
+                continue
+            features.append(
+                {
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "Polygon",
+                        "coordinates": [[list(point) for point in ring + ring[:1]]],
+                    },
+                    "properties": {
+                        "kind": "isochrone",
+                        "max_time": band,
+                        "max_fare": self.__max_fare,
+                    },
+                }
+            )
+        for reachable in self.__reachable_stops:
+            stop = reachable.get_stop()
+            features.append(
+                {
+                    "type": "Feature",
+                    "geometry": {
+                        "type": "Point",
+                        "coordinates": [
+                            stop.get_location().get_longitude(),
+                            stop.get_location().get_latitude(),
+                        ],
+                    },
+                    "properties": {
+                        "kind": "stop",
+                        "id": stop.get_stopid(),
+                        "name": stop.get_name(),
+                        "type": stop.get_type(),
+                        "time": reachable.get_time(),
+                        "fare": reachable.get_fare(),
+                        "access": reachable.get_access(),
+                    },
+                }
+            )
+        return {"type": "FeatureCollection", "features": features}
+
+    @staticmethod
+    def convex_hull(points):
+        # Andrew'un monoton zincir yöntemi; saat yönünün tersine köşe listesi
+        points = sorted(set(points))
+        if len(points) < 3:
+            return points
+
+        def cross(origin, first, second):
+            return (first[0] - origin[0]) * (second[1] - origin[1]) - (
+                first[1] - origin[1]
+            ) * (second[0] - origin[0])
+
+        lower = []
+        for point in points:
+            while len(lower) >= 2 and cross(lower[-2], lower[-1], point) <= 0:
+                lower.pop()
+            lower.append(point)
+        upper = []
+        for point in reversed(points):
+            while len(upper) >= 2 and cross(upper[-2], upper[-1], point) <= 0:
+                upper.pop()
+            upper.append(point)
+        return lower[:-1] + upper[:-1]
+
+
+class IsochroneSearch:
+    # Bir konumdan süre ve ücret bütçesi içinde ulaşılabilen tüm duraklar.
+    # Duraklara erişim RoutePlanner.finalize_routes ile aynıdır: WALKING_LIMIT
+    # km'ye kadar yürüme, daha uzağa taksi. Tüm duraklar erişim süresiyle
+    # tohumlanır ve süre, taksi ücreti ve indirimli ücret (toplamdan aktarma
+    # sayısı düşülmüş hali) üzerinde süre bütçesiyle sınırlı bir Pareto
+    # taraması yürür. Bulunan yolun ücreti RouteLogic.route_from_edges ile
+    # aynıdır: indirimli ücret (en az 0) artı taksi ücreti. Ücret bütçesi
+    # yoksa yalnızca süre karşılaştırılır.
+    def __init__(self, route_planner: RoutePlanner, graph: CompiledGraph):
+        self.__route_planner = route_planner
+        self.__graph = graph
+
+    def get_graph(self):
+        return self.__graph
+
+    def reachable(
+        self, user: Passenger, max_time, max_fare=None, location=None, use_taxi=True
+    ):
+        if location is None:
+            location = user.get_passengerLocation()
+        return self.reachable_batch(
+            [user], max_time, max_fare, [location], use_taxi
+        )[0]
+
+    def reachable_batch(
+        self, users, max_time, max_fare=None, locations=None, use_taxi=True
+    ):
+        # Tüm başlangıçların tüm duraklara mesafeleri tek bir NumPy matrisiyle,
+        # yürüme ve taksi süreleri de bu matris üzerinde bir kerede hesaplanır
+        if locations is None:
+            locations = [user.get_passengerLocation() for user in users]
+        if not locations:
+            return []
+        import numpy as np
+
+        distance_calculator = self.__route_planner.distance_calculator
+        stop_lats, stop_lons = distance_calculator.get_stop_coordinates(
+            self.__graph.get_stops()
+        )
+        with instrumentation.stage("isochrone_access"):
+            distances = distance_calculator.calculate_distance_matrix(
+                [location.get_latitude() for location in locations],
+                [location.get_longitude() for location in locations],
+                stop_lats,
+                stop_lons,
+            )
+            walking = distances <= RoutePlanner.WALKING_LIMIT
+            taxi = self.__route_planner.vehicles.get("taxi") if use_taxi else None
+            access_times = np.full(distances.shape, np.inf)
+            access_fares = np.zeros(distances.shape)
+            for row, user in enumerate(users):
+                access_times[row, walking[row]] = user.calculate_walking_minutes(
+                    distances[row, walking[row]]
+                )
+            if taxi is not None:
+                access_times[~walking] = taxi.calculate_taxi_time(distances[~walking])
+                access_fares[~walking] = taxi.calculate_fare(distances[~walking])
+            within_budget = access_times <= max_time
+            if max_fare is not None:
+                within_budget &= access_fares <= max_fare
+
+        isochrones = []
+        for row, (user, location) in enumerate(zip(users, locations)):
+            seed_stops = np.flatnonzero(within_budget[row])
+            seeds = zip(
+                access_times[row, seed_stops].tolist(),
+                access_fares[row, seed_stops].tolist(),
+                seed_stops.tolist(),
+                walking[row, seed_stops].tolist(),
+            )
+            with instrumentation.stage("isochrone_search"):
+                best = self.search(
+                    self.__graph,
+                    user,
+                    seeds,
+                    max_time,
+                    math.inf if max_fare is None else max_fare,
+                )
+            isochrones.append(
+                Isochrone(
+                    location,
+                    max_time,
+                    max_fare,
+                    [
+                        ReachableStop(
+                            self.__graph.stop_at(stop),
+                            time,
+                            fare,
+                            "walk" if walked else "taxi",
+                        )
+                        for stop, (time, fare, walked) in sorted(
+                            best.items(), key=lambda item: (item[1][0], item[0])
+                        )
+                    ],
+                )
+            )
+        return isochrones
+
+    @staticmethod
+    def search(graph: CompiledGraph, user: Passenger, seeds, max_time, max_fare):
+        # seeds: (erişim süresi, taksi ücreti, durak, yürüyerek mi) listesi.
+        # durak -> (süre, ücret, yürüyerek mi) döner; bütçe içindeki en kısa süre
+        offsets = graph.get_offsets()
+        targets = graph.get_targets()
+        edge_times = graph.get_times()
+        edge_fares = graph.edge_fare_costs(user)
+        edge_types = graph.get_edge_types()
+        closed_edges = graph.get_closed_edges()
+        transfer_edge = CompiledGraph.TRANSFER_EDGE
+        compare_fares = max_fare != math.inf
+
+        # Etiket: (süre, taksi ücreti, indirimli ücret, durak, yürüyerek mi,
+        # aktarmayla gelindiyse aktarmanın başladığı durak, yoksa -1).
+        # İndirimli ücret sınırlanmadan tutulur; sonraki kenarlar iki etikete
+        # de aynı miktarı eklediğinden bu ölçütle budama kesindir.
+        heap = [
+            (time, taxi_fare, 0.0, stop, walked, -1)
+            for time, taxi_fare, stop, walked in seeds
+        ]
+        heapq.heapify(heap)
+        bags = {}
+        best = {}
+        label_count = 0
+
+        def dominated(bag, time, taxi_fare, net_fare, transfer_from):
+            # Aktarmayla gelen etiket geldiği durağa aktarmayla dönemez; bu
+            # kısıt yalnızca aynı kısıtı taşıyan etiketleri bastırabilir
+            for other in bag:
+                if (
+                    other[0] <= time
+                    and (
+                        not compare_fares
+                        or (other[1] <= taxi_fare and other[2] <= net_fare)
+                    )
+                    and other[3] in (-1, transfer_from)
+                ):
+                    return True
+            return False
+
+        while heap:
+            time, taxi_fare, net_fare, stop, walked, transfer_from = heapq.heappop(heap)
+            bag = bags.setdefault(stop, [])
+            if dominated(bag, time, taxi_fare, net_fare, transfer_from):
+                continue
+            bag.append((time, taxi_fare, net_fare, transfer_from))
+            label_count += 1
+            fare = taxi_fare + max(0.0, net_fare)
+            if fare <= max_fare and stop not in best:
+                best[stop] = (time, fare, walked)
+
+            for edge in range(offsets[stop], offsets[stop + 1]):
+                if closed_edges[edge]:
+                    continue
+                next_stop = targets[edge]
+                is_transfer = edge_types[edge] == transfer_edge
+                # Aynı aktarmada gidip gelmek (A→B→A) yalnızca indirimi toplardı
+                if is_transfer and next_stop == transfer_from:
+                    continue
+                new_time = time + edge_times[edge]
+                if new_time > max_time:
+                    continue
+                new_net_fare = net_fare + edge_fares[edge] - is_transfer
+                new_transfer_from = stop if is_transfer else -1
+                next_bag = bags.get(next_stop)
+                if next_bag and dominated(
+                    next_bag, new_time, taxi_fare, new_net_fare, new_transfer_from
+                ):
+                    continue
+                heapq.heappush(
+                    heap,
+                    (
+                        new_time,
+                        taxi_fare,
+                        new_net_fare,
+                        next_stop,
+                        walked,
+                        new_transfer_from,
+                    ),
+                )
+
+        instrumentation.count("labels", label_count, engine="IsochroneSearch")
+        return best
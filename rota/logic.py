@@ -0,0 +1,1779 @@
+import bisect
+import heapq
+import itertools
+import json
+import mmap
+import struct
+import time
+from abc import ABC, abstractmethod
+from array import array
+
+from .geo import DistanceCalculator, Location
+from .graph import CompiledGraph, StopLoader, StopSpatialIndex
+from .metrics import instrumentation
+from .models import Elderly, General, Passenger, Student, Taxi
+from .timetable import Timetable
+
+
+class RouteLogic(ABC):
+    def __init__(self, graph: CompiledGraph = None):
+        self.__graph = graph
+
+    @abstractmethod
+    def calculateRoute(
+        self, stops, initial_stop, target_stop, user: Passenger, vehicle_bias
+    ):
+        pass
+
+    def is_cacheable(self):
+        return True
+
+    def get_graph(self, stops):
+        if self.__graph is None or self.__graph.get_stops() is not stops:
+            self.__graph = StopLoader.compile_graph(stops)
+        return self.__graph
+
+    def route_from_edges(self, graph, initial, path_edges, user, vehicle_bias):
+        with instrumentation.stage("path_reconstruction"):
+            return self.__route_totals(
+                graph, initial, path_edges, user, vehicle_bias
+            )
+
+    def __route_totals(self, graph, initial, path_edges, user, vehicle_bias):
+        targets = graph.get_targets()
+        edge_times = graph.get_times()
+        edge_distances = graph.get_distances()
+        edge_fares = graph.get_fares()
+        edge_types = graph.get_edge_types()
+
+        path_to_target = [graph.stop_at(initial)]
+        total_time = 0
+        total_distance = 0
+        total_price = 0
+        transfer_count = 0
+
+        for edge in path_edges:
+            total_time += edge_times[edge]
+            total_distance += edge_distances[edge]
+            if graph.is_charged(user, edge):
+                total_price += edge_fares[edge]
+            if edge_types[edge] == CompiledGraph.TRANSFER_EDGE:
+                transfer_count += 1
+            path_to_target.append(graph.stop_at(targets[edge]))
+
+        total_price = user.get_discount(total_price)
+        if total_price > transfer_count:
+            total_price -= transfer_count
+        else:
+            total_price = 0
+
+        return RouteInfo(
+            path_to_target,
+            total_time,
+            total_distance,
+            total_price,
+            "",
+            vehicle_bias,
+            self,
+        )
+
+    def resolve_endpoints(self, stops, initial_stop, target_stop):
+        # Ulaşılamayan başlangıç/hedef için tek seferde en yakın uygun durak seçilir
+        if initial_stop is target_stop:
+            return initial_stop, target_stop
+        graph = self.get_graph(stops)
+        initial = original = graph.index_of(initial_stop)
+        if graph.out_degree(initial) == 0:
+            initial_stop = graph.nearest_stop_where(
+                initial_stop.get_location(),
+                lambda index: graph.out_degree(index) > 0,
+            )
+            if initial_stop is None:
+                raise ValueError("Ulaşılabilir durak bulunamadı!")
+            initial = graph.index_of(initial_stop)
+            instrumentation.count("endpoint_retries", side="initial")
+
+        component_of = graph.get_component_of()
+        target_component = component_of[graph.index_of(target_stop)]
+        if component_of[initial] == target_component:
+            return initial_stop, target_stop
+        reachable = graph.reachable_components(initial)
+        if target_component not in reachable:
+            # Yolcunun zaten bulunduğu durak hedefin yerine seçilmez
+            target_stop = graph.nearest_stop_where(
+                target_stop.get_location(),
+                lambda index: component_of[index] in reachable
+                and index not in (original, initial),
+            )
+            if target_stop is None:
+                raise ValueError("Ulaşılabilir durak bulunamadı!")
+            instrumentation.count("endpoint_retries", side="target")
+        return initial_stop, target_stop
+
+    @staticmethod
+    def count_search(engine, graph, settled, unexpanded=-1):
+        # Kesinleşen durakları ve taranan bağlantıları arama döngüsünü
+        # yavaşlatmadan, arama bittikten sonra sayar
+        offsets = graph.get_offsets()
+        relaxations = sum(
+            offsets[stop + 1] - offsets[stop]
+            for stop in itertools.compress(range(len(settled)), settled)
+        )
+        if unexpanded >= 0 and settled[unexpanded]:
+            relaxations -= offsets[unexpanded + 1] - offsets[unexpanded]
+        instrumentation.count("settled_stops", settled.count(1), engine=engine)
+        instrumentation.count("relaxations", relaxations, engine=engine)
+
+
+class bellmanFord_Standard(RouteLogic):
+    def calculateRoute(
+        self,
+        stops,
+        initial_stop,
+        target_stop,
+        user: Passenger,
+        vehicle_bias,
+    ):
+        initial_stop, target_stop = self.resolve_endpoints(
+            stops, initial_stop, target_stop
+        )
+
+        graph = self.get_graph(stops)
+        scores = graph.edge_scores(user, vehicle_bias)
+        initial = graph.index_of(initial_stop)
+        target = graph.index_of(target_stop)
+
+        distances, previous_edge = self.search(
+            graph, scores, initial, type(self).__name__
+        )
+        path_edges = graph.unroll_path(previous_edge, target)
+        return self.route_from_edges(graph, initial, path_edges, user, vehicle_bias)
+
+    @staticmethod
+    def search(graph, scores, initial, engine="bellmanFord_Standard"):
+        # Bağlantılar her turda durak sırasıyla gevşetilir ve her durağa giren
+        # bağlantı previous_edge'e yazılır; iyileşme kalmayınca arama biter.
+        # n - 1 turdan sonra hâlâ iyileşme varsa ağda negatif döngü vardır
+        sources = graph.get_sources()
+        targets = graph.get_targets()
+        stop_count = graph.stop_count()
+        distances = [float("inf")] * stop_count
+        previous_edge = [-1] * stop_count
+        distances[initial] = 0
+        relaxation_counter = 0
+
+        for _ in range(stop_count):
+            relaxed = False
+            for edge, source, next_stop, score in zip(
+                itertools.count(), sources, targets, scores
+            ):
+                new_distance = distances[source] + score
+                if new_distance < distances[next_stop]:
+                    distances[next_stop] = new_distance
+                    previous_edge[next_stop] = edge
+                    relaxation_counter += 1
+                    relaxed = True
+            if not relaxed:
+                break
+        else:
+            raise RuntimeError("Negatif döngü bulundu, uygulama sonlandırılıyor")
+        instrumentation.count("relaxations", relaxation_counter, engine=engine)
+        return distances, previous_edge
+
+
+class dijkstra_Standard(RouteLogic):
+    def calculateRoute(
+        self,
+        stops,
+        initial_stop,
+        target_stop,
+        user: Passenger,
+        vehicle_bias,
+    ):
+        initial_stop, target_stop = self.resolve_endpoints(
+            stops, initial_stop, target_stop
+        )
+
+        graph = self.get_graph(stops)
+        scores = graph.edge_scores(user, vehicle_bias)
+        initial = graph.index_of(initial_stop)
+        target = graph.index_of(target_stop)
+
+        distances, previous_edge = self.search(graph, scores, initial, target)
+        path_edges = graph.unroll_path(previous_edge, target)
+        return self.route_from_edges(graph, initial, path_edges, user, vehicle_bias)
+
+    @staticmethod
+    def search(graph, scores, initial, target=-1):
+        # target verilmezse tüm en kısa yol ağacı hesaplanır
+        offsets = graph.get_offsets()
+        targets = graph.get_targets()
+        distances = [float("inf")] * graph.stop_count()
+        previous_edge = [-1] * graph.stop_count()
+        settled = bytearray(graph.stop_count())
+        distances[initial] = 0
+        heap = [(0, initial)]
+
+        while heap:
+            current_distance, stop = heapq.heappop(heap)
+            if settled[stop]:
+                continue
+            settled[stop] = 1
+            if stop == target:
+                break
+
+            for edge in range(offsets[stop], offsets[stop + 1]):
+                next_stop = targets[edge]
+                new_distance = current_distance + scores[edge]
+                if new_distance < distances[next_stop]:
+                    distances[next_stop] = new_distance
+                    previous_edge[next_stop] = edge
+                    heapq.heappush(heap, (new_distance, next_stop))
+        if instrumentation.enabled:
+            RouteLogic.count_search("dijkstra_Standard", graph, settled, target)
+        return distances, previous_edge
+
+    @staticmethod
+    def repair(graph, scores, distances, previous_edge, changed_edges):
+        # search() ile kurulmuş tam bir en kısa yol ağacını skorları değişen
+        # bağlantılardan sonra yerinde onarır (dinamik SSSP). Değişen bir ağaç
+        # bağlantısının altındaki alt ağaç koparılıp gelen bağlantılardan
+        # yeniden tohumlanır; kısalan bağlantılar da kuyruğa eklenir ve
+        # Dijkstra yalnızca etkilenen duraklar üzerinde yürür. Yeniden
+        # kesinleşen durak sayısı döner.
+        offsets = graph.get_offsets()
+        sources = graph.get_sources()
+        targets = graph.get_targets()
+        inf = float("inf")
+        heap = []
+
+        detached = set()
+        stack = [
+            targets[edge]
+            for edge in changed_edges
+            if previous_edge[targets[edge]] == edge
+        ]
+        while stack:
+            stop = stack.pop()
+            if stop in detached:
+                continue
+            detached.add(stop)
+            for edge in range(offsets[stop], offsets[stop + 1]):
+                if previous_edge[targets[edge]] == edge:
+                    stack.append(targets[edge])
+        if detached:
+            reverse_offsets, reverse_edges = graph.get_reverse_adjacency()
+            for stop in detached:
+                distances[stop] = inf
+                previous_edge[stop] = -1
+            for stop in detached:
+                for position in range(reverse_offsets[stop], reverse_offsets[stop + 1]):
+                    edge = reverse_edges[position]
+                    new_distance = distances[sources[edge]] + scores[edge]
+                    if new_distance < distances[stop]:
+                        distances[stop] = new_distance
+                        previous_edge[stop] = edge
+                if distances[stop] < inf:
+                    heapq.heappush(heap, (distances[stop], stop))
+
+        for edge in changed_edges:
+            next_stop = targets[edge]
+            new_distance = distances[sources[edge]] + scores[edge]
+            if new_distance < distances[next_stop]:
+                distances[next_stop] = new_distance
+                previous_edge[next_stop] = edge
+                heapq.heappush(heap, (new_distance, next_stop))
+
+        repaired_count = 0
+        while heap:
+            current_distance, stop = heapq.heappop(heap)
+            if current_distance > distances[stop]:
+                continue
+            repaired_count += 1
+            for edge in range(offsets[stop], offsets[stop + 1]):
+                next_stop = targets[edge]
+                new_distance = current_distance + scores[edge]
+                if new_distance < distances[next_stop]:
+                    distances[next_stop] = new_distance
+                    previous_edge[next_stop] = edge
+                    heapq.heappush(heap, (new_distance, next_stop))
+        return repaired_count
+
+
+class aStar_Standard(RouteLogic):
+    # dijkstra_Standard ile aynı skor; kuyruk, hedefe kalan kuş uçuşu mesafe
+    # ile CompiledGraph.heuristic_rate çarpımı kadar öne alınır
+    def calculateRoute(
+        self,
+        stops,
+        initial_stop,
+        target_stop,
+        user: Passenger,
+        vehicle_bias,
+    ):
+        initial_stop, target_stop = self.resolve_endpoints(
+            stops, initial_stop, target_stop
+        )
+
+        graph = self.get_graph(stops)
+        scores = graph.edge_scores(user, vehicle_bias)
+        rate = graph.heuristic_rate(user, vehicle_bias)
+        initial = graph.index_of(initial_stop)
+        target = graph.index_of(target_stop)
+
+        path_edges, settled_count = self.search(graph, scores, rate, initial, target)
+        instrumentation.count(
+            "settled_stops", settled_count, engine=type(self).__name__
+        )
+        return self.route_from_edges(graph, initial, path_edges, user, vehicle_bias)
+
+    @staticmethod
+    def search(graph, scores, rate, initial, target):
+        # (bağlantı listesi, kesinleşen durak sayısı) döner
+        offsets = graph.get_offsets()
+        targets = graph.get_targets()
+        vectors = graph.get_unit_vectors()
+        target_x, target_y, target_z = vectors[target]
+        chord_to_distance = StopSpatialIndex.chord_to_distance
+        stop_count = graph.stop_count()
+        distances = [float("inf")] * stop_count
+        previous_edge = [-1] * stop_count
+        potentials = [-1.0] * stop_count
+        settled = bytearray(stop_count)
+        settled_count = 0
+        distances[initial] = 0
+        heap = [(0, initial)]
+
+        while heap:
+            _, stop = heapq.heappop(heap)
+            if settled[stop]:
+                continue
+            settled[stop] = 1
+            settled_count += 1
+            if stop == target:
+                break
+
+            current_distance = distances[stop]
+            for edge in range(offsets[stop], offsets[stop + 1]):
+                next_stop = targets[edge]
+                new_distance = current_distance + scores[edge]
+                if new_distance < distances[next_stop]:
+                    distances[next_stop] = new_distance
+                    previous_edge[next_stop] = edge
+                    potential = potentials[next_stop]
+                    if potential < 0:
+                        x, y, z = vectors[next_stop]
+                        potential = rate * chord_to_distance(
+                            (x - target_x) ** 2
+                            + (y - target_y) ** 2
+                            + (z - target_z) ** 2
+                        )
+                        potentials[next_stop] = potential
+                    heapq.heappush(heap, (new_distance + potential, next_stop))
+        return graph.unroll_path(previous_edge, target), settled_count
+
+
+class aStar_Bidirectional(aStar_Standard):
+    # İleri ve geri aramalar ortalama potansiyel p(v) = (h_t(v) - h_s(v)) / 2
+    # ile yürür; iki yönde de indirgenmiş skorlar negatif olmaz ve en üstteki
+    # anahtarların toplamı bulunan en iyi yolu aştığında arama biter
+    @staticmethod
+    def search(graph, scores, rate, initial, target):
+        if initial == target:
+            return [], 0
+        offsets = graph.get_offsets()
+        targets = graph.get_targets()
+        sources = graph.get_sources()
+        reverse_offsets, reverse_edges = graph.get_reverse_adjacency()
+        vectors = graph.get_unit_vectors()
+        initial_x, initial_y, initial_z = vectors[initial]
+        target_x, target_y, target_z = vectors[target]
+        chord_to_distance = StopSpatialIndex.chord_to_distance
+        stop_count = graph.stop_count()
+        inf = float("inf")
+        potentials = [None] * stop_count
+
+        def potential(stop):
+            value = potentials[stop]
+            if value is None:
+                x, y, z = vectors[stop]
+                to_target = chord_to_distance(
+                    (x - target_x) ** 2 + (y - target_y) ** 2 + (z - target_z) ** 2
+                )
+                from_initial = chord_to_distance(
+                    (x - initial_x) ** 2 + (y - initial_y) ** 2 + (z - initial_z) ** 2
+                )
+                value = rate * (to_target - from_initial) / 2
+                potentials[stop] = value
+            return value
+
+        forward_distances = [inf] * stop_count
+        backward_distances = [inf] * stop_count
+        previous_edge = [-1] * stop_count
+        next_edge = [-1] * stop_count
+        forward_settled = bytearray(stop_count)
+        backward_settled = bytearray(stop_count)
+        forward_distances[initial] = 0
+        backward_distances[target] = 0
+        forward_heap = [(potential(initial), initial)]
+        backward_heap = [(-potential(target), target)]
+        best = inf
+        meeting_stop = -1
+        settled_count = 0
+
+        while forward_heap and backward_heap:
+            if forward_heap[0][0] + backward_heap[0][0] >= best:
+                break
+            if forward_heap[0][0] <= backward_heap[0][0]:
+                _, stop = heapq.heappop(forward_heap)
+                if forward_settled[stop]:
+                    continue
+                forward_settled[stop] = 1
+                settled_count += 1
+                current_distance = forward_distances[stop]
+                for edge in range(offsets[stop], offsets[stop + 1]):
+                    next_stop = targets[edge]
+                    new_distance = current_distance + scores[edge]
+                    if new_distance < forward_distances[next_stop]:
+                        forward_distances[next_stop] = new_distance
+                        previous_edge[next_stop] = edge
+                        heapq.heappush(
+                            forward_heap,
+                            (new_distance + potential(next_stop), next_stop),
+                        )
+                        total = new_distance + backward_distances[next_stop]
+                        if total < best:
+                            best = total
+                            meeting_stop = next_stop
+            else:
+                _, stop = heapq.heappop(backward_heap)
+                if backward_settled[stop]:
+                    continue
+                backward_settled[stop] = 1
+                settled_count += 1
+                current_distance = backward_distances[stop]
+                for position in range(reverse_offsets[stop], reverse_offsets[stop + 1]):
+                    edge = reverse_edges[position]
+                    previous_stop = sources[edge]
+                    new_distance = current_distance + scores[edge]
+                    if new_distance < backward_distances[previous_stop]:
+                        backward_distances[previous_stop] = new_distance
+                        next_edge[previous_stop] = edge
+                        heapq.heappush(
+                            backward_heap,
+                            (new_distance - potential(previous_stop), previous_stop),
+                        )
+                        total = new_distance + forward_distances[previous_stop]
+                        if total < best:
+                            best = total
+                            meeting_stop = previous_stop
+
+        if meeting_stop == -1:
+            return [], settled_count
+        path_edges = graph.unroll_path(previous_edge, meeting_stop)
+        stop = meeting_stop
+        while next_edge[stop] != -1:
+            path_edges.append(next_edge[stop])
+            stop = targets[next_edge[stop]]
+        return path_edges, settled_count
+
+
+class bellmanFord_LeastStops(RouteLogic):
+    def calculateRoute(
+        self,
+        stops,
+        initial_stop,
+        target_stop,
+        user: Passenger,
+        vehicle_bias,
+    ):
+        initial_stop, target_stop = self.resolve_endpoints(
+            stops, initial_stop, target_stop
+        )
+
+        graph = self.get_graph(stops)
+        initial = graph.index_of(initial_stop)
+        target = graph.index_of(target_stop)
+
+        stops_count, previous_edge = bellmanFord_Standard.search(
+            graph, graph.hop_scores(), initial, type(self).__name__
+        )
+        path_edges = graph.unroll_path(previous_edge, target)
+        return self.route_from_edges(graph, initial, path_edges, user, vehicle_bias)
+
+
+class ParetoRouteLogic(RouteLogic):
+    OPTIMAL = "optimal"
+    LEAST_STOPS = "least_stops"
+
+    # Süre, ücret ve durak sayısı üzerinde Pareto cephesini tek bir etiket
+    # yerleştirme taramasıyla bulur. Mesafe de ölçüt olarak tutulur; böylece
+    # ağırlıklı puanı en düşük rota da cephede yer alır. Aynı frontier_source'u
+    # paylaşan mantıklar aynı sorgu için aramayı tekrar etmez.
+    def __init__(
+        self,
+        selection=OPTIMAL,
+        graph: CompiledGraph = None,
+        frontier_source=None,
+        max_labels_per_stop=None,
+    ):
+        super().__init__(graph)
+        self.__selection = selection
+        self.__frontier_source = frontier_source if frontier_source else self
+        self.__max_labels_per_stop = max_labels_per_stop
+        self.__last_query = None
+        self.__last_frontier = None
+
+    def get_selection(self):
+        return self.__selection
+
+    def get_frontier_source(self):
+        return self.__frontier_source
+
+    def get_max_labels_per_stop(self):
+        return self.__max_labels_per_stop
+
+    def calculate_frontier(self, stops, initial_stop, target_stop, user: Passenger):
+        graph, initial, paths = self.__frontier_source.__frontier_paths(
+            stops, initial_stop, target_stop, user
+        )
+        return [
+            self.route_from_edges(graph, initial, path_edges, user, None)
+            for path_edges in paths
+        ]
+
+    def calculateRoute(
+        self, stops, initial_stop, target_stop, user: Passenger, vehicle_bias
+    ):
+        graph, initial, paths = self.__frontier_source.__frontier_paths(
+            stops, initial_stop, target_stop, user
+        )
+        scores = graph.edge_scores(user, vehicle_bias)
+        if self.__selection == self.LEAST_STOPS:
+            best_path = min(
+                paths, key=lambda path: (len(path), sum(scores[e] for e in path))
+            )
+        else:
+            best_path = min(paths, key=lambda path: sum(scores[e] for e in path))
+        return self.route_from_edges(graph, initial, best_path, user, vehicle_bias)
+
+    def __frontier_paths(self, stops, initial_stop, target_stop, user):
+        initial_stop, target_stop = self.resolve_endpoints(
+            stops, initial_stop, target_stop
+        )
+        graph = self.get_graph(stops)
+        initial = graph.index_of(initial_stop)
+        target = graph.index_of(target_stop)
+        query = (
+            graph,
+            graph.get_version(),
+            initial,
+            target,
+            user.get_passenger_type(),
+            user.get_is_special_day(),
+        )
+        if self.__last_query != query:
+            self.__last_frontier = self.__search(graph, initial, target, user)
+            self.__last_query = query
+        return graph, initial, self.__last_frontier
+
+    def __search(self, graph, initial, target, user):
+        offsets = graph.get_offsets()
+        targets = graph.get_targets()
+        edge_times = graph.get_times()
+        edge_distances = graph.get_distances()
+        edge_fares = graph.edge_fare_costs(user)
+        closed_edges = graph.get_closed_edges()
+        max_labels = self.__max_labels_per_stop
+
+        # Etiket: (süre, ücret, durak sayısı, mesafe, durak, önceki etiket, kenar)
+        labels = [(0, 0, 0, 0, initial, -1, -1)]
+        alive = bytearray(b"\x01")
+        bags = {initial: [0]}
+        heap = [(0, 0, 0, 0, 0)]
+
+        def dominates(other, time, fare, hops, distance):
+            return (
+                other[0] <= time
+                and other[1] <= fare
+                and other[2] <= hops
+                and other[3] <= distance
+            )
+
+        def dominated(bag, time, fare, hops, distance):
+            for label in bag:
+                if dominates(labels[label], time, fare, hops, distance):
+                    return True
+            return False
+
+        while heap:
+            time, fare, hops, distance, label = heapq.heappop(heap)
+            if not alive[label]:
+                continue
+            stop = labels[label][4]
+            if stop == target:
+                continue
+            if target in bags and dominated(bags[target], time, fare, hops, distance):
+                continue
+
+            for edge in range(offsets[stop], offsets[stop + 1]):
+                if closed_edges[edge]:
+                    continue
+                next_stop = targets[edge]
+                new_time = time + edge_times[edge]
+                new_fare = fare + edge_fares[edge]
+                new_hops = hops + 1
+                new_distance = distance + edge_distances[edge]
+                if target in bags and dominated(
+                    bags[target], new_time, new_fare, new_hops, new_distance
+                ):
+                    continue
+                bag = bags.setdefault(next_stop, [])
+                if dominated(bag, new_time, new_fare, new_hops, new_distance):
+                    continue
+                kept = []
+                new_costs = (new_time, new_fare, new_hops, new_distance)
+                for other_label in bag:
+                    other = labels[other_label]
+                    if dominates(new_costs, other[0], other[1], other[2], other[3]):
+                        alive[other_label] = 0
+                    else:
+                        kept.append(other_label)
+                if max_labels is not None and len(kept) >= max_labels:
+                    bags[next_stop] = kept
+                    continue
+                new_label = len(labels)
+                labels.append(
+                    (new_time, new_fare, new_hops, new_distance, next_stop, label, edge)
+                )
+                alive.append(1)
+                kept.append(new_label)
+                bags[next_stop] = kept
+                heapq.heappush(
+                    heap, (new_time, new_fare, new_hops, new_distance, new_label)
+                )
+
+        instrumentation.count("labels", len(labels), engine="ParetoRouteLogic")
+        frontier = []
+        for label in bags.get(target, []):
+            path_edges = []
+            while labels[label][5] != -1:
+                path_edges.append(labels[label][6])
+                label = labels[label][5]
+            path_edges.reverse()
+            frontier.append(tuple(path_edges))
+        return frontier
+
+
+class AllPairsTable:
+    MAGIC = b"ROTAAPSP"
+    VERSION = 1
+
+    # Dosya düzeni: MAGIC, sürüm, başlık uzunluğu, JSON başlık ve her profil
+    # için n*n float64 maliyet matrisi ile n*n int32 önceki-kenar matrisi.
+    # Dosya yazılabilir kopya olarak eşlenir; ağ güncellemelerinde satırlar
+    # bellekte onarılır, dosyanın kendisi değişmez.
+    def __init__(self, graph: CompiledGraph, profiles, costs, previous_edges, buffer):
+        self.__graph = graph
+        self.__profiles = profiles
+        self.__costs = costs
+        self.__previous_edges = previous_edges
+        self.__buffer = buffer
+        self.__version = graph.get_version()
+
+    def get_graph(self):
+        return self.__graph
+
+    def get_profiles(self):
+        return self.__profiles
+
+    def has_profile(self, profile_key):
+        return profile_key in self.__profiles
+
+    def is_current(self):
+        return self.__version == self.__graph.get_version()
+
+    def cost(self, profile_key, initial, target):
+        n = self.__graph.stop_count()
+        return self.__costs[self.__profiles[profile_key]][initial * n + target]
+
+    def path_edges(self, profile_key, initial, target):
+        n = self.__graph.stop_count()
+        row = self.__previous_edges[self.__profiles[profile_key]][
+            initial * n : (initial + 1) * n
+        ]
+        return self.__graph.unroll_path(row, target)
+
+    def repair(self, changed_edges, profiles=None):
+        # CompiledGraph güncellemesinden sonra yalnızca değişen bağlantılardan
+        # etkilenen satırlar (başlangıç durakları) dijkstra_Standard.repair ile
+        # onarılır. profiles tabloyu kuran (yolcu, araç ağırlığı) listesidir.
+        if profiles is None:
+            profiles = AllPairsTable.default_profiles()
+        graph = self.__graph
+        n = graph.stop_count()
+        sources = graph.get_sources()
+        targets = graph.get_targets()
+        # Aynı profil anahtarı birden çok kez verilmişse tablodaki gibi son gelen
+        positions = {}
+        for user, vehicle_bias in profiles:
+            profile_key = CompiledGraph.profile_key(user, vehicle_bias)
+            if profile_key in self.__profiles:
+                positions[self.__profiles[profile_key]] = (user, vehicle_bias)
+
+        repaired_rows = 0
+        for position, (user, vehicle_bias) in positions.items():
+            scores = graph.edge_scores(user, vehicle_bias)
+            costs = self.__costs[position]
+            previous_edges = self.__previous_edges[position]
+            # Her bağlantı için tüm satırlardaki ilgili sütunlar tek seferde okunur
+            rows = set()
+            for edge in changed_edges:
+                source = sources[edge]
+                target = targets[edge]
+                score = scores[edge]
+                for row, (previous, source_cost, target_cost) in enumerate(
+                    zip(
+                        previous_edges[target::n].tolist(),
+                        costs[source::n].tolist(),
+                        costs[target::n].tolist(),
+                    )
+                ):
+                    if previous == edge or source_cost + score < target_cost:
+                        rows.add(row)
+            for row in rows:
+                dijkstra_Standard.repair(
+                    graph,
+                    scores,
+                    costs[row * n : (row + 1) * n],
+                    previous_edges[row * n : (row + 1) * n],
+                    changed_edges,
+                )
+            repaired_rows += len(rows)
+        self.__version = graph.get_version()
+        instrumentation.count("repaired_rows", repaired_rows, structure="all_pairs")
+        return repaired_rows
+
+    def close(self):
+        self.__costs = None
+        self.__previous_edges = None
+        self.__buffer.close()
+
+    @staticmethod
+    def default_profiles():
+        location = Location(0, 0)
+        users = []
+        for passenger_class in (General, Student, Elderly):
+            for is_special_day in (False, True):
+                users.append(
+                    passenger_class(
+                        "", location, location, is_special_day=is_special_day
+                    )
+                )
+        return [
+            (user, vehicle_bias)
+            for user in users
+            for vehicle_bias in ("None", "bus", "tram")
+        ]
+
+    @staticmethod
+    def __block_layout(header_size, stop_count, profile_count):
+        data_offset = (len(AllPairsTable.MAGIC) + 8 + header_size + 7) // 8 * 8
+        cost_size = stop_count * stop_count * 8
+        previous_size = (stop_count * stop_count * 4 + 7) // 8 * 8
+        return [
+            (
+                data_offset + profile * (cost_size + previous_size),
+                data_offset + profile * (cost_size + previous_size) + cost_size,
+            )
+            for profile in range(profile_count)
+        ]
+
+    @staticmethod
+    def build(graph: CompiledGraph, table_file, profiles=None):
+        if profiles is None:
+            profiles = AllPairsTable.default_profiles()
+        stop_count = graph.stop_count()
+        header = json.dumps(
+            {
+                "signature": graph.signature(),
+                "stop_count": stop_count,
+                "profiles": [
+                    list(CompiledGraph.profile_key(user, vehicle_bias))
+                    for user, vehicle_bias in profiles
+                ],
+            }
+        ).encode("utf-8")
+        layout = AllPairsTable.__block_layout(len(header), stop_count, len(profiles))
+
+        with open(table_file, "wb") as file:
+            file.write(AllPairsTable.MAGIC)
+            file.write(struct.pack("<II", AllPairsTable.VERSION, len(header)))
+            file.write(header)
+            for (user, vehicle_bias), (cost_offset, previous_offset) in zip(
+                profiles, layout
+            ):
+                scores = graph.edge_scores(user, vehicle_bias)
+                for initial in range(stop_count):
+                    distances, previous_edge = dijkstra_Standard.search(
+                        graph, scores, initial
+                    )
+                    file.seek(cost_offset + initial * stop_count * 8)
+                    array("d", distances).tofile(file)
+                    file.seek(previous_offset + initial * stop_count * 4)
+                    array("i", previous_edge).tofile(file)
+
+    @staticmethod
+    def load(table_file, graph: CompiledGraph):
+        with open(table_file, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic_size = len(AllPairsTable.MAGIC)
+        if buffer[:magic_size] != AllPairsTable.MAGIC:
+            buffer.close()
+            raise ValueError("Geçersiz tablo dosyası!")
+        version, header_size = struct.unpack_from("<II", buffer, magic_size)
+        header = json.loads(
+            buffer[magic_size + 8 : magic_size + 8 + header_size].decode("utf-8")
+        )
+        if version != AllPairsTable.VERSION or header["signature"] != graph.signature():
+            buffer.close()
+            raise ValueError("Tablo dosyası bu durak verisine ait değil!")
+
+        stop_count = graph.stop_count()
+        layout = AllPairsTable.__block_layout(
+            header_size, stop_count, len(header["profiles"])
+        )
+        view = memoryview(buffer)
+        costs = []
+        previous_edges = []
+        for cost_offset, previous_offset in layout:
+            costs.append(
+                view[cost_offset : cost_offset + stop_count * stop_count * 8].cast("d")
+            )
+            previous_edges.append(
+                view[
+                    previous_offset : previous_offset + stop_count * stop_count * 4
+                ].cast("i")
+            )
+        profiles = {
+            tuple(profile): position
+            for position, profile in enumerate(header["profiles"])
+        }
+        return AllPairsTable(graph, profiles, costs, previous_edges, buffer)
+
+
+class AllPairsRouteLogic(RouteLogic):
+    def __init__(self, table: AllPairsTable):
+        super().__init__(table.get_graph())
+        self.__table = table
+        self.__fallback = dijkstra_Standard(table.get_graph())
+
+    def get_table(self):
+        return self.__table
+
+    def calculateRoute(
+        self, stops, initial_stop, target_stop, user: Passenger, vehicle_bias
+    ):
+        graph = self.get_graph(stops)
+        profile_key = CompiledGraph.profile_key(user, vehicle_bias)
+        if (
+            graph is not self.__table.get_graph()
+            or not self.__table.has_profile(profile_key)
+            or not self.__table.is_current()
+        ):
+            instrumentation.count("fallbacks", logic=type(self).__name__)
+            return self.__fallback.calculateRoute(
+                stops, initial_stop, target_stop, user, vehicle_bias
+            )
+
+        initial = graph.index_of(initial_stop)
+        target = graph.index_of(target_stop)
+        if self.__table.cost(profile_key, initial, target) == float("inf"):
+            initial_stop, target_stop = self.resolve_endpoints(
+                stops, initial_stop, target_stop
+            )
+            initial = graph.index_of(initial_stop)
+            target = graph.index_of(target_stop)
+        path_edges = self.__table.path_edges(profile_key, initial, target)
+        return self.route_from_edges(graph, initial, path_edges, user, vehicle_bias)
+
+
+class ContractionHierarchy:
+    MAGIC = b"ROTACHPF"
+    VERSION = 1
+    WITNESS_SETTLE_LIMIT = 64
+    # Kalan en ucuz durak bundan fazla bağlantı ekleyecekse daraltma durur
+    CORE_EDGE_DIFFERENCE = 16
+
+    # Dosya düzeni: MAGIC, sürüm, başlık uzunluğu, JSON başlık ve her
+    # hiyerarşi için sırasıyla bağlantı dizileri (ağırlık, kaynak, hedef,
+    # özgün bağlantı, iki alt bağlantı) ile yukarı ve aşağı CSR dizileri.
+    # Skorları aynı olan profiller tek hiyerarşiyi paylaşır.
+    ARRAYS = (
+        ("weights", "d", "edges"),
+        ("sources", "i", "edges"),
+        ("targets", "i", "edges"),
+        ("originals", "i", "edges"),
+        ("first_children", "i", "edges"),
+        ("second_children", "i", "edges"),
+        ("up_offsets", "i", "offsets"),
+        ("up_edges", "i", "up"),
+        ("down_offsets", "i", "offsets"),
+        ("down_edges", "i", "down"),
+    )
+
+    def __init__(self, graph: CompiledGraph, profiles, hierarchies, buffer=None):
+        self.__graph = graph
+        self.__profiles = profiles
+        self.__hierarchies = hierarchies
+        self.__buffer = buffer
+        self.__version = graph.get_version()
+
+    def get_graph(self):
+        return self.__graph
+
+    def get_profiles(self):
+        return self.__profiles
+
+    def has_profile(self, profile_key):
+        return profile_key in self.__profiles
+
+    def is_current(self):
+        # Kısayol ağırlıkları ağ güncellemesinden sonra geçersizdir; hiyerarşi
+        # yeniden kurulana kadar sorgular Dijkstra'ya düşer
+        return self.__version == self.__graph.get_version()
+
+    def hierarchy_count(self):
+        return len(self.__hierarchies)
+
+    def shortcut_count(self, profile_key):
+        hierarchy = self.__hierarchies[self.__profiles[profile_key]]
+        return sum(1 for original in hierarchy["originals"] if original < 0)
+
+    def close(self):
+        self.__hierarchies = None
+        if self.__buffer is not None:
+            self.__buffer.close()
+
+    @staticmethod
+    def __witness_distances(out_adjacency, weights, source, skipped, limit):
+        # Yalnızca henüz daraltılmamış duraklar üzerinde sınırlı yerel arama
+        distances = {source: 0.0}
+        heap = [(0.0, source)]
+        settled_count = 0
+        while heap:
+            distance, stop = heapq.heappop(heap)
+            if distance > distances[stop]:
+                continue
+            if distance > limit:
+                break
+            settled_count += 1
+            if settled_count > ContractionHierarchy.WITNESS_SETTLE_LIMIT:
+                break
+            for next_stop, edge in out_adjacency[stop].items():
+                if next_stop == skipped:
+                    continue
+                new_distance = distance + weights[edge]
+                if new_distance < distances.get(next_stop, float("inf")):
+                    distances[next_stop] = new_distance
+                    heapq.heappush(heap, (new_distance, next_stop))
+        return distances
+
+    @staticmethod
+    def __required_shortcuts(out_adjacency, in_adjacency, weights, stop):
+        outgoing = out_adjacency[stop]
+        incoming = in_adjacency[stop]
+        shortcuts = []
+        if not outgoing or not incoming:
+            return shortcuts
+        max_outgoing = max(weights[edge] for edge in outgoing.values())
+        for source, in_edge in incoming.items():
+            in_weight = weights[in_edge]
+            distances = ContractionHierarchy.__witness_distances(
+                out_adjacency, weights, source, stop, in_weight + max_outgoing
+            )
+            for target, out_edge in outgoing.items():
+                if target == source:
+                    continue
+                cost = in_weight + weights[out_edge]
+                if distances.get(target, float("inf")) > cost:
+                    shortcuts.append((source, target, cost, in_edge, out_edge))
+        return shortcuts
+
+    @staticmethod
+    def contract(graph: CompiledGraph, scores):
+        stop_count = graph.stop_count()
+        graph_sources = graph.get_sources()
+        graph_targets = graph.get_targets()
+        hierarchy = {
+            name: array(typecode) for name, typecode, _ in ContractionHierarchy.ARRAYS
+        }
+        weights = hierarchy["weights"]
+        sources = hierarchy["sources"]
+        targets = hierarchy["targets"]
+        originals = hierarchy["originals"]
+        first_children = hierarchy["first_children"]
+        second_children = hierarchy["second_children"]
+
+        def add_edge(source, target, weight, original, first, second):
+            weights.append(weight)
+            sources.append(source)
+            targets.append(target)
+            originals.append(original)
+            first_children.append(first)
+            second_children.append(second)
+            return len(weights) - 1
+
+        # Paralel bağlantılardan yalnızca en düşük skorlu olan tutulur
+        best_edges = {}
+        for edge in range(graph.edge_count()):
+            source, target = graph_sources[edge], graph_targets[edge]
+            if source == target:
+                continue
+            current = best_edges.get((source, target))
+            if current is None or scores[edge] < scores[current]:
+                best_edges[(source, target)] = edge
+        out_adjacency = [{} for _ in range(stop_count)]
+        in_adjacency = [{} for _ in range(stop_count)]
+        for (source, target), edge in best_edges.items():
+            ch_edge = add_edge(source, target, scores[edge], edge, -1, -1)
+            out_adjacency[source][target] = ch_edge
+            in_adjacency[target][source] = ch_edge
+
+        # Sıralama: 2 * bağlantı farkı + daraltılmış komşu sayısı + seviye;
+        # öncelikler durak kuyruktan çıktığında tembelce yeniden hesaplanır
+        deleted_neighbors = [0] * stop_count
+        levels = [0] * stop_count
+        up_lists = [None] * stop_count
+        down_lists = [None] * stop_count
+
+        def edge_difference(stop, shortcuts):
+            return (
+                len(shortcuts) - len(out_adjacency[stop]) - len(in_adjacency[stop])
+            )
+
+        def priority(stop, shortcuts):
+            return (
+                2 * edge_difference(stop, shortcuts)
+                + deleted_neighbors[stop]
+                + levels[stop]
+            )
+
+        required_shortcuts = ContractionHierarchy.__required_shortcuts
+        heap = [
+            (
+                priority(
+                    stop,
+                    required_shortcuts(out_adjacency, in_adjacency, weights, stop),
+                ),
+                stop,
+            )
+            for stop in range(stop_count)
+        ]
+        heapq.heapify(heap)
+        while heap:
+            _, stop = heapq.heappop(heap)
+            shortcuts = required_shortcuts(out_adjacency, in_adjacency, weights, stop)
+            stop_priority = priority(stop, shortcuts)
+            if heap and stop_priority > heap[0][0]:
+                heapq.heappush(heap, (stop_priority, stop))
+                continue
+            if (
+                edge_difference(stop, shortcuts)
+                > ContractionHierarchy.CORE_EDGE_DIFFERENCE
+            ):
+                break
+
+            up_lists[stop] = list(out_adjacency[stop].values())
+            down_lists[stop] = list(in_adjacency[stop].values())
+            for target in out_adjacency[stop]:
+                del in_adjacency[target][stop]
+                deleted_neighbors[target] += 1
+                levels[target] = max(levels[target], levels[stop] + 1)
+            for source in in_adjacency[stop]:
+                del out_adjacency[source][stop]
+                deleted_neighbors[source] += 1
+                levels[source] = max(levels[source], levels[stop] + 1)
+            out_adjacency[stop] = {}
+            in_adjacency[stop] = {}
+
+            for source, target, cost, in_edge, out_edge in shortcuts:
+                current = out_adjacency[source].get(target)
+                if current is not None and weights[current] <= cost:
+                    continue
+                ch_edge = add_edge(source, target, cost, -1, in_edge, out_edge)
+                out_adjacency[source][target] = ch_edge
+                in_adjacency[target][source] = ch_edge
+
+        # Daraltılmayan çekirdek duraklar birbirine tüm kalan bağlantılarıyla
+        # bağlı kalır; sorgu çekirdekte sıradan iki yönlü aramaya dönüşür
+        for stop in range(stop_count):
+            if up_lists[stop] is None:
+                up_lists[stop] = list(out_adjacency[stop].values())
+                down_lists[stop] = list(in_adjacency[stop].values())
+        for lists, offsets_name, edges_name in (
+            (up_lists, "up_offsets", "up_edges"),
+            (down_lists, "down_offsets", "down_edges"),
+        ):
+            offsets = hierarchy[offsets_name]
+            edges = hierarchy[edges_name]
+            offsets.append(0)
+            for stop_edges in lists:
+                edges.extend(stop_edges)
+                offsets.append(len(edges))
+        return hierarchy
+
+    @staticmethod
+    def __layout(data_offset, stop_count, sizes):
+        counts = {"offsets": stop_count + 1}
+        position = data_offset
+        layout = []
+        for hierarchy_sizes in sizes:
+            counts.update(hierarchy_sizes)
+            arrays = {}
+            for name, typecode, count_name in ContractionHierarchy.ARRAYS:
+                size = counts[count_name] * array(typecode).itemsize
+                arrays[name] = (position, size, typecode)
+                position += (size + 7) // 8 * 8
+            layout.append(arrays)
+        return layout
+
+    @staticmethod
+    def build(graph: CompiledGraph, hierarchy_file, profiles=None):
+        if profiles is None:
+            profiles = AllPairsTable.default_profiles()
+        profile_positions = []
+        hierarchies = []
+        positions_by_scores = {}
+        for user, vehicle_bias in profiles:
+            scores = graph.edge_scores(user, vehicle_bias)
+            scores_key = scores.tobytes()
+            if scores_key not in positions_by_scores:
+                positions_by_scores[scores_key] = len(hierarchies)
+                hierarchies.append(ContractionHierarchy.contract(graph, scores))
+            profile_positions.append(
+                list(CompiledGraph.profile_key(user, vehicle_bias))
+                + [positions_by_scores[scores_key]]
+            )
+
+        sizes = [
+            {
+                "edges": len(hierarchy["weights"]),
+                "up": len(hierarchy["up_edges"]),
+                "down": len(hierarchy["down_edges"]),
+            }
+            for hierarchy in hierarchies
+        ]
+        header = json.dumps(
+            {
+                "signature": graph.signature(),
+                "stop_count": graph.stop_count(),
+                "profiles": profile_positions,
+                "hierarchies": sizes,
+            }
+        ).encode("utf-8")
+        data_offset = (len(ContractionHierarchy.MAGIC) + 8 + len(header) + 7) // 8 * 8
+        layout = ContractionHierarchy.__layout(data_offset, graph.stop_count(), sizes)
+
+        with open(hierarchy_file, "wb") as file:
+            file.write(ContractionHierarchy.MAGIC)
+            file.write(struct.pack("<II", ContractionHierarchy.VERSION, len(header)))
+            file.write(header)
+            for hierarchy, arrays in zip(hierarchies, layout):
+                for name, (offset, _, _) in arrays.items():
+                    file.seek(offset)
+                    hierarchy[name].tofile(file)
+        return ContractionHierarchy(
+            graph,
+            {tuple(profile[:-1]): profile[-1] for profile in profile_positions},
+            hierarchies,
+        )
+
+    @staticmethod
+    def load(hierarchy_file, graph: CompiledGraph):
+        with open(hierarchy_file, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic_size = len(ContractionHierarchy.MAGIC)
+        if buffer[:magic_size] != ContractionHierarchy.MAGIC:
+            buffer.close()
+            raise ValueError("Geçersiz hiyerarşi dosyası!")
+        version, header_size = struct.unpack_from("<II", buffer, magic_size)
+        header = json.loads(
+            buffer[magic_size + 8 : magic_size + 8 + header_size].decode("utf-8")
+        )
+        if (
+            version != ContractionHierarchy.VERSION
+            or header["signature"] != graph.signature()
+        ):
+            buffer.close()
+            raise ValueError("Hiyerarşi dosyası bu durak verisine ait değil!")
+
+        data_offset = (magic_size + 8 + header_size + 7) // 8 * 8
+        layout = ContractionHierarchy.__layout(
+            data_offset, graph.stop_count(), header["hierarchies"]
+        )
+        view = memoryview(buffer)
+        hierarchies = [
+            {
+                name: view[offset : offset + size].cast(typecode)
+                for name, (offset, size, typecode) in arrays.items()
+            }
+            for arrays in layout
+        ]
+        profiles = {tuple(profile[:-1]): profile[-1] for profile in header["profiles"]}
+        return ContractionHierarchy(graph, profiles, hierarchies, buffer)
+
+    def path_edges(self, profile_key, initial, target):
+        # Yalnızca üst sıradaki duraklara doğru iki yönlü arama; ileri arama
+        # yukarı bağlantılarla, geri arama aşağı bağlantıların tersiyle yürür
+        hierarchy = self.__hierarchies[self.__profiles[profile_key]]
+        if initial == target:
+            return []
+        weights = hierarchy["weights"]
+        sources = hierarchy["sources"]
+        targets = hierarchy["targets"]
+        searches = (
+            (
+                {initial: (0.0, -1)},
+                [(0.0, initial)],
+                hierarchy["up_offsets"],
+                hierarchy["up_edges"],
+                targets,
+                hierarchy["down_offsets"],
+                hierarchy["down_edges"],
+                sources,
+            ),
+            (
+                {target: (0.0, -1)},
+                [(0.0, target)],
+                hierarchy["down_offsets"],
+                hierarchy["down_edges"],
+                sources,
+                hierarchy["up_offsets"],
+                hierarchy["up_edges"],
+                targets,
+            ),
+        )
+        best = float("inf")
+        meeting_stop = -1
+
+        while True:
+            forward_top = searches[0][1][0][0] if searches[0][1] else float("inf")
+            backward_top = searches[1][1][0][0] if searches[1][1] else float("inf")
+            if min(forward_top, backward_top) >= best:
+                break
+            direction = 0 if forward_top <= backward_top else 1
+            (
+                labels,
+                heap,
+                offsets,
+                edges,
+                heads,
+                stall_offsets,
+                stall_edges,
+                tails,
+            ) = searches[direction]
+            distance, stop = heapq.heappop(heap)
+            if distance > labels[stop][0]:
+                continue
+
+            # Daha üst bir duraktan daha ucuza ulaşılabiliyorsa durak
+            # en kısa yol üzerinde olamaz; komşuları açılmaz
+            stalled = False
+            for position in range(stall_offsets[stop], stall_offsets[stop + 1]):
+                edge = stall_edges[position]
+                label = labels.get(tails[edge])
+                if label is not None and label[0] + weights[edge] < distance:
+                    stalled = True
+                    break
+            if stalled:
+                continue
+
+            opposite = searches[1 - direction][0].get(stop)
+            if opposite is not None and distance + opposite[0] < best:
+                best = distance + opposite[0]
+                meeting_stop = stop
+
+            for position in range(offsets[stop], offsets[stop + 1]):
+                edge = edges[position]
+                next_stop = heads[edge]
+                new_distance = distance + weights[edge]
+                label = labels.get(next_stop)
+                if label is None or new_distance < label[0]:
+                    labels[next_stop] = (new_distance, edge)
+                    heapq.heappush(heap, (new_distance, next_stop))
+
+        instrumentation.count(
+            "labels",
+            len(searches[0][0]) + len(searches[1][0]),
+            engine="ContractionHierarchy",
+        )
+        if meeting_stop == -1:
+            return None
+        forward_labels, backward_labels = searches[0][0], searches[1][0]
+        ch_edges = []
+        stop = meeting_stop
+        while forward_labels[stop][1] != -1:
+            edge = forward_labels[stop][1]
+            ch_edges.append(edge)
+            stop = sources[edge]
+        ch_edges.reverse()
+        stop = meeting_stop
+        while backward_labels[stop][1] != -1:
+            edge = backward_labels[stop][1]
+            ch_edges.append(edge)
+            stop = targets[edge]
+        return self.__unpack(hierarchy, ch_edges)
+
+    @staticmethod
+    def __unpack(hierarchy, ch_edges):
+        # Kısayollar özgün CompiledGraph bağlantılarına açılır
+        originals = hierarchy["originals"]
+        first_children = hierarchy["first_children"]
+        second_children = hierarchy["second_children"]
+        path_edges = []
+        stack = list(reversed(ch_edges))
+        while stack:
+            edge = stack.pop()
+            original = originals[edge]
+            if original >= 0:
+                path_edges.append(original)
+            else:
+                stack.append(second_children[edge])
+                stack.append(first_children[edge])
+        return path_edges
+
+
+class ContractionHierarchyRouteLogic(RouteLogic):
+    def __init__(self, hierarchy: ContractionHierarchy):
+        super().__init__(hierarchy.get_graph())
+        self.__hierarchy = hierarchy
+        self.__fallback = dijkstra_Standard(hierarchy.get_graph())
+
+    def get_hierarchy(self):
+        return self.__hierarchy
+
+    def calculateRoute(
+        self, stops, initial_stop, target_stop, user: Passenger, vehicle_bias
+    ):
+        graph = self.get_graph(stops)
+        profile_key = CompiledGraph.profile_key(user, vehicle_bias)
+        if (
+            graph is not self.__hierarchy.get_graph()
+            or not self.__hierarchy.has_profile(profile_key)
+            or not self.__hierarchy.is_current()
+        ):
+            instrumentation.count("fallbacks", logic=type(self).__name__)
+            return self.__fallback.calculateRoute(
+                stops, initial_stop, target_stop, user, vehicle_bias
+            )
+
+        initial_stop, target_stop = self.resolve_endpoints(
+            stops, initial_stop, target_stop
+        )
+        initial = graph.index_of(initial_stop)
+        target = graph.index_of(target_stop)
+        path_edges = self.__hierarchy.path_edges(profile_key, initial, target)
+        return self.route_from_edges(
+            graph, initial, path_edges or [], user, vehicle_bias
+        )
+
+
+class RaptorRouteLogic(RouteLogic):
+    EARLIEST_ARRIVAL = "earliest_arrival"
+    FEWEST_TRANSFERS = "fewest_transfers"
+
+    # Tarife üzerinde tur tabanlı arama (RAPTOR): k. tur en fazla k araca
+    # binerek ulaşılabilen en erken varışları bulur. Her turda yalnızca bir
+    # önceki turda iyileşen duraklardan geçen hatlar taranır. Seçim tüm
+    # turların (binme sayısı, varış) ikililerinden yapılır. Sonuç kalkış
+    # saatine bağlı olduğu için önbelleğe alınmaz.
+    def __init__(
+        self,
+        timetable: Timetable,
+        selection=EARLIEST_ARRIVAL,
+        departure_time=None,
+        max_rounds=8,
+    ):
+        super().__init__()
+        self.__timetable = timetable
+        self.__selection = selection
+        self.__departure_time = departure_time
+        self.__max_rounds = max_rounds
+
+    def get_timetable(self):
+        return self.__timetable
+
+    def get_selection(self):
+        return self.__selection
+
+    def get_departure_time(self):
+        return self.__departure_time
+
+    def set_departure_time(self, departure_time):
+        # Gece yarısından itibaren saniye; None ise sorgu anındaki saat
+        self.__departure_time = departure_time
+
+    def get_max_rounds(self):
+        return self.__max_rounds
+
+    def is_cacheable(self):
+        return False
+
+    def calculateRoute(
+        self, stops, initial_stop, target_stop, user: Passenger, vehicle_bias
+    ):
+        timetable = self.__timetable
+        departure_time = self.__departure_time
+        if departure_time is None:
+            now = time.localtime()
+            departure_time = now.tm_hour * 3600 + now.tm_min * 60 + now.tm_sec
+        initial = timetable.index_of(initial_stop)
+        target = timetable.index_of(target_stop)
+        if initial == target:
+            return RouteInfo([initial_stop], 0, 0, 0, "", vehicle_bias, self)
+
+        arrivals, parents = self.search(
+            timetable, initial, target, departure_time, self.__max_rounds
+        )
+        reached = [
+            (round_arrivals[target], k)
+            for k, round_arrivals in enumerate(arrivals)
+            if round_arrivals[target] != float("inf")
+        ]
+        if not reached:
+            raise ValueError("Bu kalkış saatinden sonra hedefe ulaşan sefer yok!")
+        if self.__selection == RaptorRouteLogic.FEWEST_TRANSFERS:
+            arrival, rounds = min(reached, key=lambda item: item[1])
+        else:
+            arrival, rounds = min(reached)
+
+        instrumentation.count("rounds", len(arrivals) - 1, engine="RaptorRouteLogic")
+        with instrumentation.stage("path_reconstruction"):
+            legs = self.unroll_journey(timetable, parents, initial, target, rounds)
+            return self.route_from_legs(
+                timetable, initial, legs, arrival - departure_time, user, vehicle_bias
+            )
+
+    @staticmethod
+    def search(timetable: Timetable, initial, target, departure_time, max_rounds):
+        # (turlara göre varış listeleri, turlara göre {durak: ebeveyn}) döner.
+        # Ebeveyn ("ride", hat, sefer sırası, binilen sıra, inilen sıra) ya da
+        # ("walk", önceki durak) biçimindedir.
+        stop_count = timetable.stop_count()
+        route_stop_offsets = timetable.get_route_stop_offsets()
+        route_stops = timetable.get_route_stops()
+        route_trip_offsets = timetable.get_route_trip_offsets()
+        route_time_offsets = timetable.get_route_time_offsets()
+        arrival_times = timetable.get_arrivals()
+        departure_times = timetable.get_departures()
+        stop_route_offsets = timetable.get_stop_route_offsets()
+        stop_routes = timetable.get_stop_routes()
+        stop_route_positions = timetable.get_stop_route_positions()
+        footpath_offsets = timetable.get_footpath_offsets()
+        footpath_targets = timetable.get_footpath_targets()
+        footpath_times = timetable.get_footpath_times()
+        infinity = float("inf")
+
+        earliest = [infinity] * stop_count
+        current = [infinity] * stop_count
+        current[initial] = earliest[initial] = departure_time
+        parent = {}
+        marked = [initial]
+        for offset in range(footpath_offsets[initial], footpath_offsets[initial + 1]):
+            next_stop = footpath_targets[offset]
+            arrival = departure_time + footpath_times[offset]
+            if arrival < earliest[next_stop]:
+                current[next_stop] = earliest[next_stop] = arrival
+                parent[next_stop] = ("walk", initial)
+                marked.append(next_stop)
+        arrivals = [current]
+        parents = [parent]
+
+        for _ in range(max_rounds):
+            previous = arrivals[-1]
+            current = previous[:]
+            parent = {}
+
+            # Her hat, işaretli duraklarından en baştakinden itibaren bir kez taranır
+            queue = {}
+            for stop in marked:
+                for offset in range(stop_route_offsets[stop], stop_route_offsets[stop + 1]):
+                    route = stop_routes[offset]
+                    position = stop_route_positions[offset]
+                    if position < queue.get(route, position + 1):
+                        queue[route] = position
+
+            improved = []
+            for route, start in queue.items():
+                stop_base = route_stop_offsets[route]
+                stop_end = route_stop_offsets[route + 1]
+                trip_count = route_trip_offsets[route + 1] - route_trip_offsets[route]
+                time_base = route_time_offsets[route]
+                trip = -1
+                board_position = -1
+                for position in range(start, stop_end - stop_base):
+                    stop = route_stops[stop_base + position]
+                    row = time_base + position * trip_count
+                    if trip != -1:
+                        arrival = arrival_times[row + trip]
+                        if arrival < earliest[stop] and arrival < earliest[target]:
+                            current[stop] = earliest[stop] = arrival
+                            parent[stop] = ("ride", route, trip, board_position, position)
+                            improved.append(stop)
+                    ready = previous[stop]
+                    if ready != infinity and (
+                        trip == -1 or ready <= departure_times[row + trip]
+                    ):
+                        # Seferler sollamadığından her durakta kalkışlar sıralıdır
+                        earlier = (
+                            bisect.bisect_left(
+                                departure_times,
+                                ready,
+                                row,
+                                row + (trip if trip != -1 else trip_count),
+                            )
+                            - row
+                        )
+                        if earlier < (trip if trip != -1 else trip_count):
+                            trip = earlier
+                            board_position = position
+
+            # Yürüyüşler yalnızca araçla iyileşen duraklardan başlar
+            marked = list(dict.fromkeys(improved))
+            for stop in list(marked):
+                for offset in range(footpath_offsets[stop], footpath_offsets[stop + 1]):
+                    next_stop = footpath_targets[offset]
+                    arrival = current[stop] + footpath_times[offset]
+                    if arrival < earliest[next_stop] and arrival < earliest[target]:
+                        current[next_stop] = earliest[next_stop] = arrival
+                        parent[next_stop] = ("walk", stop)
+                        marked.append(next_stop)
+
+            arrivals.append(current)
+            parents.append(parent)
+            if not marked:
+                break
+        return arrivals, parents
+
+    @staticmethod
+    def unroll_journey(timetable: Timetable, parents, initial, target, rounds):
+        # [(ebeveyn, varılan durak)] listesi, yolculuk sırasıyla
+        route_stops = timetable.get_route_stops()
+        route_stop_offsets = timetable.get_route_stop_offsets()
+        legs = []
+        stop = target
+        while stop != initial:
+            parent = parents[rounds].get(stop)
+            if parent is None:
+                # Bu turda iyileşmeyen durağın etiketi önceki turdan gelir
+                rounds -= 1
+                continue
+            legs.append((parent, stop))
+            if parent[0] == "walk":
+                stop = parent[1]
+            else:
+                _, route, _, board_position, _ = parent
+                stop = route_stops[route_stop_offsets[route] + board_position]
+                rounds -= 1
+        legs.reverse()
+        return legs
+
+    def route_from_legs(
+        self, timetable: Timetable, initial, legs, seconds, user, vehicle_bias
+    ):
+        route_stops = timetable.get_route_stops()
+        route_stop_offsets = timetable.get_route_stop_offsets()
+        route_types = timetable.get_route_types()
+        route_fares = timetable.get_route_fares()
+
+        path_to_target = [timetable.stop_at(initial)]
+        total_distance = 0
+        total_price = 0
+        ride_count = 0
+        for parent, stop in legs:
+            if parent[0] == "walk":
+                leg_stops = [stop]
+            else:
+                _, route, _, board_position, alight_position = parent
+                base = route_stop_offsets[route]
+                leg_stops = [
+                    route_stops[base + position]
+                    for position in range(board_position + 1, alight_position + 1)
+                ]
+                ride_count += 1
+                if not (
+                    user.get_is_special_day() and route_types[route] in ["bus", "tram"]
+                ):
+                    total_price += route_fares[route]
+            for index in leg_stops:
+                previous_location = path_to_target[-1].get_location()
+                next_stop = timetable.stop_at(index)
+                total_distance += DistanceCalculator.calculate_distance(
+                    previous_location.get_latitude(),
+                    previous_location.get_longitude(),
+                    next_stop.get_location().get_latitude(),
+                    next_stop.get_location().get_longitude(),
+                )
+                path_to_target.append(next_stop)
+
+        # route_from_edges ile aynı indirim: her aktarma için 1 birim düşülür
+        total_price = user.get_discount(total_price)
+        transfer_count = max(0, ride_count - 1)
+        if total_price > transfer_count:
+            total_price -= transfer_count
+        else:
+            total_price = 0
+
+        return RouteInfo(
+            path_to_target,
+            seconds / 60,
+            total_distance,
+            total_price,
+            "",
+            vehicle_bias,
+            self,
+        )
+
+
+class TaxiRouteLogic(RouteLogic):
+    def __init__(self, taxi: Taxi):
+        super().__init__()
+        self.__taxi = taxi
+
+    def is_cacheable(self):
+        # Taksi rotası duraklara değil, yolcunun tam konumuna bağlıdır
+        return False
+
+    def calculateRoute(
+        self, stops, initial_stop, target_stop, user: Passenger, vehicle_bias
+    ):
+
+        distance = DistanceCalculator.calculate_distance(
+            user.get_passengerLocation().get_latitude(),
+            user.get_passengerLocation().get_longitude(),
+            user.get_passengerTargetLocation().get_latitude(),
+            user.get_passengerTargetLocation().get_longitude(),
+        )
+
+        if distance < 3:
+            route_info = RouteInfo(
+                route=[],
+                time=user.calculate_walking_time(distance),
+                distance=distance,
+                price=0,
+                routeName="🚶Yürüme Rotasi🚶",
+                vehicleBias=None,
+                routeLogic=self,
+            )
+            return route_info
+
+        taxi_fare = 0
+
+        taxi_fare = self.__taxi.calculate_fare(distance)
+
+        taxi_time = self.__taxi.calculate_taxi_time(distance)
+
+        route_info = RouteInfo(
+            route=[],
+            time=taxi_time,
+            distance=distance,
+            price=taxi_fare,
+            routeName="🚕Sadece taksi ile rota🚕",
+            vehicleBias="taxi",
+            routeLogic=self,
+        )
+        return route_info
+
+
+class RouteInfo:
+    __slots__ = (
+        "__route",
+        "__time",
+        "__distance",
+        "__price",
+        "__taxi_price",
+        "__routeName",
+        "__vehicleBias",
+        "__routeLogic",
+    )
+
+    def __init__(
+        self,
+        route,
+        time,
+        distance,
+        price,
+        routeName,
+        vehicleBias,
+        routeLogic: RouteLogic,
+    ):
+        self.__route = route
+        self.__time = time
+        self.__distance = distance
+        self.__price = price
+        self.__taxi_price = 0
+        self.__routeName = routeName
+        self.__vehicleBias = vehicleBias
+        self.__routeLogic = routeLogic
+
+    def get_route(self):
+        return self.__route
+
+    def get_time(self):
+        return self.__time
+
+    def get_distance(self):
+        return self.__distance
+
+    def get_price(self):
+        return self.__price
+
+    def get_taxi_price(self):
+        return self.__taxi_price
+
+    def get_routeName(self):
+        return self.__routeName
+
+    def get_vehicleBias(self):
+        return self.__vehicleBias
+
+    def get_routeLogic(self):
+        return self.__routeLogic
+
+    def set_route(self, route):
+        self.__route = route
+
+    def set_time(self, time):
+        self.__time = time
+
+    def set_distance(self, distance):
+        self.__distance = distance
+
+    def set_price(self, price):
+        self.__price = price
+
+    def set_taxi_price(self, taxi_price):
+        self.__taxi_price = taxi_price
+
+    def set_routeName(self, routeName):
+        self.__routeName = routeName
+
+    def set_vehicleBias(self, vehicleBias):
+        self.__vehicleBias = vehicleBias
+
+    def set_routeLogic(self, routeLogic):
+        self.__routeLogic = routeLogic
+
+    def copy(self):
+        route_copy = RouteInfo(
+            list(self.__route),
+            self.__time,
+            self.__distance,
+            self.__price,
+            self.__routeName,
+            self.__vehicleBias,
+            self.__routeLogic,
+        )
+        route_copy.set_taxi_price(self.__taxi_price)
+        return route_copy
@@ -0,0 +1,339 @@
+import bisect
+import functools
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+
+
+class MetricsSink(ABC):
+    # labels: sıralı (ad, değer) ikililerinden oluşan demet
+    @abstractmethod
+    def record_timing(self, stage, labels, seconds):
+        pass
+
+    @abstractmethod
+    def record_count(self, name, labels, value):
+        pass
+
+    def close(self):
+        pass
+
+
+class Histogram:
+    # Kova üst sınırları saniye cinsindendir; son kova +Inf'tir
+    BUCKETS = (
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    )
+
+    def __init__(self):
+        self.__bucket_counts = [0] * (len(Histogram.BUCKETS) + 1)
+        self.__count = 0
+        self.__total = 0.0
+        self.__maximum = 0.0
+
+    def observe(self, value):
+        self.__bucket_counts[bisect.bisect_left(Histogram.BUCKETS, value)] += 1
+        self.__count += 1
+        self.__total += value
+        if value > self.__maximum:
+            self.__maximum = value
+
+    def get_bucket_counts(self):
+        return self.__bucket_counts
+
+    def get_count(self):
+        return self.__count
+
+    def get_total(self):
+        return self.__total
+
+    def get_maximum(self):
+        return self.__maximum
+
+    def quantile(self, fraction):
+        # Kova sınırından tahmin edilir; en üst kovada gözlenen en büyük değer döner
+        if self.__count == 0:
+            return 0.0
+        rank = fraction * self.__count
+        seen = 0
+        for i, bucket_count in enumerate(self.__bucket_counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                if i < len(Histogram.BUCKETS):
+                    return min(Histogram.BUCKETS[i], self.__maximum)
+                return self.__maximum
+        return self.__maximum
+
+
+class HistogramSink(MetricsSink):
+    # Süreç içinde aşama başına histogram ve olay sayaçları tutar
+    def __init__(self):
+        self.__histograms = {}
+        self.__counters = {}
+        self.__lock = threading.Lock()
+
+    def record_timing(self, stage, labels, seconds):
+        with self.__lock:
+            histogram = self.__histograms.get((stage, labels))
+            if histogram is None:
+                histogram = self.__histograms[(stage, labels)] = Histogram()
+            histogram.observe(seconds)
+
+    def record_count(self, name, labels, value):
+        with self.__lock:
+            key = (name, labels)
+            self.__counters[key] = self.__counters.get(key, 0) + value
+
+    def get_histogram(self, stage, **labels):
+        return self.__histograms.get((stage, tuple(sorted(labels.items()))))
+
+    def get_counter(self, name, **labels):
+        return self.__counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def reset(self):
+        with self.__lock:
+            self.__histograms.clear()
+            self.__counters.clear()
+
+    def snapshot(self):
+        with self.__lock:
+            stages = [
+                {
+                    "stage": stage,
+                    "labels": dict(labels),
+                    "count": histogram.get_count(),
+                    "total_ms": histogram.get_total() * 1000,
+                    "avg_ms": histogram.get_total() / histogram.get_count() * 1000,
+                    "p50_ms": histogram.quantile(0.5) * 1000,
+                    "p95_ms": histogram.quantile(0.95) * 1000,
+                    "max_ms": histogram.get_maximum() * 1000,
+                }
+                for (stage, labels), histogram in sorted(self.__histograms.items())
+            ]
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self.__counters.items())
+            ]
+        return {"stages": stages, "counters": counters}
+
+    def to_openmetrics(self, prefix="rota"):
+        lines = [
+            f"# TYPE {prefix}_stage_seconds histogram",
+            f"# UNIT {prefix}_stage_seconds seconds",
+            f"# HELP {prefix}_stage_seconds Rota hattı aşama süreleri.",
+        ]
+        with self.__lock:
+            for (stage, labels), histogram in sorted(self.__histograms.items()):
+                base = (("stage", stage),) + labels
+                cumulative = 0
+                for i, bucket_count in enumerate(histogram.get_bucket_counts()):
+                    cumulative += bucket_count
+                    bound = (
+                        repr(Histogram.BUCKETS[i])
+                        if i < len(Histogram.BUCKETS)
+                        else "+Inf"
+                    )
+                    lines.append(
+                        f"{prefix}_stage_seconds_bucket"
+                        f"{format_labels(base + (('le', bound),))} {cumulative}"
+                    )
+                lines.append(
+                    f"{prefix}_stage_seconds_count{format_labels(base)} "
+                    f"{histogram.get_count()}"
+                )
+                lines.append(
+                    f"{prefix}_stage_seconds_sum{format_labels(base)} "
+                    f"{histogram.get_total()!r}"
+                )
+            lines.append(f"# TYPE {prefix}_events counter")
+            lines.append(f"# HELP {prefix}_events Arama ve önbellek olay sayaçları.")
+            for (name, labels), value in sorted(self.__counters.items()):
+                lines.append(
+                    f"{prefix}_events_total"
+                    f"{format_labels((('event', name),) + labels)} {value}"
+                )
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class JsonLinesSink(MetricsSink):
+    # Her ölçüm dosyaya bir JSON satırı olarak eklenir; satırlar tek write ile
+    # yazıldığından aynı dosyayı paylaşan işçi süreçleri birbirini bölmez
+    def __init__(self, file_name):
+        self.__file = open(file_name, "a", encoding="utf-8", buffering=1)
+        self.__lock = threading.Lock()
+
+    def record_timing(self, stage, labels, seconds):
+        self.__write(
+            {
+                "time": time.time(),
+                "type": "timing",
+                "stage": stage,
+                "labels": dict(labels),
+                "seconds": seconds,
+            }
+        )
+
+    def record_count(self, name, labels, value):
+        self.__write(
+            {
+                "time": time.time(),
+                "type": "count",
+                "name": name,
+                "labels": dict(labels),
+                "value": value,
+            }
+        )
+
+    def __write(self, event):
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self.__lock:
+            self.__file.write(line)
+
+    def close(self):
+        self.__file.close()
+
+
+class EventBuffer(MetricsSink):
+    # İşçi süreçlerinde ölçümleri biriktirir; drain() ile alınan olaylar ana
+    # süreçte Instrumentation.replay ile asıl hedeflere aktarılır
+    def __init__(self):
+        self.__events = []
+
+    def record_timing(self, stage, labels, seconds):
+        self.__events.append(("timing", stage, labels, seconds))
+
+    def record_count(self, name, labels, value):
+        self.__events.append(("count", name, labels, value))
+
+    def drain(self):
+        events = self.__events
+        self.__events = []
+        return events
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class _Stage:
+    def __init__(self, instrumentation, stage, labels):
+        self.__instrumentation = instrumentation
+        self.__stage = stage
+        self.__labels = labels
+        self.__start = 0.0
+
+    def __enter__(self):
+        self.__start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__instrumentation.record_timing(
+            self.__stage, time.perf_counter() - self.__start, self.__labels
+        )
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Instrumentation:
+    # Hiç hedef eklenmemişse stage() paylaşılan boş bir bağlam döndürür ve
+    # arama motorları sayaçlarını hesaplamaz; kapalıyken maliyet tek bir
+    # öznitelik okumasıdır
+    def __init__(self):
+        self.enabled = False
+        self.__sinks = []
+
+    def get_sinks(self):
+        return list(self.__sinks)
+
+    def add_sink(self, sink: MetricsSink):
+        self.__sinks.append(sink)
+        self.enabled = True
+        return sink
+
+    def remove_sink(self, sink: MetricsSink):
+        self.__sinks.remove(sink)
+        self.enabled = bool(self.__sinks)
+
+    def close(self):
+        for sink in self.__sinks:
+            sink.close()
+        self.__sinks = []
+        self.enabled = False
+
+    def stage(self, stage, **labels):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, stage, tuple(sorted(labels.items())))
+
+    def timed(self, stage):
+        # Yöntemler için dekoratör: instrumentation.timed("save_map")
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with self.stage(stage):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def record_timing(self, stage, seconds, labels=()):
+        for sink in self.__sinks:
+            sink.record_timing(stage, labels, seconds)
+
+    def count(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        labels = tuple(sorted(labels.items()))
+        for sink in self.__sinks:
+            sink.record_count(name, labels, value)
+
+    def replay(self, events):
+        for kind, name, labels, value in events:
+            labels = tuple(tuple(label) for label in labels)
+            for sink in self.__sinks:
+                if kind == "timing":
+                    sink.record_timing(name, labels, value)
+                else:
+                    sink.record_count(name, labels, value)
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(
+        f'{name}="{escape_label(value)}"' for name, value in labels
+    ) + "}"
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Paket genelinde paylaşılan tek ölçüm noktası
+instrumentation = Instrumentation()
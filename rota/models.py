@@ -0,0 +1,449 @@
+import json
+import operator
+import os
+import sys
+from abc import ABC, abstractmethod
+
+
+def intern_string(value):
+    # Aynı durak kimliği ve tür adı tüm nesnelerde tek bir str olarak tutulur
+    return sys.intern(value) if type(value) is str else value
+
+
+class NextStop(tuple):
+    # veriseti.json'daki {"stopId", "mesafe", "sure", "ucret"} bağlantısının
+    # sabit düzenli (stopId, mesafe, sure, ucret) demeti. Alanlara
+    # next_stop.stopId gibi adla ya da sırayla erişilir; to_dict() JSON'daki
+    # sözlüğü verir.
+    __slots__ = ()
+    FIELDS = ("stopId", "mesafe", "sure", "ucret")
+
+    stopId = property(operator.itemgetter(0))
+    mesafe = property(operator.itemgetter(1))
+    sure = property(operator.itemgetter(2))
+    ucret = property(operator.itemgetter(3))
+
+    # _make((stopId, mesafe, sure, ucret)) Python çerçevesi açmadan oluşturur;
+    # çağıran durak kimliğini intern_string ile vermelidir
+    _make = classmethod(tuple.__new__)
+
+    def __new__(cls, stopId, mesafe, sure, ucret):
+        return tuple.__new__(cls, (intern_string(stopId), mesafe, sure, ucret))
+
+    @staticmethod
+    def from_value(value):
+        if type(value) is NextStop:
+            return value
+        return NextStop(value["stopId"], value["mesafe"], value["sure"], value["ucret"])
+
+    def __repr__(self):
+        values = zip(NextStop.FIELDS, self)
+        fields = ", ".join(f"{name}={value!r}" for name, value in values)
+        return f"NextStop({fields})"
+
+    def __getnewargs__(self):
+        return tuple(self)
+
+    def to_dict(self):
+        return dict(zip(NextStop.FIELDS, self))
+
+
+class Stop:
+    __slots__ = (
+        "__stopid",
+        "__name",
+        "__type",
+        "__location",
+        "__son_durak",
+        "__nextStops",
+        "__transfers",
+    )
+
+    def __init__(self, stopid, name, type, location, son_durak, nextStops, transfers):
+        self.__stopid = intern_string(stopid)
+        self.__name = name
+        self.__type = intern_string(type)
+        self.__location = location
+        self.__son_durak = son_durak
+        self.__nextStops = [NextStop.from_value(next_stop) for next_stop in nextStops]
+        self.__transfers = transfers
+
+    def get_stopid(self):
+        return self.__stopid
+
+    def get_name(self):
+        return self.__name
+
+    def get_type(self):
+        return self.__type
+
+    def get_location(self):
+        return self.__location
+
+    def get_son_durak(self):
+        return self.__son_durak
+
+    def get_nextStops(self):
+        return self.__nextStops
+
+    def get_transfers(self):
+        return self.__transfers
+
+    def set_stopid(self, stopid):
+        self.__stopid = intern_string(stopid)
+
+    def set_name(self, name):
+        self.__name = name
+
+    def set_type(self, type):
+        self.__type = intern_string(type)
+
+    def set_location(self, location):
+        self.__location = location
+
+    def set_son_durak(self, son_durak):
+        self.__son_durak = son_durak
+
+    def set_nextStops(self, nextStops):
+        self.__nextStops = [NextStop.from_value(next_stop) for next_stop in nextStops]
+
+    def set_transfers(self, transfers):
+        self.__transfers = transfers
+
+
+class Transfer:
+    __slots__ = ("__transferStopId", "__sure", "__ucret")
+
+    def __init__(self, transferStopId, sure, ucret):
+        self.__transferStopId = intern_string(transferStopId)
+        self.__sure = sure
+        self.__ucret = ucret
+
+    def get_transferStopId(self):
+        return self.__transferStopId
+
+    def get_sure(self):
+        return self.__sure
+
+    def get_ucret(self):
+        return self.__ucret
+
+    def set_transferStopId(self, transferStopId):
+        self.__transferStopId = intern_string(transferStopId)
+
+    def set_sure(self, sure):
+        self.__sure = sure
+
+    def set_ucret(self, ucret):
+        self.__ucret = ucret
+
+
+class Distance_Based_Fare(ABC):
+    @abstractmethod
+    def calculate_fare(self, distance):
+        pass
+
+    @abstractmethod
+    def set_fees(self, json_file):
+        pass
+
+
+class Fixed_Fare(ABC):
+    @abstractmethod
+    def returnIconPath(self):
+        pass
+
+
+class Vehicle(ABC):
+    def __init__(self, markerGroup):
+        self.markerGroup = markerGroup
+
+    @abstractmethod
+    def returnMarkerGroup(self):
+        pass
+
+
+class Bus(Vehicle, Fixed_Fare):
+    def __init__(self, busIconFileName, busMarkerGroup):
+        super().__init__(busMarkerGroup)
+        self.busIconFileName = busIconFileName
+        self.busIconPath = os.path.join(os.getcwd(), busIconFileName)
+        self.linecolor = "green"
+        self.isTiedToGoverment = True
+
+    def returnMarkerGroup(self):
+        return self.markerGroup
+
+    def returnIconPath(self):
+        return self.busIconPath
+
+
+class Tram(Vehicle, Fixed_Fare):
+    def __init__(self, tramIconFileName, tramMarkerGroup):
+        super().__init__(tramMarkerGroup)
+        self.tramIconFileName = tramIconFileName
+        self.tramIconPath = os.path.join(os.getcwd(), tramIconFileName)
+        self.linecolor = "darkred"
+        self.isTiedToGoverment = True
+
+    def returnMarkerGroup(self):
+        return self.markerGroup
+
+    def returnIconPath(self):
+        return self.tramIconPath
+
+
+class Taxi(Vehicle, Distance_Based_Fare):
+
+    def __init__(self, opening_fee, cost_per_km, taxiMarkerGroup):
+        self.opening_fee = opening_fee
+        self.cost_per_km = cost_per_km
+        self.speed = 70
+        self.linecolor = "yellow"
+        super().__init__(taxiMarkerGroup)
+        self.tiedToGoverment = False
+
+    def setMarkerGroup(self, tMarker):
+        self.markerGroup = tMarker
+
+    def returnMarkerGroup(self):
+        return self.markerGroup
+
+    def calculate_fare(self, distance):
+        return self.opening_fee + (distance * self.cost_per_km)
+
+    def calculate_taxi_time(self, distance):
+        time_by_hour = distance / self.speed
+        time_by_minute = time_by_hour * 60
+        return time_by_minute
+
+    def set_fees(self, json_file):
+        with open(json_file, "r", encoding="utf-8") as file:
+            self.set_fee_values(json.load(file).get("taxi"))
+
+    def set_fee_values(self, taxi_fees):
+        # StopLoader.load_dataset'in döndürdüğü "taxi" bölümünü doğrudan alır
+        if taxi_fees is None:
+            raise ValueError("'taxi' anahtarı bulunamadı!")
+        self.opening_fee = taxi_fees["openingFee"]
+        self.cost_per_km = taxi_fees["costPerKm"]
+
+
+class Passenger(ABC):
+    def __init__(
+        self,
+        passenger_type,
+        passengerLocation,
+        passengerTargetLocation,
+        creditCards=None,
+        cash_cards=None,
+        kent_cards=None,
+        is_special_day=False,
+    ):
+        self.__passenger_type = passenger_type
+        self.__passengerLocation = passengerLocation
+        self.__passengerTargetLocation = passengerTargetLocation
+        self.__creditCards = creditCards if creditCards else []
+        self.__cash_cards = cash_cards if cash_cards else []
+        self.__kent_cards = kent_cards if kent_cards else []
+        self.__walkingSpeed = 5
+        self.__is_special_day = is_special_day
+
+    def get_passenger_type(self):
+        return self.__passenger_type
+
+    def get_passengerLocation(self):
+        return self.__passengerLocation
+
+    def get_passengerTargetLocation(self):
+        return self.__passengerTargetLocation
+
+    def get_creditCards(self):
+        return self.__creditCards
+
+    def get_cash_cards(self):
+        return self.__cash_cards
+
+    def get_kent_cards(self):
+        return self.__kent_cards
+
+    def get_walkingSpeed(self):
+        return self.__walkingSpeed
+
+    def set_passengerLocation(self, location):
+        self.__passengerLocation = location
+
+    def set_passengerTargetLocation(self, location):
+        self.__passengerTargetLocation = location
+
+    def set_creditCards(self, creditCards):
+        self.__creditCards = creditCards
+
+    def set_cash_cards(self, cash_cards):
+        self.__cash_cards = cash_cards
+
+    def set_kent_cards(self, kent_cards):
+        self.__kent_cards = kent_cards
+
+    def set_walkingSpeed(self, walkingSpeed):
+        self.__walkingSpeed = walkingSpeed
+
+    @abstractmethod
+    def get_discount(self, fare):
+        pass
+
+    def calculate_walking_time(self, distance):
+        return distance / self.__walkingSpeed
+
+    def calculate_walking_minutes(self, distance):
+        # Bağlantı süreleri ve Taxi.calculate_taxi_time ile aynı birim (dakika)
+        return self.calculate_walking_time(distance) * 60
+
+    def get_is_special_day(self):
+        return self.__is_special_day
+
+    def set_is_special_day(self, is_special_day):
+        self.__is_special_day = is_special_day
+
+    def get_creditCard_Money_Amount(self):
+        balance = 0
+        if self.__creditCards is not None:
+            for card in self.__creditCards:
+                balance += card.balance
+        return balance
+
+    def get_cash_Money_Amount(self):
+        balance = 0
+        if self.__cash_cards is not None:
+            for card in self.__cash_cards:
+                balance += card.balance
+        return balance
+
+    def get_kentCard_Money_Amount(self):
+        balance = 0
+        if self.__kent_cards is not None:
+            for card in self.__kent_cards:
+                balance += card.balance
+        return balance
+
+    def can_pay(self, amount):
+        total_balance = (
+            self.get_cash_Money_Amount()
+            + self.get_creditCard_Money_Amount()
+            + self.get_kentCard_Money_Amount()
+        )
+        return total_balance >= amount
+
+
+class General(Passenger):
+    def __init__(
+        self,
+        passenger_type,
+        passengerLocation,
+        passengerTargetLocation,
+        creditCards=None,
+        cash_cards=None,
+        kent_cards=None,
+        is_special_day=False,
+    ):
+        super().__init__(
+            "Genel",
+            passengerLocation,
+            passengerTargetLocation,
+            creditCards,
+            cash_cards,
+            kent_cards,
+            is_special_day,
+        )
+
+    def get_discount(self, fare):
+        return fare
+
+
+class Student(Passenger):
+    def __init__(
+        self,
+        passenger_type,
+        passengerLocation,
+        passengerTargetLocation,
+        creditCards=None,
+        cash_cards=None,
+        kent_cards=None,
+        is_special_day=False,
+    ):
+        super().__init__(
+            "Öğrenci",
+            passengerLocation,
+            passengerTargetLocation,
+            creditCards,
+            cash_cards,
+            kent_cards,
+            is_special_day,
+        )
+
+    def get_discount(self, fare):
+        return fare * 0.5
+
+
+class Elderly(Passenger):
+    def __init__(
+        self,
+        passenger_type,
+        passengerLocation,
+        passengerTargetLocation,
+        creditCards=None,
+        cash_cards=None,
+        kent_cards=None,
+        is_special_day=False,
+    ):
+        super().__init__(
+            "Yaşlı",
+            passengerLocation,
+            passengerTargetLocation,
+            creditCards,
+            cash_cards,
+            kent_cards,
+            is_special_day,
+        )
+
+    def get_discount(self, fare):
+        return 0
+
+
+class PaymentType(ABC):
+    def __init__(self, balance):
+        self.balance = balance
+
+    @abstractmethod
+    def pay(self, fare):
+        pass
+
+
+class KrediKarti(PaymentType):
+    def __init__(self, balance):
+        super().__init__(balance)
+
+    def pay(self, fare):
+        if self.balance >= fare:
+            return True
+        return False
+
+
+class Nakit(PaymentType):
+    def __init__(self, balance):
+        super().__init__(balance)
+
+    def pay(self, fare):
+        if self.balance >= fare:
+            return True
+        return False
+
+
+class KentKart(PaymentType):
+    def __init__(self, balance):
+        super().__init__(balance)
+
+    def pay(self, fare):
+        if self.balance >= fare:
+            return True
+        return False
@@ -0,0 +1,286 @@
+from collections import OrderedDict
+
+from .graph import CompiledGraph, StopLoader, StopSpatialIndex
+from .logic import (
+    AllPairsRouteLogic,
+    AllPairsTable,
+    ContractionHierarchy,
+    ContractionHierarchyRouteLogic,
+    RouteLogic,
+)
+from .metrics import instrumentation
+from .models import Passenger
+
+
+class RoutePlanner:
+    # Bu mesafeye (km) kadar durağa yürünür, daha uzağa taksiyle gidilir
+    WALKING_LIMIT = 3
+
+    def __init__(self, stops, vehicles, distance_calculator, cache_size=256):
+        self.stops = stops
+        self.vehicles = vehicles
+        self.distance_calculator = distance_calculator
+        self.spatial_index = StopSpatialIndex(stops)
+        self.all_pairs_table = None
+        self.contraction_hierarchy = None
+        self.cache_size = cache_size
+        self.route_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def set_stops(self, stops):
+        self.stops = stops
+        self.spatial_index = StopSpatialIndex(stops)
+        self.clear_route_cache()
+
+    def reload_stops(self, json_file):
+        self.set_stops(StopLoader.load_dataset(json_file)[0])
+
+    def load_all_pairs_table(self, table_file, graph: CompiledGraph):
+        self.all_pairs_table = AllPairsTable.load(table_file, graph)
+        self.clear_route_cache()
+        return AllPairsRouteLogic(self.all_pairs_table)
+
+    def load_contraction_hierarchy(self, hierarchy_file, graph: CompiledGraph):
+        self.contraction_hierarchy = ContractionHierarchy.load(hierarchy_file, graph)
+        self.clear_route_cache()
+        return ContractionHierarchyRouteLogic(self.contraction_hierarchy)
+
+    def clear_route_cache(self):
+        self.route_cache.clear()
+
+    def apply_update(self, graph: CompiledGraph, update):
+        # Kesinti ve gecikmeler yeniden başlatmadan uygulanır: skor dizileri ve
+        # tüm-çiftler tablosu yerinde onarılır, daraltma hiyerarşisi sürüm
+        # farkından eskidiğini anlar. Önbellekteki rotalardan hangisinin daha
+        # kısa bir yola kavuştuğu bilinemediği için rota önbelleği temizlenir.
+        with instrumentation.stage("network_update"):
+            changed_edges = graph.apply_update(update)
+            if (
+                self.all_pairs_table is not None
+                and self.all_pairs_table.get_graph() is graph
+            ):
+                self.all_pairs_table.repair(changed_edges)
+            self.clear_route_cache()
+        instrumentation.count("network_updates", action=update["action"])
+        return changed_edges
+
+    def get_cache_info(self):
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "size": len(self.route_cache),
+            "max_size": self.cache_size,
+        }
+
+    def calculate_stop_route(
+        self, user: Passenger, initial_stop, target_stop, vehicle_bias, route_logic
+    ):
+        if not route_logic.is_cacheable() or self.cache_size <= 0:
+            return self.__calculate_route(
+                user, initial_stop, target_stop, vehicle_bias, route_logic
+            )
+
+        key = (
+            initial_stop.get_stopid(),
+            target_stop.get_stopid(),
+            user.get_passenger_type(),
+            user.get_is_special_day(),
+            vehicle_bias,
+            route_logic,
+        )
+        cached_route = self.route_cache.get(key)
+        if cached_route is not None:
+            self.cache_hits += 1
+            instrumentation.count("route_cache.hits")
+            self.route_cache.move_to_end(key)
+            return cached_route.copy()
+
+        self.cache_misses += 1
+        instrumentation.count("route_cache.misses")
+        route_obj = self.__calculate_route(
+            user, initial_stop, target_stop, vehicle_bias, route_logic
+        )
+        self.route_cache[key] = route_obj.copy()
+        if len(self.route_cache) > self.cache_size:
+            self.route_cache.popitem(last=False)
+        return route_obj
+
+    def __calculate_route(
+        self, user: Passenger, initial_stop, target_stop, vehicle_bias, route_logic
+    ):
+        with instrumentation.stage(
+            "calculate_route", logic=type(route_logic).__name__
+        ):
+            return route_logic.calculateRoute(
+                self.stops, initial_stop, target_stop, user, vehicle_bias
+            )
+
+    def create_query(self, user: Passenger, target_location):
+        return RouteQuery(self, user, target_location)
+
+    def find_nearest_stop(self, location):
+        with instrumentation.stage("nearest_stop"):
+            return self.spatial_index.nearest(location)
+
+    def find_k_nearest_stops(self, location, k):
+        return self.spatial_index.k_nearest(location, k)
+
+    def find_stops_within_radius(self, location, radius):
+        return self.spatial_index.within_radius(location, radius)
+
+    def finalize_routes(
+        self,
+        user: Passenger,
+        target_location,
+        vehicle_bias,
+        route_logic: RouteLogic,
+        routeName,
+        query=None,
+    ):
+        # Aynı sorgunun varyantları için create_query ile tek bir RouteQuery
+        # verilirse durak eşleme ve mesafeler bir kez hesaplanır
+        if query is None:
+            query = self.create_query(user, target_location)
+
+        route_obj = self.calculate_stop_route(
+            user,
+            query.get_initial_stop(),
+            query.get_target_stop(),
+            vehicle_bias,
+            route_logic,
+        )
+        if not route_obj.get_route():
+            return route_obj  # Taxi icin
+
+        # Aynı durak dizisini veren varyantların son hali bir kez hesaplanır
+        path_key = (
+            tuple(stop.get_stopid() for stop in route_obj.get_route()),
+            route_obj.get_time(),
+            route_obj.get_distance(),
+            route_obj.get_price(),
+        )
+        finalized_route = query.get_finalized_route(path_key)
+        if finalized_route is not None:
+            route_obj.set_taxi_price(finalized_route.get_taxi_price())
+            route_obj.set_price(finalized_route.get_price())
+            route_obj.set_time(finalized_route.get_time())
+            route_obj.set_distance(finalized_route.get_distance())
+            route_obj.set_routeName(routeName)
+            return route_obj
+
+        # Yolcudan ilk durağa ve son duraktan hedefe yürüme ya da taksi
+        with instrumentation.stage("first_last_mile"):
+            final_closest_stop = route_obj.get_route()[0]
+            final_target_stop = route_obj.get_route()[-1]
+
+            distance_to_closest_stop = query.distance_from_start(final_closest_stop)
+
+            taxi_price = 0
+            taxi_time = 0
+            walking_time = 0
+
+            if distance_to_closest_stop > RoutePlanner.WALKING_LIMIT:
+                taxi_price = self.vehicles["taxi"].calculate_fare(
+                    distance_to_closest_stop
+                )
+                taxi_time = self.vehicles["taxi"].calculate_taxi_time(
+                    distance_to_closest_stop
+                )
+            else:
+                walking_time = user.calculate_walking_time(distance_to_closest_stop)
+
+            target_stop_distance = query.distance_to_target(final_target_stop)
+
+            if target_stop_distance > RoutePlanner.WALKING_LIMIT:
+                taxi_price += self.vehicles["taxi"].calculate_fare(
+                    target_stop_distance
+                )
+                taxi_time += self.vehicles["taxi"].calculate_taxi_time(
+                    target_stop_distance
+                )
+            else:
+                walking_time += user.calculate_walking_time(target_stop_distance)
+
+            route_obj.set_taxi_price(taxi_price)
+            route_obj.set_price(route_obj.get_price() + taxi_price)
+            route_obj.set_time(route_obj.get_time() + taxi_time + walking_time)
+            route_obj.set_routeName(routeName)
+            route_obj.set_distance(
+                route_obj.get_distance()
+                + target_stop_distance
+                + distance_to_closest_stop
+            )
+        query.add_finalized_route(path_key, route_obj.copy())
+        return route_obj
+
+
+class RouteQuery:
+    # Bir başlangıç-hedef sorgusunun tüm rota varyantlarınca paylaşılan durumu:
+    # en yakın duraklar, yolcu ve hedefe olan mesafeler, tamamlanmış rotalar
+    def __init__(self, route_planner: RoutePlanner, user: Passenger, target_location):
+        self.__route_planner = route_planner
+        self.__user_location = user.get_passengerLocation()
+        self.__target_location = target_location
+        self.__initial_stop = None
+        self.__target_stop = None
+        self.__direct_distance = None
+        self.__start_distances = {}
+        self.__target_distances = {}
+        self.__finalized_routes = {}
+
+    def get_user_location(self):
+        return self.__user_location
+
+    def get_target_location(self):
+        return self.__target_location
+
+    def get_initial_stop(self):
+        if self.__initial_stop is None:
+            self.__initial_stop = self.__route_planner.find_nearest_stop(
+                self.__user_location
+            )
+        return self.__initial_stop
+
+    def get_target_stop(self):
+        if self.__target_stop is None:
+            self.__target_stop = self.__route_planner.find_nearest_stop(
+                self.__target_location
+            )
+        return self.__target_stop
+
+    def get_direct_distance(self):
+        if self.__direct_distance is None:
+            self.__direct_distance = self.__distance(
+                self.__user_location, self.__target_location
+            )
+        return self.__direct_distance
+
+    def distance_from_start(self, stop):
+        return self.__stop_distance(self.__start_distances, self.__user_location, stop)
+
+    def distance_to_target(self, stop):
+        return self.__stop_distance(
+            self.__target_distances, self.__target_location, stop
+        )
+
+    def get_finalized_route(self, path_key):
+        return self.__finalized_routes.get(path_key)
+
+    def add_finalized_route(self, path_key, route_obj):
+        self.__finalized_routes[path_key] = route_obj
+
+    def __stop_distance(self, distances, location, stop):
+        distance = distances.get(stop.get_stopid())
+        if distance is None:
+            distance = self.__distance(location, stop.get_location())
+            distances[stop.get_stopid()] = distance
+        return distance
+
+    def __distance(self, first_location, second_location):
+        return self.__route_planner.distance_calculator.calculate_distance(
+            first_location.get_latitude(),
+            first_location.get_longitude(),
+            second_location.get_latitude(),
+            second_location.get_longitude(),
+        )
@@ -0,0 +1,464 @@
+import csv
+import datetime
+import io
+import os
+import zipfile
+from array import array
+
+from .geo import DistanceCalculator, Location
+from .graph import StopSpatialIndex
+from .models import NextStop, Stop, Transfer
+
+
+class Timetable:
+    # RAPTOR için dizi tabanlı tarife. Aynı durak dizisini izleyen ve
+    # birbirini sollamayan seferler tek hatta toplanır: r hattının durakları
+    # route_stops[route_stop_offsets[r]:route_stop_offsets[r + 1]], seferleri
+    # kalkış sırasıyla trip_ids[route_trip_offsets[r]:route_trip_offsets[r + 1]].
+    # Saatler gece yarısından itibaren saniyedir ve durak-önce dizilir: hattın
+    # p. durağındaki i. seferi route_time_offsets[r] + p * sefer_sayısı + i.
+    def __init__(
+        self,
+        stops,
+        stop_ids,
+        route_ids,
+        route_types,
+        route_fares,
+        route_stop_offsets,
+        route_stops,
+        route_trip_offsets,
+        trip_ids,
+        route_time_offsets,
+        arrivals,
+        departures,
+        footpath_offsets,
+        footpath_targets,
+        footpath_times,
+    ):
+        self.__stops = stops
+        self.__stop_ids = stop_ids
+        self.__index = {stop_id: i for i, stop_id in enumerate(stop_ids)}
+        self.__stop_objects = [stops[stop_id] for stop_id in stop_ids]
+        self.__route_ids = route_ids
+        self.__route_types = route_types
+        self.__route_fares = route_fares
+        self.__route_stop_offsets = route_stop_offsets
+        self.__route_stops = route_stops
+        self.__route_trip_offsets = route_trip_offsets
+        self.__trip_ids = trip_ids
+        self.__route_time_offsets = route_time_offsets
+        self.__arrivals = arrivals
+        self.__departures = departures
+        self.__footpath_offsets = footpath_offsets
+        self.__footpath_targets = footpath_targets
+        self.__footpath_times = footpath_times
+
+        # Durak -> (hat, hattaki sıra) listesi, sayma sıralamasıyla CSR olarak
+        stop_count = len(stop_ids)
+        self.__stop_route_offsets = array("l", [0]) * (stop_count + 1)
+        for stop in route_stops:
+            self.__stop_route_offsets[stop + 1] += 1
+        for i in range(stop_count):
+            self.__stop_route_offsets[i + 1] += self.__stop_route_offsets[i]
+        position = array("l", self.__stop_route_offsets[:-1])
+        self.__stop_routes = array("l", [0]) * len(route_stops)
+        self.__stop_route_positions = array("l", [0]) * len(route_stops)
+        for route in range(len(route_ids)):
+            start = route_stop_offsets[route]
+            for offset in range(start, route_stop_offsets[route + 1]):
+                stop = route_stops[offset]
+                self.__stop_routes[position[stop]] = route
+                self.__stop_route_positions[position[stop]] = offset - start
+                position[stop] += 1
+
+    def get_stops(self):
+        return self.__stops
+
+    def get_stop_ids(self):
+        return self.__stop_ids
+
+    def get_route_ids(self):
+        return self.__route_ids
+
+    def get_route_types(self):
+        return self.__route_types
+
+    def get_route_fares(self):
+        return self.__route_fares
+
+    def get_route_stop_offsets(self):
+        return self.__route_stop_offsets
+
+    def get_route_stops(self):
+        return self.__route_stops
+
+    def get_route_trip_offsets(self):
+        return self.__route_trip_offsets
+
+    def get_trip_ids(self):
+        return self.__trip_ids
+
+    def get_route_time_offsets(self):
+        return self.__route_time_offsets
+
+    def get_arrivals(self):
+        return self.__arrivals
+
+    def get_departures(self):
+        return self.__departures
+
+    def get_stop_route_offsets(self):
+        return self.__stop_route_offsets
+
+    def get_stop_routes(self):
+        return self.__stop_routes
+
+    def get_stop_route_positions(self):
+        return self.__stop_route_positions
+
+    def get_footpath_offsets(self):
+        return self.__footpath_offsets
+
+    def get_footpath_targets(self):
+        return self.__footpath_targets
+
+    def get_footpath_times(self):
+        return self.__footpath_times
+
+    def stop_count(self):
+        return len(self.__stop_ids)
+
+    def route_count(self):
+        return len(self.__route_ids)
+
+    def trip_count(self):
+        return len(self.__trip_ids)
+
+    def index_of(self, stop):
+        return self.__index[stop.get_stopid()]
+
+    def stop_at(self, index):
+        return self.__stop_objects[index]
+
+
+class GTFSLoader:
+    # GTFS route_type değerlerinden raylı olanlar tramvay, diğerleri otobüs sayılır
+    RAIL_ROUTE_TYPES = {"0", "1", "2", "5", "7", "12"}
+    FOOTPATH_RADIUS_KM = 0.25
+    WALKING_SPEED_KMH = 5
+
+    @staticmethod
+    def parse_time(value):
+        # GTFS saatleri 24:00:00'ı aşabilir (gece yarısından sonraki seferler)
+        hours, minutes, seconds = value.strip().split(":")
+        return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+    @staticmethod
+    def read_table(feed, name, required=True):
+        # feed bir klasör ya da .zip GTFS arşivi olabilir
+        if os.path.isdir(feed):
+            path = os.path.join(feed, name)
+            if not os.path.exists(path):
+                if required:
+                    raise ValueError(f"GTFS dosyası bulunamadı: {name}")
+                return []
+            with open(path, "r", encoding="utf-8-sig", newline="") as file:
+                return list(csv.DictReader(file))
+        with zipfile.ZipFile(feed) as archive:
+            if name not in archive.namelist():
+                if required:
+                    raise ValueError(f"GTFS dosyası bulunamadı: {name}")
+                return []
+            with archive.open(name) as raw:
+                text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+                return list(csv.DictReader(text))
+
+    @staticmethod
+    def __read_stop_times(feed, trip_routes):
+        trips = {}
+        for row in GTFSLoader.read_table(feed, "stop_times.txt"):
+            if row["trip_id"] in trip_routes:
+                trips.setdefault(row["trip_id"], []).append(row)
+
+        stop_times = {}
+        for trip_id, rows in trips.items():
+            rows.sort(key=lambda row: int(row["stop_sequence"]))
+            arrivals = [
+                GTFSLoader.parse_time(row["arrival_time"] or row["departure_time"])
+                if (row.get("arrival_time") or row.get("departure_time"))
+                else None
+                for row in rows
+            ]
+            departures = [
+                GTFSLoader.parse_time(row["departure_time"] or row["arrival_time"])
+                if (row.get("arrival_time") or row.get("departure_time"))
+                else None
+                for row in rows
+            ]
+            # Saat verilmeyen ara duraklar iki zaman noktası arasında eşit
+            # aralıklarla doldurulur
+            known = [i for i, value in enumerate(arrivals) if value is not None]
+            if len(known) < 2 or known[0] != 0 or known[-1] != len(rows) - 1:
+                continue
+            for first, second in zip(known, known[1:]):
+                for i in range(first + 1, second):
+                    ratio = (i - first) / (second - first)
+                    value = round(
+                        departures[first] + (arrivals[second] - departures[first]) * ratio
+                    )
+                    arrivals[i] = departures[i] = value
+            stop_times[trip_id] = (
+                tuple(row["stop_id"] for row in rows),
+                arrivals,
+                departures,
+            )
+        return stop_times
+
+    @staticmethod
+    def __route_fares(feed):
+        prices = {
+            row["fare_id"]: float(row["price"])
+            for row in GTFSLoader.read_table(feed, "fare_attributes.txt", False)
+        }
+        fares = {}
+        for row in GTFSLoader.read_table(feed, "fare_rules.txt", False):
+            if row.get("route_id") and row["fare_id"] in prices:
+                fares.setdefault(row["route_id"], prices[row["fare_id"]])
+        return fares
+
+    @staticmethod
+    def __split_non_overtaking(trips):
+        # RAPTOR'un ikili aramasi için bir hattaki seferler hiçbir durakta
+        # birbirini sollamamalıdır; sollayan seferler ayrı hatta alınır
+        lanes = []
+        for trip in sorted(trips, key=lambda trip: (trip[2][0], trip[1][-1])):
+            for lane in lanes:
+                last = lane[-1]
+                if all(
+                    previous <= current for previous, current in zip(last[1], trip[1])
+                ) and all(
+                    previous <= current for previous, current in zip(last[2], trip[2])
+                ):
+                    lane.append(trip)
+                    break
+            else:
+                lanes.append([trip])
+        return lanes
+
+    @staticmethod
+    def active_services(feed, service_date):
+        # service_date "YYYYMMDD"; calendar.txt haftalık düzeni,
+        # calendar_dates.txt o güne özel eklemeleri (1) ve çıkarmaları (2) verir
+        weekday = [
+            "monday",
+            "tuesday",
+            "wednesday",
+            "thursday",
+            "friday",
+            "saturday",
+            "sunday",
+        ][datetime.datetime.strptime(service_date, "%Y%m%d").weekday()]
+        services = {
+            row["service_id"]
+            for row in GTFSLoader.read_table(feed, "calendar.txt", False)
+            if row["start_date"] <= service_date <= row["end_date"]
+            and row.get(weekday, "0").strip() == "1"
+        }
+        for row in GTFSLoader.read_table(feed, "calendar_dates.txt", False):
+            if row["date"] != service_date:
+                continue
+            if row["exception_type"].strip() == "1":
+                services.add(row["service_id"])
+            elif row["exception_type"].strip() == "2":
+                services.discard(row["service_id"])
+        return services
+
+    @staticmethod
+    def load(feed, service_date=None, footpath_radius_km=FOOTPATH_RADIUS_KM):
+        # (durak sözlüğü, Timetable) döner; duraklar RoutePlanner ve
+        # CompiledGraph ile de kullanılabilsin diye nextStops/transfer taşır.
+        # service_date verilmezse akıştaki tüm seferler o gün çalışıyor sayılır.
+        stop_rows = [
+            row
+            for row in GTFSLoader.read_table(feed, "stops.txt")
+            if row.get("location_type", "") in ("", "0")
+        ]
+        stop_ids = [row["stop_id"] for row in stop_rows]
+        index = {stop_id: i for i, stop_id in enumerate(stop_ids)}
+        locations = [
+            Location(float(row["stop_lat"]), float(row["stop_lon"])) for row in stop_rows
+        ]
+
+        route_types = {
+            row["route_id"]: (
+                "tram"
+                if row.get("route_type", "3").strip() in GTFSLoader.RAIL_ROUTE_TYPES
+                else "bus"
+            )
+            for row in GTFSLoader.read_table(feed, "routes.txt")
+        }
+        fares = GTFSLoader.__route_fares(feed)
+        services = (
+            GTFSLoader.active_services(feed, service_date) if service_date else None
+        )
+        trip_routes = {
+            row["trip_id"]: row["route_id"]
+            for row in GTFSLoader.read_table(feed, "trips.txt")
+            if row["route_id"] in route_types
+            and (services is None or row.get("service_id") in services)
+        }
+
+        patterns = {}
+        for trip_id, (trip_stops, arrivals, departures) in GTFSLoader.__read_stop_times(
+            feed, trip_routes
+        ).items():
+            if any(stop_id not in index for stop_id in trip_stops):
+                raise ValueError(f"'{trip_id}' seferinde bilinmeyen durak var!")
+            key = (trip_routes[trip_id], tuple(index[stop_id] for stop_id in trip_stops))
+            patterns.setdefault(key, []).append((trip_id, arrivals, departures))
+
+        route_ids = []
+        timetable_route_types = []
+        route_fares = array("d")
+        route_stop_offsets = array("l", [0])
+        route_stops = array("l")
+        route_trip_offsets = array("l", [0])
+        trip_ids = []
+        route_time_offsets = array("l")
+        arrivals = array("l")
+        departures = array("l")
+        stop_type_votes = [{} for _ in stop_ids]
+        hops = {}
+
+        for (route_id, pattern_stops), trips in patterns.items():
+            for lane in GTFSLoader.__split_non_overtaking(trips):
+                route_ids.append(route_id)
+                timetable_route_types.append(route_types[route_id])
+                route_fares.append(fares.get(route_id, 0.0))
+                route_stops.extend(pattern_stops)
+                route_stop_offsets.append(len(route_stops))
+                trip_ids.extend(trip[0] for trip in lane)
+                route_trip_offsets.append(len(trip_ids))
+                route_time_offsets.append(len(arrivals))
+                for position in range(len(pattern_stops)):
+                    arrivals.extend(trip[1][position] for trip in lane)
+                    departures.extend(trip[2][position] for trip in lane)
+
+            for stop in pattern_stops:
+                votes = stop_type_votes[stop]
+                votes[route_types[route_id]] = votes.get(route_types[route_id], 0) + 1
+            for position in range(len(pattern_stops) - 1):
+                key = (pattern_stops[position], pattern_stops[position + 1])
+                minutes = max(
+                    0, min(trip[1][position + 1] - trip[2][position] for trip in trips)
+                ) / 60
+                hops[key] = min(hops.get(key, minutes), minutes)
+
+        walking_seconds_per_km = 3600 / GTFSLoader.WALKING_SPEED_KMH
+        footpaths = [{} for _ in stop_ids]
+        for row in GTFSLoader.read_table(feed, "transfers.txt", False):
+            source = index.get(row["from_stop_id"])
+            target = index.get(row["to_stop_id"])
+            if source is None or target is None or source == target:
+                continue
+            if row.get("transfer_type", "0").strip() == "3":
+                continue  # aktarma yapılamaz
+            if row.get("min_transfer_time"):
+                seconds = int(float(row["min_transfer_time"]))
+            else:
+                seconds = round(
+                    DistanceCalculator.calculate_distance(
+                        locations[source].get_latitude(),
+                        locations[source].get_longitude(),
+                        locations[target].get_latitude(),
+                        locations[target].get_longitude(),
+                    )
+                    * walking_seconds_per_km
+                )
+            footpaths[source][target] = min(footpaths[source].get(target, seconds), seconds)
+
+        stops = {}
+        for i, row in enumerate(stop_rows):
+            votes = stop_type_votes[i]
+            stops[row["stop_id"]] = Stop(
+                stopid=row["stop_id"],
+                name=row.get("stop_name") or row["stop_id"],
+                type=max(votes, key=votes.get) if votes else "bus",
+                location=locations[i],
+                son_durak=False,
+                nextStops=[],
+                transfers=None,
+            )
+
+        if footpath_radius_km > 0:
+            spatial_index = StopSpatialIndex(stops)
+            for source, stop_id in enumerate(stop_ids):
+                for other, distance in spatial_index.within_radius(
+                    locations[source], footpath_radius_km
+                ):
+                    target = index[other.get_stopid()]
+                    if target == source:
+                        continue
+                    seconds = round(distance * walking_seconds_per_km)
+                    footpaths[source].setdefault(target, seconds)
+
+        # Sabit süreli motorlar için her ardışık durak çifti en kısa tarifeli
+        # süresiyle bağlanır; ücret sefer başına olduğundan yalnızca RAPTOR
+        # tarafından hesaplanır
+        for (source, target), minutes in hops.items():
+            source_stop = stops[stop_ids[source]]
+            source_stop.get_nextStops().append(
+                NextStop(
+                    stopId=stop_ids[target],
+                    mesafe=round(
+                        DistanceCalculator.calculate_distance(
+                            locations[source].get_latitude(),
+                            locations[source].get_longitude(),
+                            locations[target].get_latitude(),
+                            locations[target].get_longitude(),
+                        ),
+                        3,
+                    ),
+                    sure=round(minutes, 2),
+                    ucret=0.0,
+                )
+            )
+        footpath_offsets = array("l", [0])
+        footpath_targets = array("l")
+        footpath_times = array("l")
+        for source, stop_id in enumerate(stop_ids):
+            stop = stops[stop_id]
+            stop.set_son_durak(not stop.get_nextStops())
+            targets = sorted(footpaths[source].items(), key=lambda item: item[1])
+            for target, seconds in targets:
+                footpath_targets.append(target)
+                footpath_times.append(seconds)
+            footpath_offsets.append(len(footpath_targets))
+            # Stop modeli tek aktarma taşır; en kısa yürüyüş seçilir
+            if targets:
+                stop.set_transfers(
+                    Transfer(
+                        transferStopId=stop_ids[targets[0][0]],
+                        sure=round(targets[0][1] / 60, 2),
+                        ucret=0.0,
+                    )
+                )
+
+        timetable = Timetable(
+            stops,
+            stop_ids,
+            route_ids,
+            timetable_route_types,
+            route_fares,
+            route_stop_offsets,
+            route_stops,
+            route_trip_offsets,
+            trip_ids,
+            route_time_offsets,
+            arrivals,
+            departures,
+            footpath_offsets,
+            footpath_targets,
+            footpath_times,
+        )
+        return stops, timetable
@@ -0,0 +1,559 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlsplit
+
+from rota import (
+    CompiledGraph,
+    ContractionHierarchy,
+    HistogramSink,
+    JsonLinesSink,
+    StopLoader,
+    instrumentation,
+)
+from batch_routing import (
+    ROUTE_VARIANTS,
+    apply_network_updates,
+    calculate_isochrones,
+    calculate_variant,
+    create_passenger,
+    create_query,
+    drain_metric_events,
+    init_worker,
+    parse_bool,
+)
+
+MAX_BODY_SIZE = 64 * 1024
+READ_TIMEOUT = 30  # saniye
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+STATUS_TEXTS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def serialize_route(variant, route_obj):
+    return {
+        "variant": variant,
+        "routeName": route_obj.get_routeName(),
+        "vehicleBias": route_obj.get_vehicleBias(),
+        "time": route_obj.get_time(),
+        "distance": route_obj.get_distance(),
+        "price": route_obj.get_price(),
+        "taxi_price": route_obj.get_taxi_price(),
+        "stops": [
+            {
+                "id": stop.get_stopid(),
+                "name": stop.get_name(),
+                "type": stop.get_type(),
+                "lat": stop.get_location().get_latitude(),
+                "lon": stop.get_location().get_longitude(),
+            }
+            for stop in route_obj.get_route()
+        ],
+    }
+
+
+def route_request(query, variants, updates=()):
+    # İşçi havuzunda çalışır; veri init_worker ile bir kez yüklenmiştir.
+    # updates sunucunun sıkıştırılmış güncelleme günlüğüdür (UpdateLog);
+    # işçinin henüz görmediği kayıtlar önce uygulanır.
+    start = time.perf_counter()
+    apply_network_updates(updates)
+    user = create_passenger(query)
+    route_query = create_query(user)
+    routes = [
+        serialize_route(variant, calculate_variant(user, variant, route_query))
+        for variant in variants
+    ]
+    result = {"routes": routes, "elapsed_ms": (time.perf_counter() - start) * 1000}
+    # Süreç havuzunda ölçümler ana sürece sonuçla birlikte taşınır
+    events = drain_metric_events()
+    if events is not None:
+        result["metric_events"] = events
+    return result
+
+
+def isochrone_request(query, options, updates=()):
+    # route_request gibi işçide çalışır; hedef koordinatı gerekmez
+    start = time.perf_counter()
+    apply_network_updates(updates)
+    user = create_passenger(query, require_target=False)
+    result = calculate_isochrones([user], **options)[0]
+    result["elapsed_ms"] = (time.perf_counter() - start) * 1000
+    events = drain_metric_events()
+    if events is not None:
+        result["metric_events"] = events
+    return result
+
+
+def parse_isochrone_options(query):
+    try:
+        max_time = float(query["max_time"])
+        max_fare = query.get("max_fare")
+        max_fare = None if max_fare in (None, "") else float(max_fare)
+        bands = query.get("bands")
+        if isinstance(bands, str):
+            bands = [band for band in bands.split(",") if band.strip()]
+        bands = [float(band) for band in bands] if bands else None
+    except KeyError:
+        raise RequestError(400, "max_time zorunludur")
+    except (TypeError, ValueError) as error:
+        raise RequestError(400, f"Geçersiz bütçe: {error}")
+    if max_time < 0 or (max_fare is not None and max_fare < 0):
+        raise RequestError(400, "Bütçeler negatif olamaz")
+    return {
+        "max_time": max_time,
+        "max_fare": max_fare,
+        "bands": bands,
+        "use_taxi": parse_bool(query.get("taxi", True)),
+    }
+
+
+def parse_variants(query, default_variants):
+    value = query.get("variants", query.get("variant"))
+    if value is None:
+        return default_variants
+    if isinstance(value, str):
+        value = [variant.strip() for variant in value.split(",") if variant.strip()]
+    if not isinstance(value, list) or not value:
+        raise RequestError(400, "variants bir liste olmalı")
+    for variant in value:
+        if variant not in default_variants:
+            raise RequestError(400, f"Bilinmeyen varyant: {variant}")
+    return value
+
+
+class UpdateLog:
+    # Sunucunun ağ güncelleme günlüğü. Aynı bağlantıya ya da durağa gelen
+    # güncellemelerden yalnızca sonuncusu tutulur (set_edge alanları
+    # birleştirilir), böylece her sorguyla işçiye giden günlük alınan
+    # güncelleme sayısıyla değil, etkilenen bağlantı ve durak sayısıyla büyür.
+    # Her kayıt mutlak bir durum yazdığından, kalan kayıtları sürüm sırasıyla
+    # uygulamak tüm günlüğü uygulamakla aynı ağı verir.
+    def __init__(self, graph):
+        self.__graph = graph
+        self.__version = 0
+        self.__entries = {}
+        self.__snapshot = ()
+
+    def get_version(self):
+        return self.__version
+
+    def get_entries(self):
+        # Sürüme göre sıralı (sürüm, güncelleme) çiftleri; değişmez demet
+        return self.__snapshot
+
+    def append(self, update):
+        changed_edges = self.__graph.apply_update(update)
+        key = self.__key(update)
+        if update["action"] == "set_edge" and key in self.__entries:
+            merged = dict(self.__entries[key][1])
+            merged.update(
+                (field, value) for field, value in update.items() if value is not None
+            )
+            update = merged
+        self.__version += 1
+        self.__entries[key] = (self.__version, update)
+        self.__snapshot = tuple(
+            sorted(self.__entries.values(), key=lambda entry: entry[0])
+        )
+        return changed_edges
+
+    def __key(self, update):
+        # Aynı durumu yazan güncellemeler aynı anahtarı alır
+        action = update["action"]
+        if action in ("close_stop", "open_stop"):
+            return ("stop", str(update["stop"]))
+        if action in ("close_transfer", "open_transfer"):
+            return ("closed", self.__graph.find_transfer_edge(update["stop"]))
+        edge = self.__graph.find_edge(
+            update["from"],
+            update["to"],
+            CompiledGraph.TRANSFER_EDGE
+            if update.get("transfer")
+            else CompiledGraph.RIDE_EDGE,
+        )
+        return ("set" if action == "set_edge" else "closed", edge)
+
+
+class ServerMetrics:
+    def __init__(self):
+        self.__started_at = time.time()
+        self.__requests = 0
+        self.__responses = {}
+        self.__routes = 0
+        self.__route_errors = 0
+        self.__route_time_total = 0.0
+        self.__route_time_max = 0.0
+        self.__in_flight = 0
+
+    def get_in_flight(self):
+        return self.__in_flight
+
+    def request_received(self):
+        self.__requests += 1
+
+    def response_sent(self, status):
+        self.__responses[status] = self.__responses.get(status, 0) + 1
+
+    def route_started(self):
+        self.__in_flight += 1
+
+    def route_finished(self, elapsed, failed=False):
+        self.__in_flight -= 1
+        if failed:
+            self.__route_errors += 1
+            return
+        self.__routes += 1
+        self.__route_time_total += elapsed
+        self.__route_time_max = max(self.__route_time_max, elapsed)
+
+    def snapshot(self):
+        return {
+            "uptime_seconds": time.time() - self.__started_at,
+            "requests_total": self.__requests,
+            "responses": {
+                str(status): count for status, count in self.__responses.items()
+            },
+            "routes_total": self.__routes,
+            "route_errors_total": self.__route_errors,
+            "routes_in_flight": self.__in_flight,
+            "route_latency_ms_avg": (
+                self.__route_time_total / self.__routes * 1000 if self.__routes else 0.0
+            ),
+            "route_latency_ms_max": self.__route_time_max * 1000,
+        }
+
+
+class RoutingServer:
+    def __init__(
+        self,
+        data_file,
+        workers,
+        max_pending,
+        variants,
+        hierarchy_file=None,
+        instrument=False,
+        metrics_file=None,
+    ):
+        # Veri setini ana süreçte de yükleyerek hatalı dosyada hemen durulur;
+        # yazılan anlık görüntü sayesinde işçiler JSON'u yeniden çözümlemez
+        stops, graph, _ = StopLoader.load_dataset(data_file)
+        self.__stop_count = len(stops)
+        # Güncellemeler önce bu grafikte doğrulanır, sonra günlüğe eklenir
+        self.__updates = UpdateLog(graph)
+        if hierarchy_file:
+            ContractionHierarchy.load(hierarchy_file, graph).close()
+        self.__workers = max(1, workers)
+        self.__max_pending = max_pending
+        self.__variants = variants
+        self.__metrics = ServerMetrics()
+        # Aşama histogramları ana süreçte tutulur; işçi süreçleri ölçümlerini
+        # her sorgunun sonucuyla gönderir
+        self.__stage_metrics = None
+        if instrument or metrics_file:
+            self.__stage_metrics = instrumentation.add_sink(HistogramSink())
+            if metrics_file:
+                instrumentation.add_sink(JsonLinesSink(metrics_file))
+        if workers > 1:
+            self.__executor = ProcessPoolExecutor(
+                workers,
+                initializer=init_worker,
+                initargs=(
+                    data_file,
+                    variants,
+                    hierarchy_file,
+                    None,
+                    self.__stage_metrics is not None,
+                ),
+            )
+        else:
+            # Tek işçide arama yine de olay döngüsü dışında yürür ve ölçümler
+            # doğrudan bu süreçteki hedeflere yazılır
+            self.__executor = ThreadPoolExecutor(
+                1,
+                initializer=init_worker,
+                initargs=(data_file, variants, hierarchy_file),
+            )
+
+    def get_metrics(self):
+        return self.__metrics
+
+    def get_stage_metrics(self):
+        return self.__stage_metrics
+
+    async def serve(self, host, port, ready=None):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        address = server.sockets[0].getsockname()
+        print(
+            f"Rota servisi dinleniyor: http://{address[0]}:{address[1]}",
+            file=sys.stderr,
+        )
+        if ready is not None:
+            ready(address)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.__executor.shutdown(wait=False, cancel_futures=True)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            keep_alive = True
+            while keep_alive:
+                try:
+                    request = await asyncio.wait_for(
+                        self.read_request(reader), READ_TIMEOUT
+                    )
+                except RequestError as error:
+                    await self.send(writer, error.status, {"error": str(error)}, False)
+                    break
+                if request is None:
+                    break
+                method, path, query, keep_alive = request
+                self.__metrics.request_received()
+                try:
+                    status, payload = await self.dispatch(method, path, query)
+                except RequestError as error:
+                    status, payload = error.status, {"error": str(error)}
+                except Exception as error:
+                    # Beklenmeyen hata bağlantıyı yanıtsız kapatmaz
+                    print(f"İstek işlenemedi: {error!r}", file=sys.stderr)
+                    status, payload = 500, {"error": f"Sunucu hatası: {error}"}
+                await self.send(writer, status, payload, keep_alive)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise RequestError(400, "Geçersiz istek satırı")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise RequestError(400, "Geçersiz Content-Length")
+        if length < 0:
+            raise RequestError(400, "Geçersiz Content-Length")
+        if length > MAX_BODY_SIZE:
+            raise RequestError(413, "İstek gövdesi çok büyük")
+        body = await reader.readexactly(length) if length else b""
+
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        if body:
+            try:
+                query.update(json.loads(body))
+            except (ValueError, TypeError):
+                raise RequestError(400, "Gövde geçerli bir JSON nesnesi değil")
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" and (
+            version == "HTTP/1.1" or connection == "keep-alive"
+        )
+        return method.upper(), url.path, query, keep_alive
+
+    async def dispatch(self, method, path, query):
+        if path == "/health":
+            return 200, {
+                "status": "ok",
+                "stops": self.__stop_count,
+                "workers": self.__workers,
+                "variants": self.__variants,
+                "network_version": self.__updates.get_version(),
+            }
+        if path == "/metrics":
+            payload = self.__metrics.snapshot()
+            if self.__stage_metrics is not None:
+                payload.update(self.__stage_metrics.snapshot())
+            return 200, payload
+        if path == "/metrics/openmetrics":
+            if self.__stage_metrics is None:
+                raise RequestError(404, "Aşama ölçümleri kapalı (--instrument)")
+            return 200, self.__stage_metrics.to_openmetrics()
+        if path == "/updates":
+            if method == "GET":
+                return 200, {
+                    "network_version": self.__updates.get_version(),
+                    "updates": [
+                        dict(update, version=version)
+                        for version, update in self.__updates.get_entries()
+                    ],
+                }
+            if method != "POST":
+                raise RequestError(405, "Yalnızca GET ve POST desteklenir")
+            return 200, self.update(query)
+        if path not in ("/route", "/isochrone"):
+            raise RequestError(404, f"Bilinmeyen adres: {path}")
+        if method not in ("GET", "POST"):
+            raise RequestError(405, "Yalnızca GET ve POST desteklenir")
+        if path == "/isochrone":
+            return 200, await self.isochrone(query)
+        return 200, await self.route(query)
+
+    async def route(self, query):
+        variants = parse_variants(query, self.__variants)
+        try:
+            # Yolcu bilgileri işçiye gitmeden önce doğrulanır
+            create_passenger(query)
+        except (KeyError, TypeError, ValueError) as error:
+            raise RequestError(400, f"Geçersiz sorgu: {error}")
+        return await self.run(route_request, query, variants)
+
+    async def isochrone(self, query):
+        options = parse_isochrone_options(query)
+        try:
+            create_passenger(query, require_target=False)
+        except (KeyError, TypeError, ValueError) as error:
+            raise RequestError(400, f"Geçersiz sorgu: {error}")
+        return await self.run(isochrone_request, query, options)
+
+    async def run(self, function, query, options):
+        if self.__metrics.get_in_flight() >= self.__max_pending:
+            raise RequestError(503, "Sunucu meşgul, daha sonra tekrar deneyin")
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        self.__metrics.route_started()
+        try:
+            result = await loop.run_in_executor(
+                self.__executor,
+                function,
+                query,
+                options,
+                self.__updates.get_entries(),
+            )
+        except Exception as error:
+            self.__metrics.route_finished(time.perf_counter() - start, failed=True)
+            raise RequestError(500, f"Rota hesaplanamadı: {error}")
+        self.__metrics.route_finished(time.perf_counter() - start)
+        instrumentation.replay(result.pop("metric_events", ()))
+        return result
+
+    def update(self, update):
+        # Kesinti/gecikme kaydı; her işçi bir sonraki sorgusundan önce uygular
+        if "transfer" in update:
+            update["transfer"] = parse_bool(update["transfer"])
+        try:
+            changed_edges = self.__updates.append(update)
+        except (TypeError, ValueError) as error:
+            raise RequestError(400, f"Geçersiz güncelleme: {error}")
+        return {
+            "network_version": self.__updates.get_version(),
+            "changed_edges": len(changed_edges),
+        }
+
+    async def send(self, writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+            content_type = OPENMETRICS_CONTENT_TYPE
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        headers = [
+            f"HTTP/1.1 {status} {STATUS_TEXTS.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+        self.__metrics.response_sent(status)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Rota planlayıcıyı JSON HTTP servisi olarak sunar."
+    )
+    parser.add_argument("--data", default="veriseti.json", help="Durak veri seti")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--hierarchy",
+        help="build_contraction_hierarchy.py ile üretilmiş hiyerarşi dosyası; "
+        "yalnızca en iyi rotayı hızlandırır, seçim kuralları aynı kalır",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=256,
+        help="Aynı anda bekleyebilecek en fazla rota sorgusu; aşılırsa 503 döner",
+    )
+    parser.add_argument(
+        "--variants",
+        default=",".join(ROUTE_VARIANTS),
+        help="Sunulacak rota varyantları: " + ", ".join(ROUTE_VARIANTS),
+    )
+    parser.add_argument(
+        "--instrument",
+        action="store_true",
+        help="Aşama sürelerini ve arama sayaçlarını /metrics altında yayınla",
+    )
+    parser.add_argument(
+        "--metrics-log",
+        help="Ölçümlerin ayrıca eklenecek JSON lines dosyası (--instrument içerir)",
+    )
+    args = parser.parse_args(argv)
+
+    variants = [variant.strip() for variant in args.variants.split(",") if variant]
+    for variant in variants:
+        if variant not in ROUTE_VARIANTS:
+            parser.error(f"Bilinmeyen varyant: {variant}")
+
+    server = RoutingServer(
+        args.data,
+        args.workers,
+        args.max_pending,
+        variants,
+        args.hierarchy,
+        args.instrument,
+        args.metrics_log,
+    )
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network_generator import generate_network, write_network  # noqa: E402
+from rota import (  # noqa: E402
+    DistanceCalculator,
+    Elderly,
+    General,
+    Location,
+    RoutePlanner,
+    StopLoader,
+    Student,
+    Taxi,
+)
+
+NETWORK_STOPS = 120
+
+
+@pytest.fixture(scope="session")
+def network_file(tmp_path_factory):
+    # Hatlar arası bağlantı ve aktarmaları olan küçük bir sentetik ağ
+    path = tmp_path_factory.mktemp("network") / "network.json"
+    network = generate_network(
+        NETWORK_STOPS,
+        tram_ratio=0.5,
+        transfer_ratio=0.8,
+        line_length=8,
+        max_transfer_km=1.0,
+        seed=7,
+    )
+    write_network(network, path)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def dataset(network_file):
+    # Salt okunur testler için paylaşılır; ağı değiştiren testler load_network kullanır
+    return StopLoader.load_dataset(network_file)
+
+
+@pytest.fixture
+def load_network(network_file):
+    def load():
+        return StopLoader.load_dataset(network_file)
+
+    return load
+
+
+def make_planner(stops, taxi_fees):
+    taxi = Taxi(0, 0, None)
+    taxi.set_fee_values(taxi_fees)
+    return RoutePlanner(stops, {"taxi": taxi}, DistanceCalculator())
+
+
+def make_users():
+    location = Location(0, 0)
+    return [
+        passenger_class("", location, location, is_special_day=is_special_day)
+        for passenger_class in (General, Student, Elderly)
+        for is_special_day in (False, True)
+    ]
+
+
+def sample_pairs(stop_count, count, seed=11):
+    rng = random.Random(seed)
+    return [tuple(rng.sample(range(stop_count), 2)) for _ in range(count)]
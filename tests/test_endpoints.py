@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from conftest import make_users
+from rota import (
+    ParetoRouteLogic,
+    StopLoader,
+    bellmanFord_LeastStops,
+    dijkstra_Standard,
+)
+
+
+def write_network(tmp_path, stops):
+    # stops: (kimlik, enlem, sonraki duraklar) üçlüleri; tüm duraklar aynı boylamda
+    def stop(stop_id, lat, next_ids):
+        return {
+            "id": stop_id,
+            "name": stop_id,
+            "type": "bus",
+            "lat": lat,
+            "lon": 29.0,
+            "sonDurak": not next_ids,
+            "nextStops": [
+                {"stopId": next_id, "mesafe": 1.0, "sure": 2, "ucret": 1.0}
+                for next_id in next_ids
+            ],
+        }
+
+    path = tmp_path / "network.json"
+    path.write_text(
+        json.dumps(
+            {
+                "city": "Test",
+                "taxi": {"openingFee": 10.0, "costPerKm": 4.0},
+                "duraklar": [stop(*values) for values in stops],
+            }
+        ),
+        encoding="utf-8",
+    )
+    stops, graph, _ = StopLoader.load_dataset(str(path))
+    return stops, graph
+
+
+def route_logics(graph):
+    return [
+        dijkstra_Standard(graph),
+        bellmanFord_LeastStops(graph),
+        ParetoRouteLogic(ParetoRouteLogic.OPTIMAL, graph),
+    ]
+
+
+def route_ids(stops, graph, initial_id, target_id):
+    user = make_users()[0]
+    return [
+        [
+            stop.get_stopid()
+            for stop in logic.calculateRoute(
+                stops, stops[initial_id], stops[target_id], user, "None"
+            ).get_route()
+        ]
+        for logic in route_logics(graph)
+    ]
+
+
+def test_unreachable_target_does_not_resolve_to_initial_stop(tmp_path):
+    # iso_1 başlangıca hedeften daha yakın; yine de yerine b seçilmeli
+    stops, graph = write_network(
+        tmp_path,
+        [
+            ("a", 40.0, ["b"]),
+            ("b", 40.01, []),
+            ("iso_1", 40.001, ["iso_2"]),
+            ("iso_2", 40.05, []),
+        ],
+    )
+    for route in route_ids(stops, graph, "a", "iso_1"):
+        assert route == ["a", "b"]
+
+
+def test_unreachable_target_does_not_resolve_to_original_start(tmp_path):
+    # x'ten çıkış yok, arama y'den başlar; hedefe en yakın ulaşılabilir durak
+    # x olsa da yolcu zaten orada olduğu için z seçilmeli
+    stops, graph = write_network(
+        tmp_path,
+        [
+            ("x", 40.03, []),
+            ("y", 40.027, ["x", "z"]),
+            ("z", 40.045, []),
+            ("t", 40.035, ["u"]),
+            ("u", 40.1, []),
+        ],
+    )
+    for route in route_ids(stops, graph, "x", "t"):
+        assert route == ["y", "z"]
+
+
+def test_no_reachable_target_raises(tmp_path):
+    stops, graph = write_network(
+        tmp_path,
+        [
+            ("x", 40.0, []),
+            ("y", 40.01, ["x"]),
+            ("t", 40.02, ["u"]),
+            ("u", 40.03, []),
+        ],
+    )
+    user = make_users()[0]
+    for logic in route_logics(graph):
+        with pytest.raises(ValueError, match="Ulaşılabilir durak bulunamadı!"):
+            logic.calculateRoute(stops, stops["x"], stops["t"], user, "None")
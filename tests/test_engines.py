@@ -0,0 +1,107 @@
+import pytest
+
+from conftest import make_users, sample_pairs
+from rota import (
+    AllPairsRouteLogic,
+    AllPairsTable,
+    ContractionHierarchy,
+    ContractionHierarchyRouteLogic,
+    ParetoRouteLogic,
+    aStar_Bidirectional,
+    aStar_Standard,
+    bellmanFord_LeastStops,
+    bellmanFord_Standard,
+    dijkstra_Standard,
+)
+
+VEHICLE_BIASES = ("None", "bus", "tram")
+
+
+def route_totals(route):
+    return (
+        [stop.get_stopid() for stop in route.get_route()],
+        pytest.approx(route.get_time()),
+        pytest.approx(route.get_distance()),
+        pytest.approx(route.get_price()),
+    )
+
+
+@pytest.fixture(scope="module")
+def engines(dataset, tmp_path_factory):
+    _, graph, _ = dataset
+    directory = tmp_path_factory.mktemp("engines")
+    AllPairsTable.build(graph, directory / "network.apsp")
+    ContractionHierarchy.build(graph, directory / "network.ch")
+    table = AllPairsTable.load(directory / "network.apsp", graph)
+    hierarchy = ContractionHierarchy.load(directory / "network.ch", graph)
+    yield {
+        "bellmanFord_Standard": bellmanFord_Standard(graph),
+        "aStar_Standard": aStar_Standard(graph),
+        "aStar_Bidirectional": aStar_Bidirectional(graph),
+        "ContractionHierarchy": ContractionHierarchyRouteLogic(hierarchy),
+        "AllPairsTable": AllPairsRouteLogic(table),
+    }
+    table.close()
+    hierarchy.close()
+
+
+@pytest.mark.parametrize(
+    "engine",
+    [
+        "bellmanFord_Standard",
+        "aStar_Standard",
+        "aStar_Bidirectional",
+        "ContractionHierarchy",
+        "AllPairsTable",
+    ],
+)
+def test_weighted_engines_match_dijkstra(dataset, engines, engine):
+    stops, graph, _ = dataset
+    reference = dijkstra_Standard(graph)
+    for user in make_users():
+        for vehicle_bias in VEHICLE_BIASES:
+            for initial, target in sample_pairs(graph.stop_count(), 8):
+                initial_stop = graph.stop_at(initial)
+                target_stop = graph.stop_at(target)
+                expected = reference.calculateRoute(
+                    stops, initial_stop, target_stop, user, vehicle_bias
+                )
+                route = engines[engine].calculateRoute(
+                    stops, initial_stop, target_stop, user, vehicle_bias
+                )
+                assert route_totals(route) == route_totals(expected)
+
+
+def test_pareto_optimal_matches_dijkstra(dataset):
+    # Ağırlıksız puan cephe ölçütlerinin doğrusal birleşimidir; en iyisi cephededir
+    stops, graph, _ = dataset
+    reference = dijkstra_Standard(graph)
+    pareto = ParetoRouteLogic(ParetoRouteLogic.OPTIMAL, graph)
+    for user in make_users():
+        for initial, target in sample_pairs(graph.stop_count(), 8, seed=12):
+            initial_stop = graph.stop_at(initial)
+            target_stop = graph.stop_at(target)
+            route = pareto.calculateRoute(
+                stops, initial_stop, target_stop, user, "None"
+            )
+            expected = reference.calculateRoute(
+                stops, initial_stop, target_stop, user, "None"
+            )
+            assert route_totals(route) == route_totals(expected)
+
+
+def test_pareto_least_stops_matches_bellman_ford(dataset):
+    stops, graph, _ = dataset
+    reference = bellmanFord_LeastStops(graph)
+    pareto = ParetoRouteLogic(ParetoRouteLogic.LEAST_STOPS, graph)
+    for user in make_users():
+        for initial, target in sample_pairs(graph.stop_count(), 8, seed=13):
+            initial_stop = graph.stop_at(initial)
+            target_stop = graph.stop_at(target)
+            route = pareto.calculateRoute(
+                stops, initial_stop, target_stop, user, "None"
+            )
+            expected = reference.calculateRoute(
+                stops, initial_stop, target_stop, user, "None"
+            )
+            assert len(route.get_route()) == len(expected.get_route())
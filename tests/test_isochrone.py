@@ -0,0 +1,194 @@
+import heapq
+import json
+import math
+import random
+
+import pytest
+
+from conftest import make_planner, make_users
+from rota import (
+    CompiledGraph,
+    DistanceCalculator,
+    General,
+    IsochroneSearch,
+    Location,
+    RoutePlanner,
+    StopLoader,
+)
+
+KM_PER_DEGREE_LAT = 111.195
+
+
+@pytest.fixture
+def two_stops(tmp_path):
+    # Bağlantısız iki durak: biri yürüme, biri taksi mesafesinde
+    def stop(stop_id, lat, lon):
+        return {
+            "id": stop_id,
+            "name": stop_id,
+            "type": "bus",
+            "lat": lat,
+            "lon": lon,
+            "sonDurak": True,
+            "nextStops": [],
+        }
+
+    path = tmp_path / "two_stops.json"
+    path.write_text(
+        json.dumps(
+            {
+                "city": "Test",
+                "taxi": {"openingFee": 10.0, "costPerKm": 4.0},
+                "duraklar": [
+                    stop("bus_near", 40.0, 29.0),
+                    stop("bus_far", 40.1, 29.0),
+                ],
+            }
+        ),
+        encoding="utf-8",
+    )
+    return StopLoader.load_dataset(str(path))
+
+
+def access_minutes(planner, user, location, stop):
+    distance = DistanceCalculator.calculate_distance(
+        location.get_latitude(),
+        location.get_longitude(),
+        stop.get_location().get_latitude(),
+        stop.get_location().get_longitude(),
+    )
+    if distance <= RoutePlanner.WALKING_LIMIT:
+        return user.calculate_walking_minutes(distance), 0.0
+    taxi = planner.vehicles["taxi"]
+    return taxi.calculate_taxi_time(distance), taxi.calculate_fare(distance)
+
+
+def test_walking_and_taxi_access_are_in_minutes(two_stops):
+    stops, graph, taxi_fees = two_stops
+    planner = make_planner(stops, taxi_fees)
+    search = IsochroneSearch(planner, graph)
+    location = Location(40.0 - 1 / KM_PER_DEGREE_LAT, 29.0)
+    user = General("", location, location)
+    near = stops["bus_near"]
+    far = stops["bus_far"]
+
+    walking, _ = access_minutes(planner, user, location, near)
+    taxi_time, taxi_fare = access_minutes(planner, user, location, far)
+    # 1 km yürüme 5 km/sa ile 12 dakika; 12.1195 km taksi 70 km/sa ile ~10.4 dakika
+    assert walking == pytest.approx(12)
+    assert taxi_time == pytest.approx(12.1195 / 70 * 60)
+
+    reached = {
+        reachable.get_stop().get_stopid(): reachable
+        for reachable in search.reachable(user, 60).get_reachable_stops()
+    }
+    assert reached["bus_near"].get_time() == pytest.approx(walking)
+    assert reached["bus_near"].get_access() == "walk"
+    assert reached["bus_far"].get_time() == pytest.approx(taxi_time)
+    assert reached["bus_far"].get_fare() == pytest.approx(taxi_fare)
+    assert reached["bus_far"].get_access() == "taxi"
+
+    # Yürüme süresi dakika cinsinden olmasaydı 12 dakikalık bütçe yeterdi
+    below_walking = search.reachable(user, walking - 0.5, use_taxi=False)
+    assert below_walking.get_reachable_stops() == []
+
+
+def reference_times(planner, graph, user, location, max_time):
+    # Erişim süreleriyle tohumlanmış, yalnızca süreye bakan Dijkstra
+    offsets = graph.get_offsets()
+    targets = graph.get_targets()
+    times = graph.get_times()
+    closed_edges = graph.get_closed_edges()
+    heap = []
+    for index, stop in enumerate(graph.get_stop_objects()):
+        minutes, _ = access_minutes(planner, user, location, stop)
+        if minutes <= max_time:
+            heap.append((minutes, index))
+    heapq.heapify(heap)
+    settled = {}
+    while heap:
+        time, stop = heapq.heappop(heap)
+        if stop in settled:
+            continue
+        settled[stop] = time
+        for edge in range(offsets[stop], offsets[stop + 1]):
+            new_time = time + times[edge]
+            if not closed_edges[edge] and new_time <= max_time:
+                heapq.heappush(heap, (new_time, targets[edge]))
+    return settled
+
+
+def sample_locations(graph, count, seed=21):
+    rng = random.Random(seed)
+    stops = graph.get_stop_objects()
+    lats = [stop.get_location().get_latitude() for stop in stops]
+    lons = [stop.get_location().get_longitude() for stop in stops]
+    return [
+        Location(rng.uniform(min(lats), max(lats)), rng.uniform(min(lons), max(lons)))
+        for _ in range(count)
+    ]
+
+
+def test_time_budget_matches_reference_search(dataset):
+    stops, graph, taxi_fees = dataset
+    planner = make_planner(stops, taxi_fees)
+    search = IsochroneSearch(planner, graph)
+    locations = sample_locations(graph, 6)
+    users = [General("", location, location) for location in locations]
+    for user, location, isochrone in zip(
+        users, locations, search.reachable_batch(users, 30)
+    ):
+        expected = reference_times(planner, graph, user, location, 30)
+        reached = {
+            graph.index_of(reachable.get_stop()): reachable.get_time()
+            for reachable in isochrone.get_reachable_stops()
+        }
+        assert reached == pytest.approx(expected)
+
+
+def exhaustive_search(graph, user, seeds, max_time, max_fare):
+    # Budamasız tarama; aynı aktarmada gidip gelme dışında tüm yürüyüşler
+    offsets = graph.get_offsets()
+    targets = graph.get_targets()
+    times = graph.get_times()
+    fares = graph.edge_fare_costs(user)
+    edge_types = graph.get_edge_types()
+    best = {}
+    stack = [(time, taxi_fare, 0.0, stop, -1) for time, taxi_fare, stop, _ in seeds]
+    while stack:
+        time, taxi_fare, net_fare, stop, transfer_from = stack.pop()
+        if taxi_fare + max(0.0, net_fare) <= max_fare:
+            best[stop] = min(best.get(stop, math.inf), time)
+        for edge in range(offsets[stop], offsets[stop + 1]):
+            is_transfer = edge_types[edge] == CompiledGraph.TRANSFER_EDGE
+            if is_transfer and targets[edge] == transfer_from:
+                continue
+            if time + times[edge] <= max_time:
+                stack.append(
+                    (
+                        time + times[edge],
+                        taxi_fare,
+                        net_fare + fares[edge] - is_transfer,
+                        targets[edge],
+                        stop if is_transfer else -1,
+                    )
+                )
+    return best
+
+
+def test_fare_budget_matches_exhaustive_search(dataset):
+    _, graph, _ = dataset
+    rng = random.Random(9)
+    for user in make_users():
+        for max_fare in (3, 6, 10):
+            seeds = [
+                (rng.uniform(0, 5), rng.choice([0.0, 0.0, 2.0]), stop, True)
+                for stop in rng.sample(range(graph.stop_count()), 3)
+            ]
+            found = IsochroneSearch.search(graph, user, seeds, 20, max_fare)
+            expected = exhaustive_search(graph, user, seeds, 20, max_fare)
+            assert {stop: time for stop, (time, _, _) in found.items()} == (
+                pytest.approx(expected)
+            )
+            for time, fare, _ in found.values():
+                assert fare <= max_fare
@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from conftest import make_planner
+from rota import AllPairsTable, CompiledGraph, dijkstra_Standard
+
+
+def edge_update(graph, edge, action, **fields):
+    update = {
+        "action": action,
+        "from": graph.stop_at(graph.get_sources()[edge]).get_stopid(),
+        "to": graph.stop_at(graph.get_targets()[edge]).get_stopid(),
+        **fields,
+    }
+    if graph.get_edge_types()[edge] == CompiledGraph.TRANSFER_EDGE:
+        update["transfer"] = True
+    return update
+
+
+def make_updates(graph):
+    rng = random.Random(5)
+    edge_types = graph.get_edge_types()
+    ride_edges = [
+        edge
+        for edge in range(len(edge_types))
+        if edge_types[edge] == CompiledGraph.RIDE_EDGE
+    ]
+    slower, faster, closed = rng.sample(ride_edges, 3)
+    transfer_stop = next(
+        graph.stop_at(graph.get_sources()[edge]).get_stopid()
+        for edge in range(len(edge_types))
+        if edge_types[edge] == CompiledGraph.TRANSFER_EDGE
+    )
+    stop = graph.stop_at(rng.randrange(graph.stop_count())).get_stopid()
+    return [
+        edge_update(graph, slower, "set_edge", sure=graph.get_times()[slower] * 5),
+        edge_update(graph, faster, "set_edge", sure=1, ucret=0),
+        edge_update(graph, closed, "close_edge"),
+        {"action": "close_stop", "stop": stop},
+        {"action": "close_transfer", "stop": transfer_stop},
+        edge_update(graph, closed, "open_edge"),
+        {"action": "open_stop", "stop": stop},
+    ]
+
+
+def test_all_pairs_repair_matches_fresh_search(load_network, tmp_path):
+    stops, graph, taxi_fees = load_network()
+    table_file = tmp_path / "network.apsp"
+    AllPairsTable.build(graph, table_file)
+    planner = make_planner(stops, taxi_fees)
+    table_logic = planner.load_all_pairs_table(table_file, graph)
+    table = table_logic.get_table()
+    rows = random.Random(3).sample(range(graph.stop_count()), 20)
+
+    for update in make_updates(graph):
+        planner.apply_update(graph, update)
+        assert table.is_current()
+        for user, vehicle_bias in AllPairsTable.default_profiles():
+            profile_key = CompiledGraph.profile_key(user, vehicle_bias)
+            scores = graph.edge_scores(user, vehicle_bias)
+            for row in rows:
+                distances, _ = dijkstra_Standard.search(graph, scores, row)
+                repaired = [
+                    table.cost(profile_key, row, target)
+                    for target in range(graph.stop_count())
+                ]
+                assert repaired == pytest.approx(distances)
+                for target in range(graph.stop_count()):
+                    if distances[target] == float("inf"):
+                        continue
+                    path_edges = table.path_edges(profile_key, row, target)
+                    assert sum(scores[edge] for edge in path_edges) == pytest.approx(
+                        distances[target]
+                    )
+    table.close()
+
+
+def test_updated_graph_matches_reloaded_graph(load_network):
+    # Yerinde güncellenen skor önbellekleri, güncellemelerin baştan
+    # uygulandığı bir grafikle aynı olmalı
+    _, graph, _ = load_network()
+    users = AllPairsTable.default_profiles()
+    for user, vehicle_bias in users:
+        graph.edge_scores(user, vehicle_bias)
+    updates = make_updates(graph)
+    for update in updates:
+        graph.apply_update(update)
+
+    _, fresh_graph, _ = load_network()
+    for update in updates:
+        fresh_graph.apply_update(update)
+    assert list(graph.get_closed_edges()) == list(fresh_graph.get_closed_edges())
+    for user, vehicle_bias in users:
+        assert list(graph.edge_scores(user, vehicle_bias)) == list(
+            fresh_graph.edge_scores(user, vehicle_bias)
+        )
+        assert list(graph.edge_fare_costs(user)) == list(
+            fresh_graph.edge_fare_costs(user)
+        )
@@ -0,0 +1,39 @@
+import shutil
+
+import pytest
+
+from rota import DatasetSnapshot, StopLoader
+
+
+@pytest.fixture
+def network_copy(network_file, tmp_path):
+    path = tmp_path / "network.json"
+    shutil.copyfile(network_file, path)
+    return str(path)
+
+
+def graph_columns(graph):
+    return (
+        list(graph.get_stop_ids()),
+        list(graph.get_offsets()),
+        list(graph.get_targets()),
+        list(graph.get_times()),
+        list(graph.get_fares()),
+    )
+
+
+@pytest.mark.parametrize("kept_bytes", [-200, -1, 20])
+def test_damaged_snapshot_is_rebuilt(network_copy, kept_bytes):
+    _, graph, taxi_fees = StopLoader.load_dataset(network_copy)
+    snapshot_file = DatasetSnapshot.default_file(network_copy)
+    with open(snapshot_file, "rb") as file:
+        intact = file.read()
+    with open(snapshot_file, "wb") as file:
+        file.write(intact[:kept_bytes])
+
+    _, reloaded_graph, reloaded_fees = StopLoader.load_dataset(network_copy)
+    assert graph_columns(reloaded_graph) == graph_columns(graph)
+    assert reloaded_fees == taxi_fees
+    # Bozuk dosya yeni bir anlık görüntüyle değiştirilir
+    with open(snapshot_file, "rb") as file:
+        assert file.read() == intact